@@ -29,7 +29,7 @@ import { Card, Badge, Button } from '../components/ui/UIComponents';
 import { NavLink, useNavigate } from 'react-router-dom';
 import { useDashboard } from '../context/Dashboard/UseDashboard';
 import React from 'react';
-import { axiosClient } from '../utils/axiosClient';
+import { refreshGithubAndWait } from '../utils/githubSync';
 
 // --- Dashboard Components ---
 
@@ -89,7 +89,7 @@ export default function Dashboard() {
   const refreshGithub = async () => {
     try {
       setRefreshing(true)
-      await axiosClient.post('/github/sync', {}, { withCredentials: true })
+      await refreshGithubAndWait()
       navigate(0)
     } catch (err) {
       console.error(err)
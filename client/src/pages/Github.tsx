@@ -25,7 +25,7 @@ import {
 } from 'lucide-react';
 import { Card, Badge, SectionTitle, Button } from '../components/ui/UIComponents';
 import { useDashboard } from '../context/Dashboard/UseDashboard';
-import { axiosClient } from '../utils/axiosClient';
+import { refreshGithubAndWait } from '../utils/githubSync';
 
 // --- Local Components ---
 
@@ -69,7 +69,7 @@ export default function GithubPage() {
     const refreshGithub = async () => {
         try {
             setRefreshing(true)
-            await axiosClient.post('/github/sync', {}, {withCredentials: true})
+            await refreshGithubAndWait()
             window.location.reload()
         } finally {
             setRefreshing(false)
@@ -62,5 +62,7 @@ export interface DashboardData {
     source: 'demo' | 'github'
     lastUpdated?: string
     warnings?: string[]
+    syncStatus?: 'queued' | 'running' | 'done' | 'failed' | null
+    syncJobId?: string | null
   }
 }
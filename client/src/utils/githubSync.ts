@@ -0,0 +1,26 @@
+import { axiosClient } from './axiosClient';
+
+type SyncJob = {
+  id: string;
+  status: 'queued' | 'running' | 'done' | 'failed';
+  error?: string | null;
+};
+
+const sleep = (ms: number) => new Promise((resolve) => setTimeout(resolve, ms));
+
+// Queues a GitHub refresh and resolves once the background job has finished
+export const refreshGithubAndWait = async (timeoutMs = 120_000): Promise<SyncJob | null> => {
+  const { data } = await axiosClient.post('/github/sync', {}, { withCredentials: true });
+  let job: SyncJob | null = data.job ?? null;
+
+  const deadline = Date.now() + timeoutMs;
+  while (job && (job.status === 'queued' || job.status === 'running') && Date.now() < deadline) {
+    await sleep(1500);
+    const res = await axiosClient.get('/github/sync/status', {
+      params: { job_id: job.id },
+      withCredentials: true,
+    });
+    job = res.data.job ?? null;
+  }
+  return job;
+};
@@ -0,0 +1,100 @@
+"""
+Shared helpers for the benchmark scripts in this folder.
+
+Benchmarks run against in-process stand-ins (uvicorn on localhost and
+mongomock), so they need no network access or real MongoDB.
+"""
+import os
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+
+# Same dummy values the test suite uses; must be set before importing app modules
+BENCH_ENV = {
+    "JWT_SECRET_KEY": "bench-secret-key",
+    "GITHUB_CLIENT_ID": "bench-client-id",
+    "GITHUB_CLIENT_SECRET": "bench-client-secret",
+    "GITHUB_REDIRECT_URI": "http://localhost:8000/callback",
+    "FRONTEND_BASE_URL": "http://localhost:3000",
+    "DB_NAME": "bench_db",
+    "MONGODB_URI": "mongodb://localhost:27017",
+    "API_KEY": "bench-api-key",
+}
+
+
+def setup_path() -> None:
+    for key, value in BENCH_ENV.items():
+        os.environ.setdefault(key, value)
+    if str(SRC_DIR) not in sys.path:
+        sys.path.insert(0, str(SRC_DIR))
+    _patch_mongomock_bulk()
+
+
+def _patch_mongomock_bulk() -> None:
+    """
+    pymongo >= 4.11 passes `sort` to bulk update/replace ops, which mongomock
+    does not accept yet (same shim as tests/conftest.py).
+    """
+    import mongomock.collection
+
+    builder = mongomock.collection.BulkOperationBuilder
+    if getattr(builder, "_sort_shim", False):
+        return
+
+    def without_sort(add):
+        def wrapper(self, *args, sort=None, **kwargs):
+            return add(self, *args, **kwargs)
+        return wrapper
+
+    builder.add_update = without_sort(builder.add_update)
+    builder.add_replace = without_sort(builder.add_replace)
+    builder._sort_shim = True
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class BackgroundServer:
+    """Runs an ASGI app with uvicorn on a daemon thread."""
+
+    def __init__(self, app, port: int | None = None, **uvicorn_kwargs):
+        import uvicorn
+
+        self.port = port or free_port()
+        config = uvicorn.Config(
+            app,
+            host="127.0.0.1",
+            port=self.port,
+            log_level="error",
+            **uvicorn_kwargs,
+        )
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        deadline = time.time() + 10
+        while not self.server.started:
+            if time.time() > deadline:
+                raise RuntimeError("benchmark server did not start")
+            time.sleep(0.05)
+        return self
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join(timeout=5)
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
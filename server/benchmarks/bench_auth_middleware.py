@@ -0,0 +1,95 @@
+"""
+Per-request overhead of the auth middleware, in process (httpx ASGITransport,
+no sockets): no middleware, the old BaseHTTPMiddleware that ran jwt.decode
+on every request, and the pure ASGI AuthMiddleware with its claims cache.
+
+    cd server && python benchmarks/bench_auth_middleware.py --requests 5000
+"""
+import argparse
+import asyncio
+import time
+
+from _harness import percentile, setup_path
+
+setup_path()
+
+import jwt  # noqa: E402
+import httpx  # noqa: E402
+from fastapi import FastAPI, Request  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+
+from middleware.AuthMiddleware import AuthMiddleware, ClaimsCache  # noqa: E402
+
+SECRET = "bench-secret-" + "x" * 32
+
+
+class LegacyAuthMiddleware(BaseHTTPMiddleware):
+    """The previous implementation: BaseHTTPMiddleware + jwt.decode per request."""
+
+    async def dispatch(self, request: Request, call_next):
+        request.state.user_id = None
+        token = request.cookies.get("access_token")
+        if token:
+            try:
+                payload = jwt.decode(token, SECRET, algorithms=["HS256"])
+                request.state.user_id = payload.get("sub")
+            except jwt.InvalidTokenError:
+                return JSONResponse(status_code=401, content={"detail": "Invalid authentication token"})
+        return await call_next(request)
+
+
+def build_app(middleware) -> FastAPI:
+    app = FastAPI()
+    if middleware is LegacyAuthMiddleware:
+        app.add_middleware(LegacyAuthMiddleware)
+    elif middleware is AuthMiddleware:
+        app.add_middleware(AuthMiddleware, cache=ClaimsCache(secret=SECRET))
+
+    @app.get("/ping")
+    async def ping(request: Request):
+        return {"user_id": getattr(request.state, "user_id", None)}
+
+    return app
+
+
+async def measure(app: FastAPI, token: str, requests: int) -> list[float]:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        client.cookies.set("access_token", token)
+        for _ in range(200):  # warm-up
+            await client.get("/ping")
+        samples = []
+        for _ in range(requests):
+            start = time.perf_counter()
+            await client.get("/ping")
+            samples.append((time.perf_counter() - start) * 1_000_000)
+        return samples
+
+
+async def main(args):
+    token = jwt.encode(
+        {"sub": "bench-user", "email": "bench@example.com", "exp": int(time.time()) + 3600},
+        SECRET,
+        algorithm="HS256",
+    )
+
+    results = {}
+    for label, middleware in (
+        ("no middleware", None),
+        ("BaseHTTPMiddleware + decode", LegacyAuthMiddleware),
+        ("ASGI + claims cache", AuthMiddleware),
+    ):
+        results[label] = await measure(build_app(middleware), token, args.requests)
+
+    baseline = percentile(results["no middleware"], 50)
+    print(f"{'':<30}{'p50 us':>10}{'p99 us':>10}{'overhead p50 us':>18}")
+    for label, samples in results.items():
+        p50 = percentile(samples, 50)
+        print(f"{label:<30}{p50:>10.1f}{percentile(samples, 99):>10.1f}{p50 - baseline:>18.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,76 @@
+"""
+Coding-activity cost (services/coding_sessions) over the dashboard's
+90-day window, for growing commit counts: building the per-day session
+masks (done at sync time) and the dashboard's estimate from those masks
+plus the user's time logs.
+
+    cd server && python benchmarks/bench_coding_sessions.py --commits 10000 50000
+
+Pure CPU: no database.
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from _harness import percentile, setup_path
+
+setup_path()
+
+from services.coding_sessions import estimate_coding_activity, session_masks  # noqa: E402
+
+
+def make_rows(commit_count: int, log_count: int, repos: int, now: datetime):
+    rng = random.Random(42)
+    window = 90 * 24 * 60
+    commits = [
+        {
+            "repo_name": f"dev/repo-{rng.randrange(repos)}",
+            "date": now - timedelta(minutes=rng.randrange(window)),
+        }
+        for _ in range(commit_count)
+    ]
+    logs = []
+    for _ in range(log_count):
+        start = now - timedelta(minutes=rng.randrange(window))
+        logs.append({
+            "date": start.strftime("%Y-%m-%d"),
+            "minutes": 45,
+            "startTime": start.strftime("%H:%M"),
+            "endTime": (start + timedelta(minutes=45)).strftime("%H:%M"),
+        })
+    return commits, logs
+
+
+def timed(fn, iterations: int) -> list[float]:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main(args):
+    now = datetime.now(timezone.utc)
+    window_start = now - timedelta(days=90)
+
+    print(f"{'commits':>10}{'sync p50 ms':>14}{'dashboard p50 ms':>18}")
+    for count in args.commits:
+        commits, logs = make_rows(count, args.logs, args.repos, now)
+        times = [c["date"] for c in commits]
+        repos = [c["repo_name"] for c in commits]
+        masks = session_masks(times, repos)
+
+        sync = timed(lambda: session_masks(times, repos), args.iterations)
+        dashboard = timed(lambda: estimate_coding_activity(masks, logs, window_start, now), args.iterations)
+        print(f"{count:>10}{percentile(sync, 50):>14.2f}{percentile(dashboard, 50):>18.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--commits", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--logs", type=int, default=300)
+    parser.add_argument("--repos", type=int, default=20)
+    parser.add_argument("--iterations", type=int, default=20)
+    main(parser.parse_args())
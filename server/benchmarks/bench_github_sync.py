@@ -0,0 +1,90 @@
+"""
+Wall-clock benchmark for sync_github_snapshot against a local fake GitHub
+server with injected per-request latency.
+
+Compares a serial run (one request in flight per user, the old behaviour)
+with the bounded concurrent fan-out.
+
+    cd server && python benchmarks/bench_github_sync.py --repos 20 --commits 10 --latency 0.05
+"""
+import argparse
+import asyncio
+import time
+
+from _harness import BackgroundServer, setup_path
+
+setup_path()
+
+from bson import ObjectId  # noqa: E402
+from mongomock_motor import AsyncMongoMockClient  # noqa: E402
+
+from config.indexes import apply_indexes  # noqa: E402
+import services.github_fetcher as github_fetcher  # noqa: E402
+from services.commit_rollups import CommitRollupStore  # noqa: E402
+from services.commit_stats import CommitStatsStore  # noqa: E402
+from services.commit_store import CommitStore  # noqa: E402
+import services.github_sync as github_sync  # noqa: E402
+from fake_github import USERNAME, build_app  # noqa: E402
+
+
+async def run_sync(base_url: str, max_in_flight: int) -> tuple[float, dict]:
+    mock_db = AsyncMongoMockClient()["bench_db"]
+    await apply_indexes(mock_db)
+    github_sync.users = mock_db["user"]
+    github_sync.github_snapshots = mock_db["github_snapshots"]
+    github_sync.github_http_cache = mock_db["github_http_cache"]
+    github_sync.commit_stats = CommitStatsStore(mock_db["commit_stats"])
+    github_sync.sync_leases = mock_db["sync_leases"]
+    github_sync.commit_store = CommitStore(mock_db["github_commits"])
+    github_sync.commit_rollups = CommitRollupStore(mock_db["github_daily_rollups"])
+    github_sync.GITHUB_API_BASE = base_url
+    github_fetcher.GITHUB_MAX_IN_FLIGHT_PER_USER = max_in_flight
+
+    user_id = ObjectId()
+    await mock_db["user"].insert_one({
+        "_id": user_id,
+        "email": "bench@example.com",
+        "github": {"username": USERNAME, "access_token": "bench-token"},
+    })
+
+    start = time.perf_counter()
+    await github_sync.sync_github_snapshot(user_id)
+    elapsed = time.perf_counter() - start
+
+    snapshot = await mock_db["github_snapshots"].find_one({"user_id": user_id})
+    snapshot["commits"] = await github_sync.commit_store.find_range(
+        user_id, projection={"_id": 0, "user_id": 0, "synced_at": 0}
+    )
+    return elapsed, snapshot
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repos", type=int, default=20)
+    parser.add_argument("--commits", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, default=github_fetcher.GITHUB_MAX_IN_FLIGHT_PER_USER)
+    args = parser.parse_args()
+
+    app = build_app(args.repos, args.commits, args.latency)
+    with BackgroundServer(app) as server:
+        base_url = f"http://127.0.0.1:{server.port}"
+
+        serial_time, serial_snapshot = asyncio.run(run_sync(base_url, 1))
+        requests = app.state.stats["requests"]
+        concurrent_time, concurrent_snapshot = asyncio.run(run_sync(base_url, args.concurrency))
+
+    # Same snapshot content regardless of concurrency
+    assert serial_snapshot["commits"] == concurrent_snapshot["commits"]
+    assert serial_snapshot["languages"] == concurrent_snapshot["languages"]
+    assert serial_snapshot["repos"] == concurrent_snapshot["repos"]
+
+    print(f"GitHub requests per sync : {requests}")
+    print(f"Injected latency         : {args.latency * 1000:.0f} ms")
+    print(f"Serial (1 in flight)     : {serial_time:.2f} s")
+    print(f"Concurrent ({args.concurrency} in flight) : {concurrent_time:.2f} s")
+    print(f"Speedup                  : {serial_time / concurrent_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Per-request latency with and without HTTP connection reuse against a local
+TLS stand-in (uvicorn serving HTTPS with a throwaway self-signed cert).
+
+"new client" opens an httpx.AsyncClient per call (the old behaviour, one TLS
+handshake each); "shared client" reuses one pooled client as the app does.
+
+    cd server && python benchmarks/bench_http_clients.py --requests 200
+"""
+import argparse
+import asyncio
+import datetime
+import ipaddress
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from _harness import BackgroundServer, percentile, setup_path
+
+setup_path()
+
+import httpx  # noqa: E402
+from cryptography import x509  # noqa: E402
+from cryptography.hazmat.primitives import hashes, serialization  # noqa: E402
+from cryptography.hazmat.primitives.asymmetric import ec  # noqa: E402
+from cryptography.x509.oid import NameOID  # noqa: E402
+from starlette.applications import Starlette  # noqa: E402
+from starlette.responses import JSONResponse  # noqa: E402
+from starlette.routing import Route  # noqa: E402
+
+from services.http_clients import build_client  # noqa: E402
+
+
+def write_self_signed_cert(directory: Path) -> tuple[Path, Path]:
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "127.0.0.1")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(x509.SubjectAlternativeName([x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]), critical=False)
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(key, hashes.SHA256())
+    )
+    cert_path = directory / "cert.pem"
+    key_path = directory / "key.pem"
+    cert_path.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    key_path.write_bytes(
+        key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+    )
+    return cert_path, key_path
+
+
+async def stand_in(request):
+    return JSONResponse({"ok": True})
+
+
+async def measure_new_client(url: str, cert: str, n: int) -> list[float]:
+    samples = []
+    for _ in range(n):
+        start = time.perf_counter()
+        async with httpx.AsyncClient(verify=cert) as client:
+            (await client.get(url)).raise_for_status()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def measure_shared_client(url: str, cert: str, n: int) -> list[float]:
+    # Same pool settings the app uses, trusting the throwaway cert
+    client = build_client("github", verify=cert)
+    samples = []
+    try:
+        for _ in range(n):
+            start = time.perf_counter()
+            (await client.get(url)).raise_for_status()
+            samples.append(time.perf_counter() - start)
+    finally:
+        await client.aclose()
+    return samples
+
+
+def report(label: str, samples: list[float]) -> None:
+    ms = [s * 1000 for s in samples]
+    print(
+        f"{label:<15} mean {statistics.mean(ms):6.2f} ms   "
+        f"p50 {percentile(ms, 50):6.2f} ms   p99 {percentile(ms, 99):6.2f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    app = Starlette(routes=[Route("/ping", stand_in)])
+    with tempfile.TemporaryDirectory() as tmp:
+        cert, key = write_self_signed_cert(Path(tmp))
+        with BackgroundServer(app, ssl_certfile=str(cert), ssl_keyfile=str(key)) as server:
+            url = f"https://127.0.0.1:{server.port}/ping"
+            new_samples = asyncio.run(measure_new_client(url, str(cert), args.requests))
+            shared_samples = asyncio.run(measure_shared_client(url, str(cert), args.requests))
+
+    print(f"{args.requests} sequential HTTPS requests")
+    report("new client", new_samples)
+    report("shared client", shared_samples)
+    print(f"speedup (mean)  {statistics.mean(new_samples) / statistics.mean(shared_samples):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Bytes read and latency per endpoint for the user/snapshot reads, before
+(whole documents) and after (services/data_access.py projections, $size,
+$filter and $slice), against one large synthetic snapshot that still
+embeds its commits.
+
+    cd server && python benchmarks/bench_lean_reads.py --commits 20000
+
+Uses mongomock by default; pass --mongo-uri to measure a real server,
+where the byte savings also come off the wire. mongomock evaluates
+aggregation stages in Python, so its latencies overstate the cost of the
+$filter/$size reads; only the byte counts are representative there.
+"""
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from _harness import percentile, setup_path
+
+setup_path()
+
+import bson  # noqa: E402
+from bson import ObjectId  # noqa: E402
+
+from services.data_access import SnapshotStore, UserStore  # noqa: E402
+
+
+def bson_size(result) -> int:
+    if result is None:
+        return 0
+    if isinstance(result, list):
+        return len(bson.encode({"r": result}))
+    return len(bson.encode(result))
+
+
+async def seed(db, commit_count: int, repo_count: int) -> ObjectId:
+    user_id = ObjectId()
+    now = datetime.now(timezone.utc)
+    await db["user"].insert_one({
+        "_id": user_id,
+        "email": "bench@example.com",
+        "fullName": "Bench User",
+        "password_hash": "$2b$12$" + "x" * 53,
+        "github": {"username": "bench-user", "github_id": 1, "access_token": "gho_" + "x" * 36},
+        "profile": {"about": "x" * 500, "skills": ["python"] * 20},
+        "settings": {"theme_preference": "dark"},
+    })
+
+    repos = [f"bench-user/repo-{i}" for i in range(repo_count)]
+    # Spread over a year, so only ~a quarter falls in the dashboard window
+    spacing = timedelta(days=365) / commit_count
+    await db["github_snapshots"].insert_one({
+        "user_id": user_id,
+        "repos": [{"repo_id": i, "name": r.split("/")[1], "full_name": r, "is_private": False} for i, r in enumerate(repos)],
+        "repo_state": [{"full_name": r, "pushed_at": now.isoformat(), "high_water_sha": "0" * 40} for r in repos],
+        "languages": {"Python": 120000, "TypeScript": 80000},
+        "commits": [
+            {
+                "repo_id": i % repo_count,
+                "repo_name": random.choice(repos),
+                "sha": f"{i:040x}",
+                "message": f"Commit message number {i} with some detail",
+                "committed_at": now - spacing * i,
+                "additions": random.randint(1, 200),
+                "deletions": random.randint(0, 100),
+            }
+            for i in range(commit_count)
+        ],
+        "last_synced_at": now,
+        "updated_at": now,
+    })
+    return user_id
+
+
+def endpoints(db, user_id):
+    users = db["user"]
+    snapshots = db["github_snapshots"]
+    user_store = UserStore(users)
+    snapshot_store = SnapshotStore(snapshots)
+    now = datetime.now(timezone.utc)
+
+    async def dashboard_before():
+        return [
+            await users.find_one({"_id": user_id}),
+            await snapshots.find_one({"user_id": user_id}),
+        ]
+
+    async def dashboard_after():
+        return [
+            await user_store.github_link(user_id),
+            await snapshot_store.dashboard_view(user_id),
+            await snapshot_store.legacy_commits(user_id, since=now - timedelta(days=90)),
+        ]
+
+    async def profile_before():
+        return [
+            await users.find_one({"_id": user_id}),
+            await snapshots.find_one({"user_id": user_id}, sort=[("last_synced_at", -1)]),
+        ]
+
+    async def profile_after():
+        return [
+            await user_store.profile(user_id),
+            await snapshot_store.profile_stats(user_id),
+        ]
+
+    async def summary_before():
+        return [await snapshots.find_one({"user_id": user_id})]
+
+    async def summary_after():
+        return [
+            await snapshot_store.storage_info(user_id),
+            await snapshot_store.legacy_commits(user_id, since=now - timedelta(hours=24), until=now),
+        ]
+
+    return {
+        "/dashboard": (dashboard_before, dashboard_after),
+        "/user/profile": (profile_before, profile_after),
+        "/summary/generate": (summary_before, summary_after),
+    }
+
+
+async def measure(fn, iterations: int) -> tuple[int, list[float]]:
+    size = sum(bson_size(r) for r in await fn())
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return size, samples
+
+
+async def main(args):
+    if args.mongo_uri:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        client = AsyncIOMotorClient(args.mongo_uri)
+        db = client["bench_lean_reads"]
+        await client.drop_database("bench_lean_reads")
+    else:
+        from mongomock_motor import AsyncMongoMockClient
+        db = AsyncMongoMockClient()["bench_lean_reads"]
+
+    user_id = await seed(db, args.commits, args.repos)
+
+    print(f"Snapshot: {args.commits} embedded commits, {args.repos} repos")
+    print(f"{'endpoint':<20}{'before KB':>12}{'after KB':>12}{'before p50 ms':>16}{'after p50 ms':>15}")
+    for name, (before, after) in endpoints(db, user_id).items():
+        before_size, before_ms = await measure(before, args.iterations)
+        after_size, after_ms = await measure(after, args.iterations)
+        print(
+            f"{name:<20}{before_size / 1024:>12.1f}{after_size / 1024:>12.1f}"
+            f"{percentile(before_ms, 50):>16.2f}{percentile(after_ms, 50):>15.2f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--commits", type=int, default=20000)
+    parser.add_argument("--repos", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--mongo-uri", default=None)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,125 @@
+"""
+p50/p99 latency of an unrelated endpoint (/api/v1/health) while a storm of
+logins runs, with bcrypt inline on the event loop (the old behaviour)
+versus on the bounded password_hasher pool.
+
+    cd server && python benchmarks/bench_login_storm.py --logins 200 --concurrency 32
+"""
+import argparse
+import asyncio
+import time
+
+from _harness import BackgroundServer, percentile, setup_path
+
+setup_path()
+
+import bcrypt  # noqa: E402
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from mongomock_motor import AsyncMongoMockClient  # noqa: E402
+
+import Routes.AuthRoutes as auth_routes  # noqa: E402
+from Routes.PublicRoute import route as public_route  # noqa: E402
+from services.password_hasher import PasswordHasher  # noqa: E402
+
+EMAIL = "storm@example.com"
+PASSWORD = "storm-password"
+
+
+class InlineHasher:
+    """bcrypt straight on the event loop, as the handlers used to call it."""
+
+    async def hash(self, password: str) -> str:
+        return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        return bcrypt.checkpw(password.encode("utf-8"), hashed.encode("utf-8"))
+
+
+def build_app(rounds: int) -> FastAPI:
+    mock_db = AsyncMongoMockClient()["bench_db"]
+    auth_routes.users = mock_db["user"]
+    asyncio.run(mock_db["user"].insert_one({
+        "email": EMAIL,
+        "password_hash": bcrypt.hashpw(PASSWORD.encode("utf-8"), bcrypt.gensalt(rounds)).decode("utf-8"),
+    }))
+
+    app = FastAPI()
+    app.include_router(public_route)
+    app.include_router(auth_routes.auth_router)
+    return app
+
+
+async def probe(client: httpx.AsyncClient, stop: asyncio.Event, samples: list[float]) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get("/api/v1/health")
+        samples.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(0.01)
+
+
+async def storm(base_url: str, logins: int, concurrency: int) -> tuple[list[float], dict]:
+    limits = httpx.Limits(max_connections=concurrency + 1)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        samples: list[float] = []
+        stop = asyncio.Event()
+        prober = asyncio.create_task(probe(client, stop, samples))
+
+        statuses: dict[int, int] = {}
+        gate = asyncio.Semaphore(concurrency)
+
+        async def login():
+            async with gate:
+                res = await client.post("/api/v1/auth/login", json={"email": EMAIL, "password": PASSWORD})
+                statuses[res.status_code] = statuses.get(res.status_code, 0) + 1
+
+        await asyncio.gather(*(login() for _ in range(logins)))
+        stop.set()
+        await prober
+        return samples, statuses
+
+
+async def idle(base_url: str, seconds: float) -> list[float]:
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        samples: list[float] = []
+        stop = asyncio.Event()
+        prober = asyncio.create_task(probe(client, stop, samples))
+        await asyncio.sleep(seconds)
+        stop.set()
+        await prober
+        return samples
+
+
+def report(label: str, samples: list[float], statuses: dict | None = None) -> None:
+    line = f"{label:<28} p50 {percentile(samples, 50):7.1f} ms   p99 {percentile(samples, 99):7.1f} ms"
+    if statuses:
+        line += "   logins " + ", ".join(f"{code}: {n}" for code, n in sorted(statuses.items()))
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--max-pending", type=int, default=32)
+    args = parser.parse_args()
+
+    app = build_app(args.rounds)
+    with BackgroundServer(app) as server:
+        base_url = f"http://127.0.0.1:{server.port}"
+
+        report("health, no logins", asyncio.run(idle(base_url, 2)))
+
+        auth_routes.password_hasher = InlineHasher()
+        report("health, inline bcrypt", *asyncio.run(storm(base_url, args.logins, args.concurrency)))
+
+        pool = PasswordHasher(workers=args.workers, max_pending=args.max_pending, rounds=args.rounds)
+        auth_routes.password_hasher = pool
+        report("health, bcrypt pool", *asyncio.run(storm(base_url, args.logins, args.concurrency)))
+        pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
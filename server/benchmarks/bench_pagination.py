@@ -0,0 +1,84 @@
+"""
+Latency of page 1 versus a deep page of a user's summaries: skip/limit
+(the old GET /api/v1/summary/) against keyset cursors (services/pagination).
+
+    cd server && python benchmarks/bench_pagination.py --mongo-uri mongodb://localhost:27017
+
+Meant for a real server, where skip walks every skipped index entry and a
+cursor seeks straight to its page. mongomock sorts the whole collection
+on every query, so there both approaches grow with collection size.
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+from _harness import percentile, setup_path
+
+setup_path()
+
+from bson import ObjectId  # noqa: E402
+
+from config.indexes import apply_indexes  # noqa: E402
+from services.pagination import fetch_page  # noqa: E402
+
+
+async def seed(db, count: int) -> ObjectId:
+    user_id = ObjectId()
+    now = datetime.now(timezone.utc)
+    for start in range(0, count, 10000):
+        await db["summaries"].insert_many([
+            {"user_id": user_id, "content": "x" * 200, "created_at": now - timedelta(minutes=i)}
+            for i in range(start, min(start + 10000, count))
+        ])
+    return user_id
+
+
+async def timed(fn, iterations: int) -> float:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return percentile(samples, 50)
+
+
+async def main(args):
+    if args.mongo_uri:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        client = AsyncIOMotorClient(args.mongo_uri)
+        await client.drop_database("bench_pagination")
+        db = client["bench_pagination"]
+    else:
+        from mongomock_motor import AsyncMongoMockClient
+        db = AsyncMongoMockClient()["bench_pagination"]
+    await apply_indexes(db)
+
+    user_id = await seed(db, args.summaries)
+    summaries = db["summaries"]
+    query = {"user_id": user_id}
+    deep = args.summaries // args.limit - 1
+
+    # Walk to the deep page once to get its cursor
+    cursor = None
+    for _ in range(deep):
+        _, cursor = await fetch_page(summaries, query, "created_at", cursor, args.limit)
+
+    def skip_page(page):
+        return lambda: summaries.find(query).sort("created_at", -1).skip(page * args.limit).limit(args.limit).to_list(length=args.limit)
+
+    print(f"{args.summaries} summaries, {args.limit} per page; p50 ms")
+    print(f"{'':<10}{'page 1':>10}{f'page {deep + 1}':>14}")
+    print(f"{'skip':<10}{await timed(skip_page(0), args.iterations):>10.2f}{await timed(skip_page(deep), args.iterations):>14.2f}")
+    first = await timed(lambda: fetch_page(summaries, query, "created_at", None, args.limit), args.iterations)
+    last = await timed(lambda: fetch_page(summaries, query, "created_at", cursor, args.limit), args.iterations)
+    print(f"{'cursor':<10}{first:>10.2f}{last:>14.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--summaries", type=int, default=20000)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--mongo-uri", default=None)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,124 @@
+"""
+Time-log ingestion throughput in entries/sec: one POST /api/v1/time/logs per
+entry (the old path for editor heartbeats) versus POST /api/v1/time/logs/bulk
+with a JSON array and with NDJSON. Runs in process over httpx ASGITransport.
+
+    cd server && python benchmarks/bench_time_ingest.py --entries 5000
+
+Uses mongomock by default; pass --mongo-uri to measure a real server.
+mongomock checks unique indexes by scanning the collection on every insert,
+which dominates both paths there and understates the bulk speed-up.
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from _harness import setup_path
+
+os.environ.setdefault("JWT_SECRET_KEY", "bench-secret-" + "x" * 32)
+setup_path()
+
+import httpx  # noqa: E402
+import jwt  # noqa: E402
+from bson import ObjectId  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+
+import Routes.TimeRoutes as time_routes  # noqa: E402
+from config.indexes import apply_indexes  # noqa: E402
+from middleware.AuthMiddleware import AuthMiddleware, ClaimsCache  # noqa: E402
+from services.time_aggregates import TimeLogAggregates  # noqa: E402
+
+
+def entries(count: int, run: str) -> list[dict]:
+    return [
+        {
+            "project": f"project-{i % 5}",
+            "minutes": 2,
+            "date": f"2026-01-{i % 28 + 1:02d}",
+            "isDeepWork": i % 3 == 0,
+            "source": "editor",
+            "idempotencyKey": f"{run}-{i}",
+        }
+        for i in range(count)
+    ]
+
+
+def build_app(db) -> FastAPI:
+    time_routes.time_logs_collection = db["time_logs"]
+    time_routes.time_aggregates = TimeLogAggregates(db["time_log_daily"])
+    app = FastAPI()
+    app.add_middleware(AuthMiddleware, cache=ClaimsCache(secret=os.environ["JWT_SECRET_KEY"]))
+    app.include_router(time_routes.router)
+    return app
+
+
+async def single(client, items):
+    for item in items:
+        res = await client.post("/api/v1/time/logs", json=item)
+        res.raise_for_status()
+
+
+async def bulk_json(client, items, batch):
+    for start in range(0, len(items), batch):
+        res = await client.post("/api/v1/time/logs/bulk", json=items[start:start + batch])
+        res.raise_for_status()
+
+
+async def bulk_ndjson(client, items, batch):
+    for start in range(0, len(items), batch):
+        body = "\n".join(json.dumps(item) for item in items[start:start + batch])
+        res = await client.post(
+            "/api/v1/time/logs/bulk",
+            content=body,
+            headers={"content-type": "application/x-ndjson"},
+        )
+        res.raise_for_status()
+
+
+async def fresh_db(mongo_uri: str | None):
+    """An empty database per path, so each starts from the same collection size."""
+    if mongo_uri:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        mongo = AsyncIOMotorClient(mongo_uri)
+        await mongo.drop_database("bench_time_ingest")
+        db = mongo["bench_time_ingest"]
+    else:
+        from mongomock_motor import AsyncMongoMockClient
+        db = AsyncMongoMockClient()["bench_time_ingest"]
+    await apply_indexes(db)
+    return db
+
+
+async def main(args):
+    token = jwt.encode(
+        {"sub": str(ObjectId()), "exp": int(time.time()) + 3600},
+        os.environ["JWT_SECRET_KEY"],
+        algorithm="HS256",
+    )
+
+    print(f"{args.entries} entries, bulk batches of {args.batch}")
+    for label, run in (
+        ("single POST per entry", lambda client, items: single(client, items)),
+        ("bulk, JSON array", lambda client, items: bulk_json(client, items, args.batch)),
+        ("bulk, NDJSON", lambda client, items: bulk_ndjson(client, items, args.batch)),
+    ):
+        db = await fresh_db(args.mongo_uri)
+        transport = httpx.ASGITransport(app=build_app(db))
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+            client.cookies.set("access_token", token)
+            start = time.perf_counter()
+            await run(client, entries(args.entries, label))
+            elapsed = time.perf_counter() - start
+
+        stored = await db["time_logs"].count_documents({})
+        print(f"{label:<24}{args.entries / elapsed:>12.0f} entries/s   ({stored} stored)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=5000)
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--mongo-uri", default=None)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,89 @@
+"""
+A tiny GitHub REST API stand-in with injected latency, used by benchmarks.
+Serves deterministic data for one user ("bench-user").
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+USERNAME = "bench-user"
+
+
+def build_app(
+    repo_count: int = 20,
+    commits_per_repo: int = 10,
+    latency: float = 0.05,
+) -> Starlette:
+    now = datetime.now(timezone.utc)
+    repos = [
+        {
+            "id": 1000 + i,
+            "name": f"repo-{i}",
+            "full_name": f"{USERNAME}/repo-{i}",
+            "private": False,
+            "pushed_at": (now - timedelta(hours=i)).isoformat().replace("+00:00", "Z"),
+        }
+        for i in range(repo_count)
+    ]
+    commits = {
+        repo["name"]: [
+            {
+                "sha": f"{repo['id']:x}{j:036x}",
+                "author": {"login": USERNAME},
+                "commit": {
+                    "message": f"Commit {j} on {repo['name']}",
+                    "author": {
+                        "email": "bench@example.com",
+                        "date": (now - timedelta(hours=j * 5 + 1)).isoformat().replace("+00:00", "Z"),
+                    },
+                },
+            }
+            for j in range(commits_per_repo)
+        ]
+        for repo in repos
+    }
+    stats = {"requests": 0}
+
+    async def delay():
+        stats["requests"] += 1
+        await asyncio.sleep(latency)
+
+    async def user_repos(request: Request):
+        await delay()
+        return JSONResponse(repos)
+
+    async def repo_languages(request: Request):
+        await delay()
+        return JSONResponse({"Python": 1200, "TypeScript": 800})
+
+    async def repo_commits(request: Request):
+        await delay()
+        return JSONResponse(commits.get(request.path_params["repo"], []))
+
+    async def commit_detail(request: Request):
+        await delay()
+        sha = request.path_params["sha"]
+        for c in commits.get(request.path_params["repo"], []):
+            if c["sha"] == sha:
+                return JSONResponse({**c, "stats": {"additions": 10, "deletions": 3}})
+        return JSONResponse({"message": "Not Found"}, status_code=404)
+
+    async def user_events(request: Request):
+        await delay()
+        return JSONResponse([])
+
+    app = Starlette(
+        routes=[
+            Route("/user/repos", user_repos),
+            Route("/repos/{owner}/{repo}/languages", repo_languages),
+            Route("/repos/{owner}/{repo}/commits", repo_commits),
+            Route("/repos/{owner}/{repo}/commits/{sha}", commit_detail),
+            Route("/users/{username}/events", user_events),
+        ]
+    )
+    app.state.stats = stats
+    return app
@@ -0,0 +1,28 @@
+"""
+Builds time_log_daily rows from existing time_logs. New logs keep the
+aggregates current themselves; this covers logs written before they
+existed. Rebuilds each user from scratch, so it is safe to re-run.
+
+    cd server && PYTHONPATH=src python scripts/backfill_time_aggregates.py
+"""
+import asyncio
+
+from config.db import db
+from config.indexes import apply_indexes
+from services.time_aggregates import time_aggregates
+
+
+async def main():
+    await apply_indexes(db)
+
+    users = 0
+    logs = 0
+    for user_id in await db["time_logs"].distinct("user_id"):
+        logs += await time_aggregates.rebuild(user_id, db["time_logs"])
+        users += 1
+
+    print(f"Rebuilt {time_aggregates.collection.name} for {users} users from {logs} time logs")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,34 @@
+"""
+Moves embedded snapshot commits into the github_commits collection.
+
+Snapshots are also migrated lazily on first read or sync; this script does
+the whole backlog at once. Safe to re-run.
+
+    cd server && PYTHONPATH=src python scripts/migrate_commits.py
+"""
+import asyncio
+
+from config.db import db
+from config.indexes import apply_indexes
+from services.commit_store import COMMIT_STORAGE, migrate_snapshot_commits
+from services.github_sync import commit_store, github_snapshots
+
+
+async def main():
+    await apply_indexes(db)
+
+    migrated = 0
+    moved = 0
+    cursor = github_snapshots.find(
+        {"commit_storage": {"$ne": COMMIT_STORAGE}},
+        {"user_id": 1},
+    )
+    async for snapshot in cursor:
+        moved += await migrate_snapshot_commits(github_snapshots, commit_store, snapshot["user_id"])
+        migrated += 1
+
+    print(f"Migrated {migrated} snapshots, moved {moved} commits into {commit_store.collection.name}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,52 @@
+"""
+Generates today's summary for every active user, so the first request of
+the day is served from `summaries` instead of waiting on Gemini.
+
+"Today" is the UTC day and a summary covers the 24h before it is made,
+so schedule the job just after UTC midnight: the new day's summary then
+exists from the start of the day and covers the day before.
+
+    15 0 * * *  cd server && PYTHONPATH=src python scripts/nightly_summaries.py
+
+Checkpointed per page in summary_batch_runs: re-running the same UTC day
+resumes an interrupted run.
+"""
+import argparse
+import asyncio
+
+from config.db import db
+from config.indexes import apply_indexes
+from services.http_clients import close_http_clients, get_gemini_client, start_http_clients
+from services.summary_batch import (
+    SUMMARY_BATCH_CONCURRENCY,
+    SUMMARY_BATCH_RPM,
+    SummaryBatch,
+)
+
+
+async def main(args):
+    await apply_indexes(db)
+    await start_http_clients()
+    try:
+        batch = SummaryBatch(
+            db["summaries"],
+            db["github_snapshots"],
+            db["summary_batch_runs"],
+            client=get_gemini_client(),
+            concurrency=args.concurrency,
+            rpm=args.rpm,
+        )
+        run = await batch.run(force=args.force)
+    finally:
+        await close_http_clients()
+
+    if run["failed"]:
+        print("Failed users (latest):", ", ".join(str(u) for u in run["failed_users"]))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=SUMMARY_BATCH_CONCURRENCY)
+    parser.add_argument("--rpm", type=int, default=SUMMARY_BATCH_RPM)
+    parser.add_argument("--force", action="store_true", help="start today's run over")
+    asyncio.run(main(parser.parse_args()))
@@ -1,8 +1,7 @@
 import os
 import secrets
-from jose import JWTError
 import jwt
-import bcrypt
+from jwt import InvalidTokenError
 import httpx
 
 from datetime import datetime, timedelta, timezone
@@ -11,9 +10,19 @@ from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.responses import JSONResponse, RedirectResponse
 
 from config.db import db as MongoDB
+from middleware.AuthMiddleware import request_claims
 from schemas.auth import LoginRequest
 from schemas.auth import RegisterRequest
 from schemas.auth import PasswordChangeRequest
+from services.commit_store import COMMIT_STORAGE
+from services.data_access import snapshot_store, user_store
+from services.password_hasher import PasswordHasherBusy, password_hasher
+from services.time_aggregates import time_aggregates
+from services.http_clients import (
+    get_github_client,
+    get_github_oauth_client,
+    http_client,
+)
 
 # -------------------- CONFIG --------------------
 
@@ -40,12 +49,28 @@ user_router = APIRouter(prefix="/api/v1/user", tags=["user"])
 
 # -------------------- AUTH --------------------
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return bcrypt.checkpw(
-        plain_password.encode("utf-8"),
-        hashed_password.encode("utf-8")
+# bcrypt runs on the password_hasher pool; when it is saturated we shed
+# load with a 429 instead of letting logins queue up without bound.
+
+def _hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many sign-in attempts right now, please retry shortly",
+        headers={"Retry-After": "1"},
     )
 
+async def hash_password(plain_password: str) -> str:
+    try:
+        return await password_hasher.hash(plain_password)
+    except PasswordHasherBusy:
+        raise _hasher_busy()
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    try:
+        return await password_hasher.verify(plain_password, hashed_password)
+    except PasswordHasherBusy:
+        raise _hasher_busy()
+
 def create_access_token(data: dict, expires_delta: timedelta) -> str:
     now = datetime.now(timezone.utc)
     payload = {
@@ -93,10 +118,7 @@ async def register(payload: RegisterRequest):
             detail="Password must be at least 8 characters long",
         )
 
-    password_hash = bcrypt.hashpw(
-        payload.password.encode("utf-8"),
-        bcrypt.gensalt(),
-    ).decode("utf-8")
+    password_hash = await hash_password(payload.password)
 
     user = {
         "fullName": payload.fullName.strip(),
@@ -138,7 +160,7 @@ async def login(payload: LoginRequest):
 
     # Check duplicate email
     existing_user = await users.find_one({"email": email})
-    if not existing_user or not verify_password(
+    if not existing_user or not await verify_password(
     payload.password, 
     existing_user["password_hash"]
     ):
@@ -168,55 +190,40 @@ async def login(payload: LoginRequest):
 
 # -------------------- GET CURRENT USER --------------------
 
-async def get_current_user(request: Request) -> str:
-    """Dependency to extract and validate user ID from JWT token"""
-    token = request.cookies.get("access_token")
+def _claims_user_id(request: Request) -> str | None:
+    try:
+        claims = request_claims(request)
+    except InvalidTokenError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token",
+        )
 
-    if not token:
+    if claims is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Not authenticated",
         )
 
-    try:
-        payload = jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
-        user_id: str = payload.get("sub")
+    return claims.get("sub")
 
-        if not user_id:
-            raise HTTPException(status_code=401, detail="Invalid token")
+async def get_current_user(request: Request) -> str:
+    """Dependency returning the user ID from the claims AuthMiddleware verified"""
+    user_id = _claims_user_id(request)
 
-    except JWTError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token",
-        )
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Invalid token")
 
     return user_id
 
 @auth_router.get("/me")
 async def me(request: Request):
-    token = request.cookies.get("access_token")
+    user_id = _claims_user_id(request)
 
-    if not token:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Not authenticated",
-        )
+    if not user_id:
+        raise HTTPException(status_code=401)
 
-    try:
-        payload = jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
-        user_id: str = payload.get("sub")
-
-        if not user_id:
-            raise HTTPException(status_code=401)
-
-    except JWTError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token",
-        )
-
-    user = await users.find_one({"_id": ObjectId(user_id)})
+    user = await user_store.identity(ObjectId(user_id))
 
     if not user:
         raise HTTPException(
@@ -253,26 +260,32 @@ async def github_login():
 
 # -------------------- GITHUB CALLBACK --------------------
 
+async def consume_oauth_state(state: str) -> bool:
+    """
+    Atomically takes a live state token (single use, one round-trip).
+    Expired tokens never match and are removed by the TTL index.
+    """
+    state_doc = await oauth_states.find_one_and_delete(
+        {"state": state, "expires_at": {"$gt": datetime.now(timezone.utc)}},
+        projection={"_id": 1},
+    )
+    return state_doc is not None
+
+
 @github_router.get("/callback")
-async def github_callback(code: str, state: str):
+async def github_callback(
+    code: str,
+    state: str,
+    oauth_client: httpx.AsyncClient | None = Depends(get_github_oauth_client),
+    api_client: httpx.AsyncClient | None = Depends(get_github_client),
+):
 
     # ---------------------VALIDATE STATE----------------------
-    state_doc = await oauth_states.find_one({"state": state})
-    if not state_doc:
+    if not await consume_oauth_state(state):
         raise HTTPException(status_code=400, detail="Invalid or expired OAuth state")
-    expires_at = state_doc["expires_at"]
-    # Normalize MongoDB datetime to UTC-aware
-    if expires_at.tzinfo is None:
-        expires_at = expires_at.replace(tzinfo=timezone.utc)
-    if expires_at < datetime.now(timezone.utc):
-        await oauth_states.delete_one({"_id": state_doc["_id"]})
-        raise HTTPException(status_code=400, detail="OAuth state expired")
-    
-    # State is single use, delete it
-    await oauth_states.delete_one({"_id": state_doc["_id"]})
 
     # ---------------------EXCHANGE CODE FOR TOKEN----------------------
-    async with httpx.AsyncClient() as client:
+    async with http_client("github_oauth", oauth_client) as client:
         token_res = await client.post(
             "https://github.com/login/oauth/access_token",
             headers={"Accept": "application/json"},
@@ -287,7 +300,8 @@ async def github_callback(code: str, state: str):
         access_token = token_data.get("access_token")
         if not access_token:
             raise HTTPException(status_code=400, detail="GitHub OAuth failed")
-        
+
+    async with http_client("github", api_client) as client:
         # ---------------------FETCH GITHUB USER----------------------
         user_res = await client.get(
             "https://api.github.com/user",
@@ -390,23 +404,23 @@ async def github_callback(code: str, state: str):
 @user_router.get("/profile")
 async def get_user_profile(user_id: str = Depends(get_current_user)):
     """Fetch full user profile with stats"""
-    user = await MongoDB["user"].find_one({"_id": ObjectId(user_id)})
+    user = await user_store.profile(ObjectId(user_id))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
     # Fetch last GitHub sync date + stats
-    last_snapshot = await MongoDB["github_snapshots"].find_one(
-        {"user_id": ObjectId(user_id)},
-        sort=[("last_synced_at", -1)]
-    )
+    last_snapshot = await snapshot_store.profile_stats(ObjectId(user_id))
     
     # Calculate stats
-    total_commits = len(last_snapshot.get("commits", [])) if last_snapshot else 0
+    if last_snapshot and last_snapshot.get("commit_storage") != COMMIT_STORAGE:
+        # Not migrated to github_commits yet
+        total_commits = last_snapshot["legacy_commit_count"]
+    else:
+        total_commits = await MongoDB["github_commits"].count_documents(
+            {"user_id": ObjectId(user_id)}
+        )
     
-    time_logs = await MongoDB["time_logs"].find(
-        {"user_id": ObjectId(user_id)}
-    ).to_list(None)
-    hours_logged = sum(log["minutes"] for log in time_logs) // 60 if time_logs else 0
+    hours_logged = await time_aggregates.total_minutes(ObjectId(user_id)) // 60
     
     return {
         "_id": str(user["_id"]),
@@ -469,15 +483,15 @@ async def change_password(
         raise HTTPException(status_code=400, detail="Password must be at least 8 characters")
     
     # Fetch user and verify old password
-    user = await MongoDB["user"].find_one({"_id": ObjectId(user_id)})
-    if not user:
+    password_hash = await user_store.password_hash(ObjectId(user_id))
+    if not password_hash:
         raise HTTPException(status_code=404, detail="User not found")
     
-    if not verify_password(request.old_password, user["password_hash"]):
+    if not await verify_password(request.old_password, password_hash):
         raise HTTPException(status_code=401, detail="Current password is incorrect")
     
     # Update password
-    new_hash = bcrypt.hashpw(request.new_password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+    new_hash = await hash_password(request.new_password)
     await MongoDB["user"].update_one(
         {"_id": ObjectId(user_id)},
         {"$set": {"password_hash": new_hash, "updated_at": datetime.now(timezone.utc)}}
@@ -503,13 +517,15 @@ async def disconnect_github(user_id: str = Depends(get_current_user)):
 @user_router.get("/settings")
 async def get_user_settings(user_id: str = Depends(get_current_user)):
     """Fetch user settings"""
-    user = await MongoDB["user"].find_one({"_id": ObjectId(user_id)})
-    return user.get("settings", {
+    settings = await user_store.settings(ObjectId(user_id))
+    if settings is not None:
+        return settings
+    return {
         "notifications_enabled": True,
         "email_digest_frequency": "weekly",
         "theme_preference": "system",
         "privacy_level": "private"
-    })
+    }
 
 # PUT /api/v1/user/settings
 @user_router.put("/settings")
@@ -531,15 +547,21 @@ async def delete_account(
     user_id: str = Depends(get_current_user)
 ):
     """Delete user account (irreversible)"""
-    user = await MongoDB["user"].find_one({"_id": ObjectId(user_id)})
+    password_hash = await user_store.password_hash(ObjectId(user_id))
     
-    if not verify_password(password, user["password_hash"]):
+    if not password_hash or not await verify_password(password, password_hash):
         raise HTTPException(status_code=401, detail="Password is incorrect")
     
     # Delete user data
     await MongoDB["user"].delete_one({"_id": ObjectId(user_id)})
     await MongoDB["github_snapshots"].delete_many({"user_id": ObjectId(user_id)})
+    await MongoDB["github_commits"].delete_many({"user_id": ObjectId(user_id)})
+    await MongoDB["github_daily_rollups"].delete_many({"user_id": ObjectId(user_id)})
     await MongoDB["summaries"].delete_many({"user_id": ObjectId(user_id)})
     await MongoDB["time_logs"].delete_many({"user_id": ObjectId(user_id)})
+    await MongoDB["time_log_daily"].delete_many({"user_id": ObjectId(user_id)})
+    await MongoDB["github_http_cache"].delete_many({"user_key": user_id})
+    await MongoDB["sync_jobs"].delete_many({"user_id": ObjectId(user_id)})
+    await MongoDB["sync_leases"].delete_many({"_id": ObjectId(user_id)})
     
     return {"message": "Account deleted successfully"}
\ No newline at end of file
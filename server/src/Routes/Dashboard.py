@@ -1,21 +1,57 @@
-from fastapi import APIRouter, Request, HTTPException
+import asyncio
+from fastapi import APIRouter, Request, HTTPException, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from bson import ObjectId
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
 from config.db import db
-from services.github_sync import sync_github_snapshot
+from services.sync_queue import enqueue_sync
+from services.coding_sessions import estimate_coding_activity
+from services.commit_rollups import ROLLUP_VERSION, commit_session_masks
+from services.commit_store import COMMIT_STORAGE
+from services.data_access import snapshot_store, user_store
+from services.github_sync import SYNC_LOOKBACK_DAYS, commit_rollups, commit_store
+from services.response_cache import dashboard_cache
+from services.time_aggregates import time_aggregates
 from services.dashboard_metrics import (
     compute_weekly_activity,
     compute_streak,
-    compute_coding_time,
     compute_code_churn,
+    compute_repo_stats,
+    compute_weekly_activity_from_rollups,
+    compute_streak_from_rollups,
+    compute_code_churn_from_rollups,
+    compute_repo_stats_from_rollups,
+    apply_session_minutes,
+    compute_coding_time_from_sessions,
 )
 
 router = APIRouter(prefix="/api/v1", tags=["dashboard"])
 STALE_AFTER = timedelta(hours=6)
-users = db["user"]
-github_snapshots = db["github_snapshots"]
+time_logs_collection = db["time_logs"]
+
+
+def normalize_commits(raw_commits: list[dict]) -> list[dict]:
+    normalized_commits = []
+    for c in raw_commits:
+        committed_at = c.get("committed_at") or c.get("date")
+        if not committed_at:
+            continue
+
+        if isinstance(committed_at, str):
+            dt = datetime.fromisoformat(committed_at)
+        else:
+            dt = committed_at
+
+        normalized_commits.append(
+            {
+                **c,
+                "date": dt,
+            }
+        )
+    return normalized_commits
 
 
 def format_last_active(dt: Optional[datetime]) -> str:
@@ -61,8 +97,8 @@ async def get_dashboard(request: Request):
     if not user_id:
         raise HTTPException(status_code=401)
 
-    user = await users.find_one({"_id": ObjectId(user_id)})
-    if not user or not user.get("github"):
+    github = await user_store.github_link(ObjectId(user_id))
+    if not github:
         return {
             "metrics": {
                 "weeklyCommits": 0,
@@ -91,9 +127,7 @@ async def get_dashboard(request: Request):
             },
         }
 
-    snapshot = await github_snapshots.find_one(
-        {"user_id": ObjectId(user_id)}
-    )
+    snapshot = await snapshot_store.dashboard_view(ObjectId(user_id))
 
     now = datetime.now(timezone.utc)
 
@@ -111,15 +145,15 @@ async def get_dashboard(request: Request):
         if isinstance(last_synced_at, datetime) and last_synced_at.tzinfo is None:
             last_synced_at = last_synced_at.replace(tzinfo=timezone.utc)
 
+    # Stale-while-revalidate: serve what we have, refresh in the background
+    sync_job = None
     if (
         not snapshot
         or not last_synced_at
         or last_synced_at < now - STALE_AFTER
+        or snapshot.get("rollup_version") != ROLLUP_VERSION
     ):
-        await sync_github_snapshot(ObjectId(user_id))
-        snapshot = await github_snapshots.find_one(
-            {"user_id": ObjectId(user_id)}
-        )
+        sync_job = await enqueue_sync(ObjectId(user_id))
 
     if not snapshot:
         return {
@@ -146,34 +180,83 @@ async def get_dashboard(request: Request):
             "meta": {
                 "source": "github",
                 "lastUpdated": None,
-                "warnings": ["No GitHub activity found yet"],
+                "warnings": ["GitHub sync in progress"]
+                if sync_job
+                else ["No GitHub activity found yet"],
+                "syncStatus": sync_job["status"] if sync_job else None,
+                "syncJobId": str(sync_job["_id"]) if sync_job else None,
             },
         }
 
-    raw_commits = snapshot.get("commits", [])
+    # Same snapshot, time logs, sync state and day => same dashboard
+    updated_at = snapshot.get("updated_at") or snapshot.get("last_synced_at")
+    logs_updated_at = await time_aggregates.last_updated(ObjectId(user_id))
+    version = "|".join([
+        updated_at.isoformat() if isinstance(updated_at, datetime) else str(updated_at),
+        logs_updated_at.isoformat() if isinstance(logs_updated_at, datetime) else "",
+        str(snapshot.get("rollup_version")),
+        f"{sync_job['_id']}:{sync_job['status']}" if sync_job else "",
+        now.date().isoformat(),
+    ])
+    etag = dashboard_cache.etag(user_id, version)
+    cache_headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
 
-    normalized_commits = []
-    for c in raw_commits:
-        committed_at = c.get("committed_at") or c.get("date")
-        if not committed_at:
-            continue
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=cache_headers)
 
-        if isinstance(committed_at, str):
-            dt = datetime.fromisoformat(committed_at)
-        else:
-            dt = committed_at
+    payload = await dashboard_cache.get(user_id, version)
+    if payload is None:
+        payload = jsonable_encoder(await build_dashboard(user_id, snapshot, sync_job, now))
+        await dashboard_cache.set(user_id, version, payload)
 
-        normalized_commits.append(
-            {
-                **c,
-                "date": dt,
-            }
+    return JSONResponse(payload, headers=cache_headers)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+async def build_dashboard(user_id: str, snapshot: dict, sync_job: Optional[dict], now: datetime) -> dict:
+    window_start = now - timedelta(days=SYNC_LOOKBACK_DAYS)
+
+    if snapshot.get("rollup_version") == ROLLUP_VERSION:
+        # Precomputed per-day rollups: O(days) instead of O(commits)
+        rollups = await commit_rollups.find_range(ObjectId(user_id), since=window_start)
+        normalized_commits = normalize_commits(
+            await commit_store.find_range(ObjectId(user_id), limit=5)
         )
+        # Commit sessions were computed at sync time
+        masks = {r["day"]: r["session_mask"] for r in rollups if r.get("session_mask")}
+        weekly_activity = compute_weekly_activity_from_rollups(rollups)
+        streak = compute_streak_from_rollups(rollups)
+        code_churn = compute_code_churn_from_rollups(rollups)
+        repo_stats = compute_repo_stats_from_rollups(rollups)
+        total_commits = sum(r.get("commits", 0) for r in rollups)
+    else:
+        # Rollups not built yet (until the sync queued above runs)
+        if snapshot.get("commit_storage") == COMMIT_STORAGE:
+            raw_commits = await commit_store.find_range(ObjectId(user_id), since=window_start)
+        else:
+            raw_commits = await snapshot_store.legacy_commits(ObjectId(user_id), since=window_start)
+        normalized_commits = normalize_commits(raw_commits)
+        masks = await asyncio.to_thread(commit_session_masks, normalized_commits)
+        weekly_activity = compute_weekly_activity(normalized_commits)
+        streak = compute_streak([c["date"] for c in normalized_commits])
+        code_churn = compute_code_churn(normalized_commits)
+        repo_stats = compute_repo_stats(normalized_commits)
+        total_commits = len(normalized_commits)
 
-    weekly_activity = compute_weekly_activity(normalized_commits)
-    streak = compute_streak([c["date"] for c in normalized_commits])
-    coding_time = compute_coding_time(normalized_commits)
-    code_churn = compute_code_churn(normalized_commits)
+    # Coding time: commit sessions merged with logged time
+    logs = await time_logs_collection.find(
+        {"user_id": ObjectId(user_id), "date": {"$gte": window_start.strftime("%Y-%m-%d")}},
+        {"_id": 0, "date": 1, "minutes": 1, "startTime": 1, "endTime": 1, "started_at": 1, "ended_at": 1},
+    ).to_list(None)
+    activity = estimate_coding_activity(masks, logs, window_start, now)
+    weekly_activity = apply_session_minutes(weekly_activity, activity)
+    coding_time = compute_coding_time_from_sessions(activity)
 
     recent_commits = sorted(
         normalized_commits,
@@ -201,21 +284,6 @@ async def get_dashboard(request: Request):
                 }
             )
 
-    repo_stats: dict[str, dict[str, object]] = {}
-    for commit in normalized_commits:
-        repo_name = commit.get("repo_name")
-        if not repo_name:
-            continue
-        dt = commit["date"]
-        if repo_name not in repo_stats:
-            repo_stats[repo_name] = {
-                "count": 0,
-                "last": dt,
-            }
-        repo_stats[repo_name]["count"] = int(repo_stats[repo_name]["count"]) + 1
-        if dt > repo_stats[repo_name]["last"]:
-            repo_stats[repo_name]["last"] = dt
-
     repos = [
         {
             "name": name,
@@ -234,7 +302,7 @@ async def get_dashboard(request: Request):
             "weeklyCommits": sum(d["commits"] for d in weekly_activity),
             "codingMinutes": sum(d["minutes"] for d in weekly_activity),
             "streakDays": streak,
-            "aiScore": min(100, len(normalized_commits) * 2),
+            "aiScore": min(100, total_commits * 2),
         },
         "weeklyActivity": weekly_activity,
         "codeChurn": code_churn,
@@ -244,7 +312,7 @@ async def get_dashboard(request: Request):
             )["name"]
             if weekly_activity
             else None,
-            "reposTouched": len({c["repo_name"] for c in normalized_commits}),
+            "reposTouched": len(repo_stats),
             "recentCommits": [
                 {
                     "id": c["sha"],
@@ -265,6 +333,10 @@ async def get_dashboard(request: Request):
             "lastUpdated": snapshot["last_synced_at"].isoformat()
             if snapshot.get("last_synced_at")
             else None,
-            "warnings": [],
+            "warnings": ["Refreshing GitHub data in the background"]
+            if sync_job
+            else [],
+            "syncStatus": sync_job["status"] if sync_job else None,
+            "syncJobId": str(sync_job["_id"]) if sync_job else None,
         },
     }
@@ -1,14 +1,14 @@
+from typing import Optional
 from fastapi import APIRouter, Request, HTTPException, status
 from bson import ObjectId
 
-from services.github_sync import sync_github_snapshot
-from config.db import db
+from services.sync_queue import enqueue_sync, format_job, get_job
+from services.data_access import user_store
 
 router = APIRouter(prefix="/api/v1/github", tags=["github"])
-users = db["user"]
 
 @router.post("/sync")
-async def manual_github_sync(request: Request):
+async def manual_github_sync(request: Request, full: bool = False):
     user_id = request.state.user_id
     if not user_id:
         raise HTTPException(
@@ -16,17 +16,35 @@ async def manual_github_sync(request: Request):
             detail="Not authenticated",
         )
 
-    user = await users.find_one({"_id": ObjectId(user_id)})
-    if not user or not user.get("github"):
+    if not await user_store.github_link(ObjectId(user_id)):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="GitHub not connected",
         )
 
-    # Trigger sync (blocking for MVP)
-    await sync_github_snapshot(ObjectId(user_id))
+    # Queued for the background workers; poll /sync/status for progress
+    job = await enqueue_sync(ObjectId(user_id), full=full)
 
     return {
         "success": True,
-        "message": "GitHub data refreshed",
-    }
\ No newline at end of file
+        "message": "GitHub refresh queued",
+        "job": format_job(job),
+    }
+
+@router.get("/sync/status")
+async def github_sync_status(request: Request, job_id: Optional[str] = None):
+    user_id = request.state.user_id
+    if not user_id:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+        )
+
+    job = await get_job(ObjectId(user_id), job_id)
+    if job_id and not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Sync job not found",
+        )
+
+    return {"job": format_job(job)}
@@ -1,9 +1,38 @@
-from fastapi import APIRouter
+import hmac
+import os
+from fastapi import APIRouter, Depends, Header, HTTPException
+from middleware.AuthMiddleware import claims_cache
+from services.ai_result_cache import ai_result_cache
+from services.gemini_service import model_health
+from services.github_cache import cache_stats
+from services.password_hasher import password_hasher
+from services.response_cache import dashboard_cache
+
+# Operators' key for /metrics; the endpoint is off when unset
+METRICS_API_KEY = os.getenv("METRICS_API_KEY")
 
 route = APIRouter(prefix="/api/v1")
 
+
+def require_metrics_key(x_metrics_key: str | None = Header(default=None)):
+    if not METRICS_API_KEY:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_metrics_key or not hmac.compare_digest(x_metrics_key, METRICS_API_KEY):
+        raise HTTPException(status_code=401, detail="Invalid metrics key")
+
 @route.get("/health")
 def indexView():
     return {
         "msg" : "Server is running"
     }
+
+@route.get("/metrics", dependencies=[Depends(require_metrics_key)])
+def metricsView():
+    return {
+        "githubCache": cache_stats.as_dict(),
+        "dashboardCache": dashboard_cache.as_dict(),
+        "passwordHasher": password_hasher.as_dict(),
+        "authClaimsCache": claims_cache.as_dict(),
+        "aiResultCache": ai_result_cache.as_dict(),
+        "geminiModels": model_health.as_dict(),
+    }
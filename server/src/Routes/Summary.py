@@ -1,30 +1,68 @@
-from fastapi import APIRouter, Request, HTTPException
+import json
+from fastapi import APIRouter, Depends, Request, HTTPException, Response
+from fastapi.responses import StreamingResponse
 from bson import ObjectId
+import httpx
 from datetime import datetime, timezone
 from config.db import db
-from services.gemini_service import generate_ai_summary
+from services.ai_result_cache import ai_result_cache, context_key
+from services.daily_summary import (
+    OFFLINE_MARKER,
+    build_ai_context,
+    build_summary_doc,
+    cached_ai_summary,
+    recent_commits,
+    save_summary,
+    start_of_day,
+)
+from services.gemini_service import stream_ai_summary
+from services.http_clients import get_gemini_client
+from services.pagination import InvalidCursor, fetch_page
 
 router = APIRouter(prefix="/api/v1/summary", tags=["summary"])
 
-github_snapshots = db["github_snapshots"]
 summaries_collection = db["summaries"]
 
 
 # GET SUMMARIES (Paginated)
 @router.get("/")
-async def get_summaries(request: Request, limit: int = 10, skip: int = 0):
+async def get_summaries(
+    request: Request,
+    response: Response,
+    limit: int = 10,
+    skip: int = 0,
+    cursor: str | None = None,
+):
+    """
+    Newest first. Pass the X-Next-Cursor header of one page as `cursor` to
+    get the next; `skip` is still honoured for older clients.
+    """
     user_id = request.state.user_id
     if not user_id:
         raise HTTPException(status_code=401, detail="Unauthorized")
 
-    cursor = (
-        summaries_collection.find({"user_id": ObjectId(user_id)})
-        .sort("created_at", -1)
-        .skip(skip)
-        .limit(limit)
-    )
+    limit = max(1, min(limit, 100))
+
+    if skip and not cursor:
+        summaries = await (
+            summaries_collection.find({"user_id": ObjectId(user_id)})
+            .sort([("created_at", -1), ("_id", -1)])
+            .skip(skip)
+            .limit(limit)
+            .to_list(length=limit)
+        )
+        next_cursor = None
+    else:
+        try:
+            summaries, next_cursor = await fetch_page(
+                summaries_collection, {"user_id": ObjectId(user_id)}, "created_at", cursor, limit
+            )
+        except InvalidCursor:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
 
-    summaries = await cursor.to_list(length=limit)
+    # The body stays a plain list; the next page is announced in a header
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
 
     formatted = []
     for s in summaries:
@@ -44,21 +82,23 @@ async def get_summaries(request: Request, limit: int = 10, skip: int = 0):
 
 # GENERATE DAILY SUMMARY
 @router.post("/generate")
-async def generate_summary(request: Request):
+async def generate_summary(
+    request: Request,
+    gemini_client: httpx.AsyncClient | None = Depends(get_gemini_client),
+):
     user_id = request.state.user_id
     if not user_id:
         raise HTTPException(status_code=401, detail="Unauthorized")
 
-    today = datetime.now(timezone.utc).date()
-    start_of_day = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    now = datetime.now(timezone.utc)
 
     # 🔒 Prevent duplicate summary for today
     existing = await summaries_collection.find_one({
         "user_id": ObjectId(user_id),
-        "created_at": {"$gte": start_of_day}
+        "created_at": {"$gte": start_of_day(now)}
     })
 
-    if existing and "(Offline Mode)" not in existing["content"]:
+    if existing and OFFLINE_MARKER not in existing["content"]:
         return {
             "summary": existing["content"],
             "mood": existing.get("mood"),
@@ -66,137 +106,114 @@ async def generate_summary(request: Request):
             "cached": True
         }
     
-    # If regenerating (because it was offline mode), remove the old one to avoid duplicates
-    if existing:
-        await summaries_collection.delete_one({"_id": existing["_id"]})
-
-    # 📦 Fetch GitHub snapshot
-    snapshot = await github_snapshots.find_one({"user_id": ObjectId(user_id)})
-    if not snapshot:
+    # 📦 Fetch GitHub activity (last 24h, or the latest 5 commits for demo purposes)
+    commits = await recent_commits(ObjectId(user_id), now)
+    if commits is None:
         return {"summary": "No GitHub activity found to summarize. Connect your account or sync first."}
 
-    all_commits = snapshot.get("commits", [])
-
-    from datetime import timedelta
-    now = datetime.now(timezone.utc)
-    last_24h = now - timedelta(hours=24)
-
-    def is_recent(commit):
-        try:
-            committed_at = commit.get("committed_at")
-            if isinstance(committed_at, str):
-                committed_at = datetime.fromisoformat(committed_at.replace("Z", "+00:00"))
-            return committed_at and last_24h <= committed_at <= now
-        except Exception:
-            return False
-
-    commits = [c for c in all_commits if is_recent(c)]
-
-    # If no recent commits, check if there are ANY commits in the snapshot
-    # This is useful for testing/demo if the user hasn't committed in 24h but wants to see the feature work
-    if not commits:
-         # Fallback to recent 5 commits from history for demo purposes if no 24h activity
-         commits = all_commits[:5]
-    
     if not commits:
         return {"summary": "No commits found in your history. Go build something 🚀"}
 
-    commit_count = len(commits)
-    
-    # Normalize repo name extraction
-    for c in commits:
-        c["repo_name"] = c.get("repo_name") or c.get("repo") or "unknown"
-
-    repo_count = len(set(c["repo_name"] for c in commits))
-
-    ai_context = {
-        "commit_count": commit_count,
-        "repo_count": repo_count,
-        "commits": [
-            {
-                "repo": c["repo_name"],
-                "message": c.get("message"),
-                "additions": c.get("additions"),
-                "deletions": c.get("deletions")
-            }
-            for c in commits[:10]
-        ]
-    }
-
-    ai_result = await generate_ai_summary(ai_context)
-
-
-    # AI SUCCESS
-    if ai_result:
-        ai_score = ai_result.get("score", 5)
-
-        base_score = min(10, (commit_count * 0.7) + (repo_count * 0.5))
-        score = round((base_score * 0.6) + (ai_score * 0.4))
-        score = max(1, min(score, 10))
-
-        summary = f"## 🚀 Daily Progress Report\n\n"
-        summary += f"You made **{commit_count} commits** across **{repo_count} repositories**.\n\n"
-        summary += "### ✨ Highlights\n"
-        for h in ai_result.get("highlights", []):
-            summary += f"- {h}\n"
-
-        if ai_result.get("insights"):
-            summary += "\n### 🧠 Insights\n"
-            for i in ai_result.get("insights", []):
-                summary += f"- {i}\n"
-
-        if ai_result.get("improvements"):
-            summary += "\n### 📈 Improvement Suggestion\n"
-            for imp in ai_result.get("improvements", []):
-                summary += f"- {imp}\n"
-
-        summary += f"\n**Productivity Score:** {score}/10"
+    ai_result, ai_cache_hit = await cached_ai_summary(build_ai_context(commits), client=gemini_client)
 
+    # 💾 Save to DB with analytics (replaces an offline-mode summary)
+    new_summary, saved = await save_summary(
+        summaries_collection,
+        build_summary_doc(ObjectId(user_id), commits, ai_result),
+        replaces=existing and existing["_id"],
+    )
 
-    # FALLBACK (No AI)
-    else:
-        repos = set(c["repo_name"] for c in commits)
-        repo_list = ", ".join(repos)
+    return {
+        "summary": new_summary["content"],
+        "mood": new_summary.get("mood"),
+        "stats": new_summary.get("stats", {}),
+        "cached": not saved,
+        "meta": {"aiCacheHit": ai_cache_hit},
+    }
 
-        summary = "## 🚀 Daily Progress Report (Offline Mode)\n\n"
-        summary += f"You made **{commit_count} commits** across **{len(repos)} repositories** ({repo_list}).\n\n"
 
-        summary += "### 📋 Key Updates\n"
-        for c in commits[:5]:
-            summary += f"- **{c['repo_name']}**: {c.get('message','Update')}\n"
+# GENERATE DAILY SUMMARY (STREAMING)
+def sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
 
-        if commit_count > 5:
-            summary += f"\n*...and {commit_count - 5} more updates.*\n"
 
-        score = min(10, commit_count)
-        summary += f"\n**Productivity Score:** {score}/10"
+@router.post("/generate/stream")
+async def generate_summary_stream(
+    request: Request,
+    gemini_client: httpx.AsyncClient | None = Depends(get_gemini_client),
+):
+    """
+    Same result as /generate, as Server-Sent Events: `start` right away,
+    `token` for each chunk of model output, then `done` with the body
+    /generate would have returned (saved to summaries the same way).
+    """
+    user_id = request.state.user_id
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Unauthorized")
 
-    # 🎭 Mood Calculation
-    if score >= 8:
-        mood = "productive"
-    elif score >= 5:
-        mood = "steady"
-    else:
-        mood = "struggling"
+    async def events():
+        yield sse("start", {})
 
-    # 💾 Save to DB with analytics
-    new_summary = {
-        "user_id": ObjectId(user_id),
-        "content": summary,
-        "created_at": datetime.now(timezone.utc),
-        "mood": mood,
-        "stats": {
-            "commit_count": commit_count,
-            "repo_count": repo_count,
-            "score": score
-        }
-    }
+        now = datetime.now(timezone.utc)
+        existing = await summaries_collection.find_one({
+            "user_id": ObjectId(user_id),
+            "created_at": {"$gte": start_of_day(now)}
+        })
 
-    await summaries_collection.insert_one(new_summary)
+        if existing and OFFLINE_MARKER not in existing["content"]:
+            yield sse("done", {
+                "summary": existing["content"],
+                "mood": existing.get("mood"),
+                "stats": existing.get("stats", {}),
+                "cached": True
+            })
+            return
+
+        commits = await recent_commits(ObjectId(user_id), now)
+        if commits is None:
+            yield sse("done", {"summary": "No GitHub activity found to summarize. Connect your account or sync first."})
+            return
+
+        if not commits:
+            yield sse("done", {"summary": "No commits found in your history. Go build something 🚀"})
+            return
+
+        ai_context = build_ai_context(commits)
+        ai_key = context_key(ai_context)
+        ai_result = await ai_result_cache.get(ai_key)
+        ai_cache_hit = ai_result is not None
+
+        if not ai_cache_hit:
+            text = []
+            try:
+                async for chunk in stream_ai_summary(ai_context, client=gemini_client):
+                    text.append(chunk)
+                    yield sse("token", {"text": chunk})
+                ai_result = json.loads("".join(text)) if text else None
+            except Exception as e:
+                print("Streaming summary failed, falling back to offline mode:", e)
+                ai_result = None
+
+            if ai_result:
+                await ai_result_cache.set(ai_key, ai_result)
+
+        # Replace an offline-mode summary only once the new one is ready
+        new_summary, saved = await save_summary(
+            summaries_collection,
+            build_summary_doc(ObjectId(user_id), commits, ai_result),
+            replaces=existing and existing["_id"],
+        )
+
+        yield sse("done", {
+            "summary": new_summary["content"],
+            "mood": new_summary.get("mood"),
+            "stats": new_summary.get("stats", {}),
+            "cached": not saved,
+            "meta": {"aiCacheHit": ai_cache_hit},
+        })
 
-    return {
-        "summary": summary,
-        "mood": mood,
-        "stats": new_summary["stats"],
-        "cached": False
-    }
\ No newline at end of file
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,53 +1,67 @@
 from fastapi import APIRouter, Request, HTTPException
 from config.db import db
-from schemas.time_logs import TimeLogCreate, TimeLogResponse
+from schemas.time_logs import Heartbeat, TimeLogCreate, TimeLogResponse
+from services.heartbeats import HeartbeatSessionizer
+from services.pagination import InvalidCursor, fetch_page
+from services.time_aggregates import time_aggregates
+from services.time_ingest import (
+    TIME_LOG_BULK_MAX,
+    TooManyEntries,
+    insert_time_logs,
+    read_ndjson,
+    time_log_doc,
+)
+from pymongo.errors import DuplicateKeyError
 from bson import ObjectId
+from datetime import date, datetime, timedelta, timezone
 from typing import List, Dict, Any
 import uuid
 
 router = APIRouter(prefix="/api/v1/time", tags=["time"])
 time_logs_collection = db["time_logs"]
+heartbeat_sessionizer = HeartbeatSessionizer(time_logs_collection, time_aggregates)
+
+def format_time_log(log: dict) -> dict:
+    return {
+        "id": str(log["_id"]),
+        "project": log.get("project", "Unknown"),
+        "description": log.get("description", ""),
+        "minutes": log.get("minutes", 0),
+        "date": log.get("date", ""),
+        "startTime": log.get("startTime"),
+        "endTime": log.get("endTime"),
+        "isDeepWork": log.get("isDeepWork", False),
+        "source": log.get("source", "synced"),
+        "tags": log.get("tags", [])
+    }
 
 @router.get("/logs")
-async def get_time_logs(request: Request):
+async def get_time_logs(request: Request, limit: int = 50, cursor: str | None = None):
     user_id = request.state.user_id
     if not user_id:
         raise HTTPException(status_code=401, detail="Unauthorized")
 
-    # Fetch recent logs for the list
-    cursor = time_logs_collection.find({"user_id": ObjectId(user_id)}).sort("date", -1).limit(50)
-    recent_logs_docs = await cursor.to_list(length=50)
-
-    recent_logs = []
-    for log in recent_logs_docs:
-        recent_logs.append({
-            "id": str(log["_id"]),
-            "project": log.get("project", "Unknown"),
-            "description": log.get("description", ""),
-            "minutes": log.get("minutes", 0),
-            "date": log.get("date", ""),
-            "startTime": log.get("startTime"),
-            "endTime": log.get("endTime"),
-            "isDeepWork": log.get("isDeepWork", False),
-            "source": log.get("source", "synced"),
-            "tags": log.get("tags", [])
-        })
-
-    # Aggregate distribution (all time)
-    pipeline = [
-        {"$match": {"user_id": ObjectId(user_id)}},
-        {"$group": {"_id": "$project", "totalMinutes": {"$sum": "$minutes"}}}
-    ]
-    agg_results = await time_logs_collection.aggregate(pipeline).to_list(length=None)
-    
-    distribution = [
-        {"project": res["_id"], "minutes": res["totalMinutes"]}
-        for res in agg_results
-    ]
+    # Fetch recent logs for the list; nextCursor pages further back
+    try:
+        recent_logs_docs, next_cursor = await fetch_page(
+            time_logs_collection,
+            {"user_id": ObjectId(user_id)},
+            "date",
+            cursor,
+            max(1, min(limit, 200)),
+        )
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    recent_logs = [format_time_log(log) for log in recent_logs_docs]
+
+    # Distribution (all time), from the per-day aggregates
+    distribution = await time_aggregates.distribution(ObjectId(user_id))
 
     return {
         "distribution": distribution,
-        "recentLogs": recent_logs
+        "recentLogs": recent_logs,
+        "nextCursor": next_cursor,
     }
 
 @router.post("/logs")
@@ -56,22 +70,92 @@ async def create_time_log(request: Request, log: TimeLogCreate):
     if not user_id:
         raise HTTPException(status_code=401, detail="Unauthorized")
 
-    new_log = log.dict()
-    new_log["user_id"] = ObjectId(user_id)
+    new_log = time_log_doc(ObjectId(user_id), log)
     # Ensure we use a consistent date format or rely on what's passed
     # Schema says date is str (YYYY-MM-DD)
 
-    result = await time_logs_collection.insert_one(new_log)
-    
+    try:
+        await time_logs_collection.insert_one(new_log)
+    except DuplicateKeyError:
+        # Retried request: return the entry stored the first time
+        existing = await time_logs_collection.find_one({"idempotency_scope": new_log["idempotency_scope"]})
+        return format_time_log(existing)
+
+    await time_aggregates.apply(ObjectId(user_id), [new_log])
+
+    return format_time_log(new_log)
+
+@router.post("/logs/bulk")
+async def create_time_logs_bulk(request: Request):
+    """
+    Many entries in one request, as a JSON array or NDJSON
+    (Content-Type: application/x-ndjson). Reports per-entry errors by index.
+    """
+    user_id = request.state.user_id
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Unauthorized")
+
+    content_type = request.headers.get("content-type", "")
+    try:
+        if "ndjson" in content_type or "jsonlines" in content_type:
+            items = await read_ndjson(request.stream())
+        else:
+            items = await request.json()
+    except TooManyEntries as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+    if len(items) > TIME_LOG_BULK_MAX:
+        raise HTTPException(status_code=413, detail=f"More than {TIME_LOG_BULK_MAX} entries")
+
+    return await insert_time_logs(time_logs_collection, time_aggregates, ObjectId(user_id), items)
+
+@router.post("/heartbeats")
+async def ingest_heartbeats(request: Request, heartbeats: List[Heartbeat]):
+    """
+    Raw editor activity (project, timestamp, optional file). Merged into
+    sessions server-side; only the resulting sessions are stored.
+    """
+    user_id = request.state.user_id
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Unauthorized")
+
+    if len(heartbeats) > TIME_LOG_BULK_MAX:
+        raise HTTPException(status_code=413, detail=f"More than {TIME_LOG_BULK_MAX} heartbeats")
+
+    sessions = await heartbeat_sessionizer.ingest(
+        ObjectId(user_id),
+        [hb.dict() for hb in heartbeats],
+    )
+
     return {
-        "id": str(result.inserted_id),
-        "project": new_log["project"],
-        "description": new_log["description"],
-        "minutes": new_log["minutes"],
-        "date": new_log["date"],
-        "startTime": new_log.get("startTime"),
-        "endTime": new_log.get("endTime"),
-        "isDeepWork": new_log.get("isDeepWork", False),
-        "source": new_log.get("source", "synced"),
-        "tags": new_log.get("tags", [])
-    }
\ No newline at end of file
+        "received": len(heartbeats),
+        "sessions": [format_time_log(s) for s in sessions],
+    }
+
+def _parse_day(value: str | None, default: date) -> str:
+    if value is None:
+        return default.isoformat()
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date().isoformat()
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid date '{value}', expected YYYY-MM-DD")
+
+
+@router.get("/analytics")
+async def get_time_analytics(request: Request, start: str | None = None, end: str | None = None):
+    """Distribution, daily totals and deep-work ratio for [start, end] (default: last 30 days)."""
+    user_id = request.state.user_id
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Unauthorized")
+
+    today = datetime.now(timezone.utc).date()
+    end = _parse_day(end, today)
+    start = _parse_day(start, today - timedelta(days=29))
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+
+    return await time_aggregates.analytics(ObjectId(user_id), start, end)
@@ -1,4 +1,5 @@
 import os
+from contextlib import asynccontextmanager
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -18,8 +19,29 @@ from Routes.Github import router as manual_github_sync
 from Routes.Summary import router as summary_router
 from Routes.TimeRoutes import router as time_router
 from config.db import db
+from config.indexes import VERIFY_QUERY_PLANS, apply_indexes, verify_query_plans
+from services.http_clients import start_http_clients, close_http_clients
+from services.password_hasher import password_hasher
+from services.sync_queue import start_sync_workers, stop_sync_workers
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Unique, compound and TTL indexes from the registry
+    await apply_indexes(db)
+    if VERIFY_QUERY_PLANS:
+        await verify_query_plans(db)
+    # Shared, pooled HTTP clients for GitHub and Gemini
+    await start_http_clients()
+    # Background GitHub sync workers (drain the sync_jobs queue)
+    await start_sync_workers()
+    yield
+    await stop_sync_workers()
+    await close_http_clients()
+    password_hasher.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(AuthMiddleware)
 
@@ -40,6 +62,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Cross-origin JS can only read response headers listed here
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 app.include_router(PublicRoute) 
@@ -0,0 +1,204 @@
+import os
+from datetime import datetime, timezone
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+# Mongo entries not read by any sync for this long are evicted
+COMMIT_STATS_TTL_DAYS = int(os.getenv("COMMIT_STATS_TTL_DAYS", "180"))
+# Cached GitHub responses not refreshed for this long are evicted
+GITHUB_HTTP_CACHE_TTL_DAYS = int(os.getenv("GITHUB_HTTP_CACHE_TTL_DAYS", "30"))
+# Finished (done or failed) sync jobs are kept this long for status polling
+SYNC_JOB_TTL_DAYS = int(os.getenv("SYNC_JOB_TTL_DAYS", "7"))
+# Fail startup if a hot query is not served by an index
+VERIFY_QUERY_PLANS = os.getenv("VERIFY_QUERY_PLANS", "false").lower() == "true"
+
+# -------------------- INDEX REGISTRY --------------------
+# Every index the app relies on, per collection. Applied on startup;
+# create_indexes is a no-op for indexes that already exist.
+
+INDEXES: dict[str, list[IndexModel]] = {
+    "user": [
+        IndexModel([("email", ASCENDING)], unique=True, name="email_unique"),
+        # Sparse: users without a linked GitHub account are not indexed
+        IndexModel([("github.github_id", ASCENDING)], unique=True, sparse=True, name="github_id_unique"),
+    ],
+    "oauth_states": [
+        IndexModel([("state", ASCENDING)], unique=True, name="state_unique"),
+        # Abandoned logins disappear on their own
+        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0, name="expires_at_ttl"),
+    ],
+    "github_snapshots": [
+        IndexModel([("user_id", ASCENDING)], unique=True, name="user_unique"),
+    ],
+    "github_commits": [
+        IndexModel([("user_id", ASCENDING), ("sha", ASCENDING)], unique=True, name="user_sha_unique"),
+        IndexModel([("user_id", ASCENDING), ("committed_at", DESCENDING)], name="user_committed_at"),
+        IndexModel(
+            [("user_id", ASCENDING), ("repo_name", ASCENDING), ("committed_at", DESCENDING)],
+            name="user_repo_committed_at",
+        ),
+    ],
+    "github_daily_rollups": [
+        IndexModel([("user_id", ASCENDING), ("day", DESCENDING)], unique=True, name="user_day_unique"),
+    ],
+    "commit_stats": [
+        IndexModel(
+            [("last_used_at", ASCENDING)],
+            expireAfterSeconds=COMMIT_STATS_TTL_DAYS * 24 * 3600,
+            name="last_used_at_ttl",
+        ),
+    ],
+    "github_http_cache": [
+        # Raw GitHub response bodies; dropped once not refreshed for a while
+        IndexModel(
+            [("updated_at", ASCENDING)],
+            expireAfterSeconds=GITHUB_HTTP_CACHE_TTL_DAYS * 24 * 3600,
+            name="updated_at_ttl",
+        ),
+        # Per-user trimming and account deletion
+        IndexModel([("user_key", ASCENDING), ("updated_at", ASCENDING)], name="user_key_updated_at"),
+    ],
+    "sync_jobs": [
+        # One queued/running job per user
+        IndexModel(
+            [("user_id", ASCENDING), ("active", ASCENDING)],
+            unique=True,
+            partialFilterExpression={"active": True},
+            name="user_active_unique",
+        ),
+        IndexModel([("status", ASCENDING), ("created_at", ASCENDING)], name="status_created_at"),
+        IndexModel(
+            [("finished_at", ASCENDING)],
+            expireAfterSeconds=SYNC_JOB_TTL_DAYS * 24 * 3600,
+            name="finished_at_ttl",
+        ),
+    ],
+    "dashboard_cache": [
+        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0, name="expires_at_ttl"),
+    ],
+    "ai_summary_cache": [
+        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0, name="expires_at_ttl"),
+        # Oldest-first trimming when the cache is over its size bound
+        IndexModel([("created_at", ASCENDING)], name="created_at"),
+    ],
+    "summaries": [
+        # Keyset pagination: (created_at, _id) is unique, so pages never overlap
+        IndexModel(
+            [("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="user_created_at_id",
+        ),
+        # One summary per user and UTC day; sparse so older summaries without it are not indexed
+        IndexModel([("user_day", ASCENDING)], unique=True, sparse=True, name="user_day_unique"),
+    ],
+    "time_logs": [
+        IndexModel(
+            [("user_id", ASCENDING), ("date", DESCENDING), ("_id", DESCENDING)],
+            name="user_date_id",
+        ),
+        # "<user_id>:<idempotencyKey>"; sparse so entries without a key are not indexed
+        IndexModel([("idempotency_scope", ASCENDING)], unique=True, sparse=True, name="idempotency_scope_unique"),
+        # Open heartbeat sessions a new batch may extend
+        IndexModel(
+            [("user_id", ASCENDING), ("project", ASCENDING), ("ended_at", ASCENDING)],
+            partialFilterExpression={"source": "heartbeat"},
+            name="heartbeat_sessions",
+        ),
+    ],
+    "time_log_daily": [
+        # One row per user, day and project; also serves date-range reads
+        IndexModel(
+            [("user_id", ASCENDING), ("date", ASCENDING), ("project", ASCENDING)],
+            unique=True,
+            name="user_date_project_unique",
+        ),
+        # Latest change per user, part of the dashboard's cache version
+        IndexModel([("user_id", ASCENDING), ("updated_at", DESCENDING)], name="user_updated_at"),
+    ],
+}
+
+
+async def apply_indexes(database) -> list[str]:
+    """
+    Creates every registered index. A failing index (e.g. duplicates in
+    existing data) is reported and skipped so the app still starts.
+    Returns the names of indexes that could not be created.
+    """
+    failed = []
+    for name, models in INDEXES.items():
+        for model in models:
+            try:
+                await database[name].create_indexes([model])
+            except OperationFailure as e:
+                index_name = model.document["name"]
+                print(f"Could not create index {name}.{index_name}:", e)
+                failed.append(f"{name}.{index_name}")
+    return failed
+
+
+# -------------------- QUERY PLAN CHECK --------------------
+# The app's hot queries, shaped like the real ones. Each must be served by
+# an index; a COLLSCAN here means a missing or unusable index.
+
+def hot_queries() -> list[tuple[str, dict, list | None]]:
+    user_id = ObjectId()
+    now = datetime.now(timezone.utc)
+    return [
+        ("user", {"email": "someone@example.com"}, None),
+        ("user", {"github.github_id": 1}, None),
+        ("oauth_states", {"state": "state-token"}, None),
+        ("github_snapshots", {"user_id": user_id}, None),
+        ("github_commits", {"user_id": user_id, "committed_at": {"$gte": now}}, [("committed_at", -1)]),
+        ("github_commits", {"user_id": user_id, "sha": "0" * 40}, None),
+        ("github_daily_rollups", {"user_id": user_id, "day": {"$gte": now}}, [("day", -1)]),
+        ("github_http_cache", {"user_key": str(user_id)}, [("updated_at", 1)]),
+        (
+            "sync_jobs",
+            {"$or": [
+                {"status": "queued", "not_before": {"$not": {"$gt": now}}},
+                {"status": "running", "started_at": {"$lt": now}},
+            ]},
+            [("created_at", 1)],
+        ),
+        ("sync_jobs", {"user_id": user_id, "active": True}, None),
+        ("summaries", {"user_id": user_id}, [("created_at", -1), ("_id", -1)]),
+        ("summaries", {"user_day": f"{user_id}:2024-01-01"}, None),
+        (
+            "summaries",
+            {"user_id": user_id, "$or": [{"created_at": {"$lt": now}}, {"created_at": now, "_id": {"$lt": user_id}}]},
+            [("created_at", -1), ("_id", -1)],
+        ),
+        ("time_logs", {"user_id": user_id}, [("date", -1), ("_id", -1)]),
+        ("time_logs", {"user_id": user_id, "date": {"$gte": "2024-01-01"}}, None),
+        ("time_log_daily", {"user_id": user_id, "date": {"$gte": "2024-01-01", "$lte": "2024-01-31"}}, None),
+        ("time_log_daily", {"user_id": user_id}, [("updated_at", -1)]),
+    ]
+
+
+def _has_collscan(plan) -> bool:
+    if isinstance(plan, dict):
+        if plan.get("stage") == "COLLSCAN":
+            return True
+        return any(_has_collscan(v) for v in plan.values())
+    if isinstance(plan, list):
+        return any(_has_collscan(v) for v in plan)
+    return False
+
+
+async def find_collection_scans(database) -> list[str]:
+    """Runs explain() on each hot query; returns the ones that scan the collection."""
+    scans = []
+    for name, query, sort in hot_queries():
+        cursor = database[name].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        explained = await cursor.explain()
+        if _has_collscan(explained.get("queryPlanner", {}).get("winningPlan")):
+            scans.append(f"{name}: {query}")
+    return scans
+
+
+async def verify_query_plans(database) -> None:
+    scans = await find_collection_scans(database)
+    if scans:
+        raise RuntimeError("Hot queries fall back to COLLSCAN:\n" + "\n".join(scans))
@@ -1,40 +1,129 @@
+import hashlib
 import os
+import time
+from collections import OrderedDict
 from fastapi import Request
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import cookie_parser
 import jwt
 from jwt import ExpiredSignatureError, InvalidTokenError
 
 JWT_SECRET = os.getenv("JWT_SECRET_KEY")
+# Verified tokens remembered between requests (one entry per live session)
+AUTH_CLAIMS_CACHE_SIZE = int(os.getenv("AUTH_CLAIMS_CACHE_SIZE", "10000"))
 
-class AuthMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        request.state.user_id = None
-        request.state.user_email = None
 
-        token = request.cookies.get("access_token")
+class ClaimsCache:
+    """
+    Verified JWT claims keyed by the token's SHA-256 digest, kept until the
+    token's own `exp`. A hit skips the HS256 verification entirely; a miss
+    (or an expired entry) goes through jwt.decode as before.
+    """
 
-        if token:
-            try:
-                payload = jwt.decode(
-                    token,
-                    JWT_SECRET,
-                    algorithms=["HS256"],
-                )
+    def __init__(self, secret: str | None = JWT_SECRET, max_entries: int = AUTH_CLAIMS_CACHE_SIZE):
+        self.secret = secret
+        self.max_entries = max_entries
+        self._lru: OrderedDict[bytes, tuple[float, dict]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def verify(self, token: str) -> dict:
+        key = hashlib.sha256(token.encode("utf-8")).digest()
+        entry = self._lru.get(key)
+        if entry is not None:
+            expires_at, claims = entry
+            if expires_at > time.time():
+                self._lru.move_to_end(key)
+                self.hits += 1
+                return claims
+            del self._lru[key]
+
+        self.misses += 1
+        # Raises ExpiredSignatureError / InvalidTokenError
+        claims = jwt.decode(token, self.secret, algorithms=["HS256"])
+
+        # Tokens without an expiry are verified every time
+        if isinstance(claims.get("exp"), (int, float)):
+            self._lru[key] = (claims["exp"], claims)
+            while len(self._lru) > self.max_entries:
+                self._lru.popitem(last=False)
+        return claims
+
+    def as_dict(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._lru),
+        }
+
+
+claims_cache = ClaimsCache()
+
+
+def _cookie(scope, name: str) -> str | None:
+    for key, value in scope["headers"]:
+        if key == b"cookie":
+            return cookie_parser(value.decode("latin-1")).get(name)
+    return None
 
-                request.state.user_id = payload.get("sub")
-                request.state.user_email = payload.get("email")
 
+class AuthMiddleware:
+    """
+    Pure ASGI: resolves the `access_token` cookie to claims once per request
+    and leaves them in request.state (user_id, user_email, auth_claims).
+    """
+
+    def __init__(self, app, cache: ClaimsCache | None = None):
+        self.app = app
+        self.cache = cache or claims_cache
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        state = scope.setdefault("state", {})
+        state["user_id"] = None
+        state["user_email"] = None
+        state["auth_claims"] = None
+
+        token = _cookie(scope, "access_token")
+
+        if token:
+            try:
+                claims = self.cache.verify(token)
             except ExpiredSignatureError:
-                return JSONResponse(
+                response = JSONResponse(
                     status_code=401,
                     content={"detail": "Session expired"},
                 )
+                await response(scope, receive, send)
+                return
             except InvalidTokenError:
-                return JSONResponse(
+                response = JSONResponse(
                     status_code=401,
                     content={"detail": "Invalid authentication token"},
                 )
+                await response(scope, receive, send)
+                return
+
+            state["user_id"] = claims.get("sub")
+            state["user_email"] = claims.get("email")
+            state["auth_claims"] = claims
+
+        await self.app(scope, receive, send)
+
+
+def request_claims(request: Request) -> dict | None:
+    """
+    Claims the middleware verified for this request. Falls back to
+    verifying the cookie when the middleware is not installed.
+    Raises InvalidTokenError for a bad cookie in that case.
+    """
+    if "auth_claims" in request.scope.get("state", {}):
+        return request.state.auth_claims
 
-        response = await call_next(request)
-        return response
\ No newline at end of file
+    token = request.cookies.get("access_token")
+    if not token:
+        return None
+    return claims_cache.verify(token)
@@ -5,6 +5,8 @@ class DashboardMeta(BaseModel):
     source: Literal["demo", "github"]
     lastUpdated: Optional[str] = None
     warnings: Optional[List[str]] = None
+    syncStatus: Optional[Literal["queued", "running", "done", "failed"]] = None
+    syncJobId: Optional[str] = None
 
 class DashboardMetrics(BaseModel):
     weeklyCommits: Optional[int] = None
@@ -1,3 +1,4 @@
+from datetime import datetime
 from pydantic import BaseModel
 from typing import Optional, List
 
@@ -13,7 +14,14 @@ class TimeLogBase(BaseModel):
 
 class TimeLogCreate(TimeLogBase):
     source: str = "synced"
+    # Client-chosen; resending an entry with the same key is a no-op
+    idempotencyKey: Optional[str] = None
 
 class TimeLogResponse(TimeLogBase):
     id: str
-    source: str = "synced"
\ No newline at end of file
+    source: str = "synced"
+
+class Heartbeat(BaseModel):
+    project: str
+    timestamp: datetime
+    file: Optional[str] = None
@@ -1,3 +1,8 @@
+# Bump whenever the prompt or response format changes; cached AI results
+# produced by an older template are then ignored.
+PROMPT_TEMPLATE_VERSION = 1
+
+
 def build_daily_summary_prompt(payload: dict) -> str:
     return f"""
 You are a senior software engineering productivity coach reviewing a developer's last 24 hours of work.
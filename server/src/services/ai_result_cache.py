@@ -0,0 +1,105 @@
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+from config.db import db
+from services.AI_prompt import PROMPT_TEMPLATE_VERSION
+
+# -------------------- CONFIG --------------------
+
+AI_CACHE_TTL = int(os.getenv("AI_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+AI_CACHE_MAX_ENTRIES = int(os.getenv("AI_CACHE_MAX_ENTRIES", "10000"))
+
+
+def context_key(ai_context: dict, template_version: int = PROMPT_TEMPLATE_VERSION) -> str:
+    """Stable digest of the prompt payload: same commits, same key."""
+    payload = json.dumps(ai_context, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(f"v{template_version}:{payload}".encode("utf-8")).hexdigest()
+
+
+class AIResultCache:
+    """
+    Parsed Gemini results keyed by `context_key`, in an in-process LRU in
+    front of a Mongo collection (expired by a TTL index, trimmed to
+    `max_entries` oldest-first). Only successful results are stored, so an
+    offline-mode summary is retried on the next request.
+    """
+
+    def __init__(
+        self,
+        collection=None,
+        ttl: int = AI_CACHE_TTL,
+        max_entries: int = AI_CACHE_MAX_ENTRIES,
+    ):
+        self.collection = collection
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lru: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> dict | None:
+        entry = self._lru.get(key)
+        if entry is not None:
+            expires_at, result = entry
+            if expires_at > time.monotonic():
+                self._lru.move_to_end(key)
+                self.hits += 1
+                return result
+            del self._lru[key]
+
+        if self.collection is not None:
+            doc = await self.collection.find_one(
+                {"_id": key, "expires_at": {"$gt": datetime.now(timezone.utc)}},
+                {"result": 1},
+            )
+            if doc:
+                self._remember(key, doc["result"])
+                self.hits += 1
+                return doc["result"]
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, result: dict) -> None:
+        self._remember(key, result)
+
+        if self.collection is None:
+            return
+
+        now = datetime.now(timezone.utc)
+        await self.collection.update_one(
+            {"_id": key},
+            {"$set": {
+                "result": result,
+                "created_at": now,
+                "expires_at": now + timedelta(seconds=self.ttl),
+            }},
+            upsert=True,
+        )
+
+        excess = await self.collection.count_documents({}) - self.max_entries
+        if excess > 0:
+            oldest = await self.collection.find({}, {"_id": 1}).sort("created_at", 1).limit(excess).to_list(length=excess)
+            await self.collection.delete_many({"_id": {"$in": [d["_id"] for d in oldest]}})
+
+    def _remember(self, key: str, result: dict) -> None:
+        self._lru[key] = (time.monotonic() + self.ttl, result)
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    def as_dict(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRatio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": len(self._lru),
+        }
+
+
+ai_result_cache = AIResultCache(collection=db["ai_summary_cache"])
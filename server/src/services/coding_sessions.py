@@ -0,0 +1,196 @@
+import os
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+# -------------------- CONFIG --------------------
+
+# Commits to one repo closer than this belong to the same coding session
+COMMIT_SESSION_GAP_MINUTES = int(os.getenv("COMMIT_SESSION_GAP_MINUTES", "120"))
+# Work credited before a session's first commit (all a lone commit counts for)
+COMMIT_SESSION_LEAD_MINUTES = int(os.getenv("COMMIT_SESSION_LEAD_MINUTES", "30"))
+
+MINUTES_PER_DAY = 24 * 60
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+EMPTY = np.empty(0, dtype=np.int64)
+
+
+def _naive_utc(dt: datetime) -> datetime:
+    # Mongo hands back naive UTC datetimes; only aware ones need converting
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def _minutes_since(origin: datetime, times: list[datetime]) -> np.ndarray:
+    # Cheaper than numpy's own datetime64 conversion of datetime objects
+    minute = timedelta(minutes=1)
+    return np.fromiter(
+        ((_naive_utc(t) - origin) // minute for t in times),
+        dtype=np.int64,
+        count=len(times),
+    )
+
+
+def commit_sessions(times: np.ndarray, repos: np.ndarray, gap: int, lead: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Gap-based sessions from commit times (minutes, any order) and a
+    parallel array of repo codes. Within a repo, a commit more than `gap`
+    after the previous one starts a new session; a session runs from
+    `lead` before its first commit to its last. Returns (starts, ends).
+    """
+    if times.size == 0:
+        return EMPTY, EMPTY
+
+    order = np.lexsort((times, repos))
+    t = times[order]
+    r = repos[order]
+
+    first = np.empty(t.size, dtype=bool)
+    first[0] = True
+    first[1:] = (r[1:] != r[:-1]) | (np.diff(t) > gap)
+    last = np.empty_like(first)
+    last[-1] = True
+    last[:-1] = first[1:]
+
+    return t[first] - lead, t[last]
+
+
+def active_minutes(starts: np.ndarray, ends: np.ndarray, span: int) -> np.ndarray:
+    """
+    Boolean minute grid over [0, span): True where any [start, end)
+    interval is active, so overlapping intervals count once.
+    """
+    starts = np.clip(starts, 0, span)
+    ends = np.clip(ends, 0, span)
+    keep = ends > starts
+    delta = (
+        np.bincount(starts[keep], minlength=span + 1)
+        - np.bincount(ends[keep], minlength=span + 1)
+    )
+    return np.cumsum(delta[:span]) > 0
+
+
+def log_interval(log: dict) -> tuple[datetime, datetime] | None:
+    """Wall-clock interval of a time log, or None if it only has a date and minutes."""
+    if log.get("started_at") and log.get("ended_at"):
+        return log["started_at"], log["ended_at"]
+    if not log.get("startTime"):
+        return None
+    try:
+        start = datetime.strptime(f"{log['date']} {log['startTime']}", "%Y-%m-%d %H:%M")
+    except (KeyError, ValueError):
+        return None
+    end = None
+    if log.get("endTime"):
+        try:
+            end = datetime.strptime(f"{log['date']} {log['endTime']}", "%Y-%m-%d %H:%M")
+        except ValueError:
+            end = None
+        if end is not None and end <= start:
+            end += timedelta(days=1)  # past midnight
+    if end is None:
+        end = start + timedelta(minutes=int(log.get("minutes") or 0))
+    return start, end
+
+
+def session_masks(
+    times: list[datetime],
+    repos: list[str],
+    gap: int = COMMIT_SESSION_GAP_MINUTES,
+    lead: int = COMMIT_SESSION_LEAD_MINUTES,
+) -> dict[datetime, bytes]:
+    """
+    Commit sessions as per-day minute masks: for each UTC day (midnight,
+    aware) that any session touches, 180 bytes with one bit per minute of
+    the day. Computed at sync time and stored on the daily rollups.
+    """
+    if not times:
+        return {}
+
+    origin = datetime.combine(min(_naive_utc(t) for t in times).date() - timedelta(days=1), datetime.min.time())
+    repo_codes: dict[str, int] = {}
+    codes = np.fromiter(
+        (repo_codes.setdefault(r or "", len(repo_codes)) for r in repos),
+        dtype=np.int64,
+        count=len(repos),
+    )
+    starts, ends = commit_sessions(_minutes_since(origin, times), codes, gap, lead)
+
+    days = int(ends.max()) // MINUTES_PER_DAY + 1
+    active = active_minutes(starts, ends, days * MINUTES_PER_DAY).reshape(days, MINUTES_PER_DAY)
+    packed = np.packbits(active, axis=1)
+    return {
+        (origin + timedelta(days=int(d))).replace(tzinfo=timezone.utc): packed[d].tobytes()
+        for d in np.flatnonzero(active.any(axis=1))
+    }
+
+
+def mask_minutes(mask: bytes) -> int:
+    return int(np.unpackbits(np.frombuffer(mask, dtype=np.uint8)).sum())
+
+
+def estimate_coding_activity(
+    masks: dict[datetime, bytes],
+    logs: list[dict],
+    window_start: datetime,
+    now: datetime,
+) -> dict:
+    """
+    Coding minutes in [window_start's day, now] from commit session masks
+    (see session_masks) merged with logged time ({date, minutes,
+    startTime/endTime or started_at/ended_at}). Time covered by both a
+    commit session and a log counts once; logs without times are added to
+    their day but can't be placed on the hourly chart.
+
+    Returns {"total": int, "hourly": [24 ints], "weekdays": {name: int}}.
+    """
+    origin = datetime.combine(_naive_utc(window_start).date(), datetime.min.time())
+    span = max(0, int((_naive_utc(now) - origin).total_seconds() // 60))
+    day_count = span // MINUTES_PER_DAY + 1
+
+    # Commit sessions, unpacked from the rollups' masks
+    grid = np.zeros((day_count, MINUTES_PER_DAY), dtype=bool)
+    for day, mask in masks.items():
+        index = (_naive_utc(day) - origin).days
+        if 0 <= index < day_count:
+            grid[index] = np.unpackbits(np.frombuffer(mask, dtype=np.uint8))[:MINUTES_PER_DAY]
+    active = grid.reshape(-1)[:span]
+
+    # Logged time: timed logs join the grid, the rest is per-day minutes
+    timed = []
+    untimed_days = np.zeros(day_count, dtype=np.int64)
+    origin_day = origin.date()
+    for log in logs:
+        interval = log_interval(log)
+        if interval is not None:
+            timed.append(interval)
+            continue
+        try:
+            day = (datetime.strptime(log["date"], "%Y-%m-%d").date() - origin_day).days
+        except (KeyError, ValueError):
+            continue
+        if 0 <= day < day_count:
+            untimed_days[day] += int(log.get("minutes") or 0)
+    if timed:
+        active = active | active_minutes(
+            _minutes_since(origin, [s for s, _ in timed]),
+            _minutes_since(origin, [e for _, e in timed]),
+            span,
+        )
+
+    minutes = np.arange(span)
+    hourly = np.bincount(minutes[active] % MINUTES_PER_DAY // 60, minlength=24)
+    per_day = np.bincount(minutes[active] // MINUTES_PER_DAY, minlength=day_count) + untimed_days
+
+    by_weekday = np.bincount(
+        (np.arange(day_count) + origin.weekday()) % 7,
+        weights=per_day,
+        minlength=7,
+    ).astype(np.int64)
+
+    return {
+        "total": int(per_day.sum()),
+        "hourly": [int(v) for v in hourly],
+        "weekdays": {name: int(by_weekday[i]) for i, name in enumerate(WEEKDAYS)},
+    }
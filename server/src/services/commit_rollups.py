@@ -0,0 +1,193 @@
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from bson import ObjectId
+
+from services.coding_sessions import mask_minutes, session_masks
+
+# Bumped when the rollup document shape changes; snapshots carrying an older
+# version get their rollups rebuilt on the next sync.
+ROLLUP_VERSION = 2
+
+
+def _utc(dt: datetime) -> datetime:
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def day_start(dt: datetime) -> datetime:
+    return _utc(dt).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+# Mongo field names cannot contain "." or start with "$"; repo names can
+def encode_key(name: str) -> str:
+    return name.replace("%", "%25").replace(".", "%2E").replace("$", "%24")
+
+
+def decode_key(key: str) -> str:
+    return key.replace("%24", "$").replace("%2E", ".").replace("%25", "%")
+
+
+def _commit_time(commit: dict) -> datetime | None:
+    committed_at = commit.get("committed_at")
+    if isinstance(committed_at, str):
+        committed_at = datetime.fromisoformat(committed_at.replace("Z", "+00:00"))
+    return _utc(committed_at) if isinstance(committed_at, datetime) else None
+
+
+def build_rollups(commits: list[dict]) -> dict[datetime, dict]:
+    """Per-day rollups for `commits`, keyed by the day's UTC midnight."""
+    days: dict[datetime, dict] = {}
+    for c in commits:
+        dt = _commit_time(c)
+        if dt is None:
+            continue
+        day = days.setdefault(
+            day_start(dt),
+            {
+                "commits": 0,
+                "hours": defaultdict(int),
+                "additions": 0,
+                "deletions": 0,
+                "repos": defaultdict(int),
+                "repo_last": {},
+            },
+        )
+        day["commits"] += 1
+        day["hours"][str(dt.hour)] += 1
+        day["additions"] += int(c.get("additions") or 0)
+        day["deletions"] += int(c.get("deletions") or 0)
+
+        repo_name = c.get("repo_name")
+        if repo_name:
+            key = encode_key(repo_name)
+            day["repos"][key] += 1
+            if key not in day["repo_last"] or dt > day["repo_last"][key]:
+                day["repo_last"][key] = dt
+    return days
+
+
+def commit_session_masks(commits: list[dict]) -> dict[datetime, bytes]:
+    """session_masks for stored commit documents ({committed_at, repo_name})."""
+    timed = [(dt, c.get("repo_name")) for c in commits if (dt := _commit_time(c)) is not None]
+    return session_masks([dt for dt, _ in timed], [repo for _, repo in timed])
+
+
+def session_days(commits: list[dict]) -> list[datetime]:
+    """
+    Days whose session masks can change when `commits` are added: their own
+    days plus the neighbours a session may spill into across midnight.
+    """
+    days = {day_start(dt) for c in commits if (dt := _commit_time(c)) is not None}
+    if not days:
+        return []
+    first, last = min(days) - timedelta(days=1), max(days) + timedelta(days=1)
+    return [first + timedelta(days=i) for i in range((last - first).days + 1)]
+
+
+class CommitRollupStore:
+    """
+    One document per (user_id, day) in github_daily_rollups:
+
+        commits, hours {"0".."23": n}, additions, deletions,
+        repos {encoded repo name: n}, repo_last {encoded repo name: datetime},
+        session_mask (minutes inside a commit session, see
+        services/coding_sessions.py), session_minutes
+
+    The sync $incs the days its new commits fall on, so the dashboard reads
+    O(days) documents instead of every commit. Sessions depend on
+    neighbouring commits, so their masks are recomputed, not $inc'ed.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def find_range(self, user_id: ObjectId, since: datetime | None = None) -> list[dict]:
+        """Rollups from `since`'s day onwards, newest first."""
+        query: dict = {"user_id": user_id}
+        if since is not None:
+            query["day"] = {"$gte": day_start(since)}
+        cursor = self.collection.find(query, {"_id": 0, "user_id": 0}).sort("day", -1)
+        return await cursor.to_list(length=None)
+
+    async def apply(self, user_id: ObjectId, commits: list[dict]) -> None:
+        """Adds newly stored commits to their days' rollups."""
+        if not commits:
+            return
+
+        now = datetime.now(timezone.utc)
+        for day, rollup in build_rollups(commits).items():
+            inc = {
+                "commits": rollup["commits"],
+                "additions": rollup["additions"],
+                "deletions": rollup["deletions"],
+            }
+            inc.update({f"hours.{h}": n for h, n in rollup["hours"].items()})
+            inc.update({f"repos.{k}": n for k, n in rollup["repos"].items()})
+
+            update = {"$inc": inc, "$set": {"updated_at": now}}
+            if rollup["repo_last"]:
+                update["$max"] = {f"repo_last.{k}": dt for k, dt in rollup["repo_last"].items()}
+
+            await self.collection.update_one(
+                {"user_id": user_id, "day": day},
+                update,
+                upsert=True,
+            )
+
+    async def set_sessions(self, user_id: ObjectId, masks: dict[datetime, bytes], days: list[datetime]) -> None:
+        """
+        Stores the session masks for `days`, computed from every commit
+        around them; a day without a mask loses its stale one.
+        """
+        now = datetime.now(timezone.utc)
+        for day in days:
+            mask = masks.get(day)
+            if mask is None:
+                await self.collection.update_one(
+                    {"user_id": user_id, "day": day, "session_mask": {"$exists": True}},
+                    {"$unset": {"session_mask": ""}, "$set": {"session_minutes": 0, "updated_at": now}},
+                )
+                continue
+            await self.collection.update_one(
+                {"user_id": user_id, "day": day},
+                {"$set": {"session_mask": mask, "session_minutes": mask_minutes(mask), "updated_at": now}},
+                upsert=True,
+            )
+
+    async def rebuild(self, user_id: ObjectId, commits: list[dict]) -> None:
+        """Replaces the user's rollups with ones computed from `commits`."""
+        await self.collection.delete_many({"user_id": user_id})
+
+        now = datetime.now(timezone.utc)
+        rollups = build_rollups(commits)
+        masks = commit_session_masks(commits)
+        docs = []
+        # A session's lead-in can reach a day without commits
+        for day in sorted(set(rollups) | set(masks)):
+            doc = {"user_id": user_id, "day": day, "updated_at": now}
+            rollup = rollups.get(day)
+            if rollup:
+                doc.update({
+                    "commits": rollup["commits"],
+                    "hours": dict(rollup["hours"]),
+                    "additions": rollup["additions"],
+                    "deletions": rollup["deletions"],
+                    "repos": dict(rollup["repos"]),
+                    "repo_last": rollup["repo_last"],
+                })
+            if day in masks:
+                doc["session_mask"] = masks[day]
+                doc["session_minutes"] = mask_minutes(masks[day])
+            docs.append(doc)
+        if docs:
+            await self.collection.insert_many(docs)
+
+    async def delete_older_than(self, user_id: ObjectId, cutoff: datetime) -> int:
+        res = await self.collection.delete_many(
+            {"user_id": user_id, "day": {"$lt": day_start(cutoff)}}
+        )
+        return res.deleted_count
+
+    async def delete_user(self, user_id: ObjectId) -> None:
+        await self.collection.delete_many({"user_id": user_id})
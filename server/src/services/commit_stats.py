@@ -0,0 +1,107 @@
+import os
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from pymongo.errors import BulkWriteError
+
+DUPLICATE_KEY = 11000
+
+# In-process LRU entries (one per commit, a few hundred bytes each)
+COMMIT_STATS_LRU_SIZE = int(os.getenv("COMMIT_STATS_LRU_SIZE", "50000"))
+# Only bump last_used_at once per this interval to keep reads write-free
+TOUCH_AFTER = timedelta(days=7)
+
+
+def stats_key(full_name: str, sha: str) -> str:
+    return f"{full_name.lower()}@{sha}"
+
+
+class CommitStatsStore:
+    """
+    Content-addressed store of per-commit stats keyed by (repo full_name, sha).
+    Commit stats never change, so a SHA's detail only has to be fetched once;
+    an in-process LRU sits in front of the Mongo collection.
+
+    Entries are dicts: {"additions", "deletions", "committed_at"}.
+    """
+
+    def __init__(self, collection, max_entries: int = COMMIT_STATS_LRU_SIZE):
+        self.collection = collection
+        self.max_entries = max_entries
+        self._lru: OrderedDict[str, dict] = OrderedDict()
+
+    def _remember(self, key: str, entry: dict) -> None:
+        self._lru[key] = entry
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    async def get_many(self, full_name: str, shas: list[str]) -> dict[str, dict]:
+        """Returns {sha: entry} for every SHA already known."""
+        found: dict[str, dict] = {}
+        missing: list[str] = []
+
+        for sha in shas:
+            key = stats_key(full_name, sha)
+            entry = self._lru.get(key)
+            if entry is None:
+                missing.append(key)
+            else:
+                self._lru.move_to_end(key)
+                found[sha] = entry
+
+        if not missing:
+            return found
+
+        stale: list[str] = []
+        now = datetime.now(timezone.utc)
+        async for doc in self.collection.find({"_id": {"$in": missing}}):
+            entry = {
+                "additions": doc.get("additions"),
+                "deletions": doc.get("deletions"),
+                "committed_at": doc.get("committed_at"),
+            }
+            self._remember(doc["_id"], entry)
+            found[doc["sha"]] = entry
+
+            last_used = doc.get("last_used_at")
+            if isinstance(last_used, datetime) and last_used.tzinfo is None:
+                last_used = last_used.replace(tzinfo=timezone.utc)
+            if not last_used or last_used < now - TOUCH_AFTER:
+                stale.append(doc["_id"])
+
+        if stale:
+            await self.collection.update_many(
+                {"_id": {"$in": stale}},
+                {"$set": {"last_used_at": now}},
+            )
+        return found
+
+    async def put_many(self, full_name: str, entries: dict[str, dict]) -> None:
+        if not entries:
+            return
+
+        now = datetime.now(timezone.utc)
+        docs = []
+        for sha, entry in entries.items():
+            key = stats_key(full_name, sha)
+            if key not in self._lru:
+                self._remember(key, entry)
+            docs.append({
+                "_id": key,
+                "repo": full_name.lower(),
+                "sha": sha,
+                "additions": entry.get("additions"),
+                "deletions": entry.get("deletions"),
+                "committed_at": entry.get("committed_at"),
+                "last_used_at": now,
+            })
+
+        # Stats are immutable: an existing entry for the same key is simply kept
+        try:
+            await self.collection.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            if any(err.get("code") != DUPLICATE_KEY for err in e.details.get("writeErrors", [])):
+                raise
+
+    def clear_local(self) -> None:
+        self._lru.clear()
@@ -0,0 +1,163 @@
+from datetime import datetime, timezone
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+DUPLICATE_KEY = 11000
+
+# Snapshots written after the move carry this marker; older ones still embed
+# a `commits` array that has to be migrated into github_commits.
+COMMIT_STORAGE = "collection"
+
+
+class CommitStore:
+    """
+    Per-user GitHub commits, one document per (user_id, sha), in the
+    github_commits collection. Indexed (see config/indexes.py) on
+    (user_id, committed_at) and (user_id, repo_name, committed_at) so readers
+    range-query only the window they need instead of loading a whole snapshot.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    # -------------------- READS --------------------
+
+    def _range_filter(
+        self,
+        user_id: ObjectId,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        repo_name: str | None = None,
+    ) -> dict:
+        query: dict = {"user_id": user_id}
+        if repo_name is not None:
+            query["repo_name"] = repo_name
+        if since is not None or until is not None:
+            query["committed_at"] = {}
+            if since is not None:
+                query["committed_at"]["$gte"] = since
+            if until is not None:
+                query["committed_at"]["$lte"] = until
+        return query
+
+    async def find_range(
+        self,
+        user_id: ObjectId,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        repo_name: str | None = None,
+        limit: int | None = None,
+        projection: dict | None = None,
+    ) -> list[dict]:
+        """Commits in the window, newest first."""
+        cursor = self.collection.find(
+            self._range_filter(user_id, since, until, repo_name),
+            projection or {"_id": 0, "user_id": 0},
+        ).sort("committed_at", -1)
+        if limit:
+            cursor = cursor.limit(limit)
+        return await cursor.to_list(length=limit)
+
+    async def count(
+        self,
+        user_id: ObjectId,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> int:
+        return await self.collection.count_documents(
+            self._range_filter(user_id, since, until)
+        )
+
+    async def known_shas(self, user_id: ObjectId, since: datetime | None = None) -> dict[str, bool]:
+        """{sha: has_stats} for the user's stored commits."""
+        known = {}
+        async for doc in self.collection.find(
+            self._range_filter(user_id, since),
+            {"_id": 0, "sha": 1, "additions": 1},
+        ):
+            known[doc["sha"]] = doc.get("additions") is not None
+        return known
+
+    # -------------------- WRITES --------------------
+
+    async def insert_new(self, user_id: ObjectId, commits: list[dict]) -> list[dict]:
+        """
+        Inserts commits not stored yet (duplicates by sha are skipped) and
+        returns the ones actually inserted.
+        """
+        if not commits:
+            return []
+        # Dedupe relies on the unique (user_id, sha) index (config/indexes.py)
+
+        now = datetime.now(timezone.utc)
+        docs = [{**c, "user_id": user_id, "synced_at": now} for c in commits]
+
+        failed: set[int] = set()
+        try:
+            await self.collection.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            if any(err.get("code") != DUPLICATE_KEY for err in errors):
+                raise
+            failed = {err["index"] for err in errors}
+
+        return [c for i, c in enumerate(commits) if i not in failed]
+
+    async def fill_stats(self, user_id: ObjectId, commits: list[dict]) -> None:
+        """Sets additions/deletions on stored commits that were saved without them."""
+        if not commits:
+            return
+        await self.collection.bulk_write(
+            [
+                UpdateOne(
+                    {"user_id": user_id, "sha": c["sha"], "additions": None},
+                    {"$set": {"additions": c.get("additions"), "deletions": c.get("deletions")}},
+                )
+                for c in commits
+            ],
+            ordered=False,
+        )
+
+    async def delete_older_than(self, user_id: ObjectId, cutoff: datetime) -> int:
+        res = await self.collection.delete_many(
+            {"user_id": user_id, "committed_at": {"$lt": cutoff}}
+        )
+        return res.deleted_count
+
+    async def delete_except(self, user_id: ObjectId, keep_shas: list[str]) -> int:
+        res = await self.collection.delete_many(
+            {"user_id": user_id, "sha": {"$nin": keep_shas}}
+        )
+        return res.deleted_count
+
+    async def delete_user(self, user_id: ObjectId) -> None:
+        await self.collection.delete_many({"user_id": user_id})
+
+
+async def migrate_snapshot_commits(snapshots, store: CommitStore, user_id: ObjectId) -> int:
+    """
+    Moves a legacy snapshot's embedded `commits` array into github_commits
+    and drops it from the snapshot. Idempotent; returns commits inserted.
+    """
+    snapshot = await snapshots.find_one(
+        {"user_id": user_id, "commits": {"$exists": True}},
+        {"commits": 1},
+    )
+    inserted = []
+    if snapshot:
+        commits = []
+        for c in snapshot.get("commits") or []:
+            committed_at = c.get("committed_at")
+            if isinstance(committed_at, str):
+                c["committed_at"] = datetime.fromisoformat(committed_at.replace("Z", "+00:00"))
+            if c.get("sha") and c.get("committed_at"):
+                commits.append(c)
+        inserted = await store.insert_new(user_id, commits)
+
+    await snapshots.update_one(
+        {"user_id": user_id},
+        {"$unset": {"commits": ""}, "$set": {"commit_storage": COMMIT_STORAGE}},
+    )
+    return len(inserted)
+
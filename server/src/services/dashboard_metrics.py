@@ -1,6 +1,8 @@
 from datetime import datetime, timedelta
 from collections import defaultdict
 
+from services.commit_rollups import decode_key
+
 
 def compute_weekly_activity(commits):
     days = defaultdict(lambda: {"commits": 0, "minutes": 0})
@@ -37,28 +39,6 @@ def compute_streak(commit_dates):
     return streak
 
 
-def compute_coding_time(commits):
-    hourly = defaultdict(int)
-
-    for c in commits:
-        hour = c["date"].hour
-        hourly[hour] += 1
-
-    hourly_data = [
-        {"name": f"{h:02d}", "value": hourly[h] * 30}
-        for h in range(24)
-    ]
-
-    peak = max(hourly, key=lambda h: hourly[h], default=None)
-
-    return {
-        "hourly": hourly_data,
-        "dailyAverageMinutes": int(sum(hourly.values()) * 30 / 7),
-        "mostProductiveTime": f"{peak:02d}:00" if peak is not None else None,
-        "peakHourLabel": f"{peak:02d}:00" if peak is not None else None,
-    }
-
-
 def compute_code_churn(commits, days: int = 7):
     if days <= 0:
         return []
@@ -118,3 +98,118 @@ def compute_code_churn(commits, days: int = 7):
         }
         for b in buckets
     ]
+
+
+def compute_repo_stats(commits):
+    repo_stats = {}
+
+    for c in commits:
+        repo_name = c.get("repo_name")
+        if not repo_name:
+            continue
+        dt = c["date"]
+        if repo_name not in repo_stats:
+            repo_stats[repo_name] = {"count": 0, "last": dt}
+        repo_stats[repo_name]["count"] += 1
+        if dt > repo_stats[repo_name]["last"]:
+            repo_stats[repo_name]["last"] = dt
+
+    return repo_stats
+
+
+# -------------------- FROM DAILY ROLLUPS --------------------
+# Same outputs as above, computed from github_daily_rollups documents
+# (see services/commit_rollups.py) instead of raw commits.
+
+def _naive_utc(dt):
+    return dt.replace(tzinfo=None) if dt.tzinfo is not None else dt
+
+
+def compute_weekly_activity_from_rollups(rollups):
+    days = defaultdict(int)
+
+    for r in rollups:
+        days[r["day"].strftime("%A")] += r.get("commits", 0)
+
+    ordered = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+    return [
+        {
+            "name": d,
+            "commits": days[d],
+            "minutes": days[d] * 30,  # heuristic: 30 min / commit
+        }
+        for d in ordered
+    ]
+
+
+def compute_streak_from_rollups(rollups):
+    return compute_streak([r["day"] for r in rollups if r.get("commits")])
+
+
+def compute_code_churn_from_rollups(rollups, days: int = 7):
+    if days <= 0:
+        return []
+
+    today = datetime.utcnow().date()
+    start_date = today - timedelta(days=days - 1)
+    by_date = {r["day"].date(): r for r in rollups}
+
+    churn = []
+    for i in range(days):
+        current_date = start_date + timedelta(days=i)
+        r = by_date.get(current_date, {})
+        churn.append(
+            {
+                "day": current_date.strftime("%a"),
+                "additions": int(r.get("additions") or 0),
+                "deletions": int(r.get("deletions") or 0),
+            }
+        )
+    return churn
+
+
+def compute_repo_stats_from_rollups(rollups):
+    repo_stats = {}
+
+    for r in rollups:
+        repo_last = r.get("repo_last") or {}
+        for key, count in (r.get("repos") or {}).items():
+            name = decode_key(key)
+            last = _naive_utc(repo_last.get(key) or r["day"])
+            if name not in repo_stats:
+                repo_stats[name] = {"count": 0, "last": last}
+            repo_stats[name]["count"] += count
+            if last > repo_stats[name]["last"]:
+                repo_stats[name]["last"] = last
+
+    return repo_stats
+
+
+# -------------------- FROM CODING SESSIONS --------------------
+# Minutes from services/coding_sessions.py (commit sessions merged with
+# logged time) in place of the flat 30 min / commit heuristic above.
+
+def apply_session_minutes(weekly_activity, activity):
+    return [
+        {**d, "minutes": activity["weekdays"].get(d["name"], 0)}
+        for d in weekly_activity
+    ]
+
+
+def compute_coding_time_from_sessions(activity):
+    hourly = activity["hourly"]
+
+    hourly_data = [
+        {"name": f"{h:02d}", "value": hourly[h]}
+        for h in range(24)
+    ]
+
+    peak = max(range(24), key=lambda h: hourly[h]) if any(hourly) else None
+
+    return {
+        "hourly": hourly_data,
+        "dailyAverageMinutes": int(activity["total"] / 7),
+        "mostProductiveTime": f"{peak:02d}:00" if peak is not None else None,
+        "peakHourLabel": f"{peak:02d}:00" if peak is not None else None,
+    }
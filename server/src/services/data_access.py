@@ -0,0 +1,123 @@
+from datetime import datetime, timezone
+from bson import ObjectId
+
+from config.db import db
+
+# Purpose-built reads for the user and github_snapshots collections. Each
+# method projects only what its caller uses, so endpoints stop pulling
+# password hashes, OAuth tokens and whole commit arrays over the wire.
+
+
+def _naive_utc(dt: datetime) -> datetime:
+    # Stored dates come back naive (UTC); compare like with like
+    if dt.tzinfo is not None:
+        return dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+class UserStore:
+    # Never leaves the server
+    PRIVATE_FIELDS = {"password_hash": 0, "github.access_token": 0}
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def github_link(self, user_id: ObjectId) -> dict | None:
+        """The user's linked GitHub account (without its token), or None."""
+        user = await self.collection.find_one(
+            {"_id": user_id},
+            {"github.username": 1, "github.github_id": 1},
+        )
+        return user.get("github") if user else None
+
+    async def identity(self, user_id: ObjectId) -> dict | None:
+        return await self.collection.find_one(
+            {"_id": user_id},
+            {"email": 1, "fullName": 1},
+        )
+
+    async def profile(self, user_id: ObjectId) -> dict | None:
+        return await self.collection.find_one({"_id": user_id}, self.PRIVATE_FIELDS)
+
+    async def settings(self, user_id: ObjectId) -> dict | None:
+        user = await self.collection.find_one({"_id": user_id}, {"settings": 1})
+        return user.get("settings") if user else None
+
+    async def password_hash(self, user_id: ObjectId) -> str | None:
+        user = await self.collection.find_one({"_id": user_id}, {"password_hash": 1})
+        return user.get("password_hash") if user else None
+
+
+class SnapshotStore:
+    DASHBOARD_FIELDS = {
+        "user_id": 1,
+        "languages": 1,
+        "last_synced_at": 1,
+        "updated_at": 1,
+        "rollup_version": 1,
+        "commit_storage": 1,
+    }
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def dashboard_view(self, user_id: ObjectId) -> dict | None:
+        return await self.collection.find_one({"user_id": user_id}, self.DASHBOARD_FIELDS)
+
+    async def storage_info(self, user_id: ObjectId) -> dict | None:
+        return await self.collection.find_one(
+            {"user_id": user_id},
+            {"user_id": 1, "commit_storage": 1},
+        )
+
+    async def profile_stats(self, user_id: ObjectId) -> dict | None:
+        """
+        Last sync date and storage marker; for snapshots that still embed
+        commits, their count via $size instead of loading the array.
+        """
+        docs = await self.collection.aggregate([
+            {"$match": {"user_id": user_id}},
+            {"$sort": {"last_synced_at": -1}},
+            {"$limit": 1},
+            {
+                "$project": {
+                    "last_synced_at": 1,
+                    "commit_storage": 1,
+                    "legacy_commit_count": {"$size": {"$ifNull": ["$commits", []]}},
+                }
+            },
+        ]).to_list(length=1)
+        return docs[0] if docs else None
+
+    async def legacy_commits(
+        self,
+        user_id: ObjectId,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        limit: int | None = None,
+    ) -> list[dict]:
+        """
+        Commits still embedded in a snapshot that has not been migrated to
+        github_commits, filtered ($filter) and capped ($slice) server-side.
+        """
+        commits = {"$ifNull": ["$commits", []]}
+
+        conditions = []
+        if since is not None:
+            conditions.append({"$gte": ["$$c.committed_at", _naive_utc(since)]})
+        if until is not None:
+            conditions.append({"$lte": ["$$c.committed_at", _naive_utc(until)]})
+        if conditions:
+            commits = {"$filter": {"input": commits, "as": "c", "cond": {"$and": conditions}}}
+        if limit:
+            commits = {"$slice": [commits, limit]}
+
+        docs = await self.collection.aggregate([
+            {"$match": {"user_id": user_id}},
+            {"$project": {"_id": 0, "commits": commits}},
+        ]).to_list(length=1)
+        return docs[0]["commits"] if docs else []
+
+
+user_store = UserStore(db["user"])
+snapshot_store = SnapshotStore(db["github_snapshots"])
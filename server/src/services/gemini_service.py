@@ -1,15 +1,220 @@
+import asyncio
 import os
+import time
 import httpx
 import json
 from services.AI_prompt import build_daily_summary_prompt
+from services.http_clients import http_client
 from pathlib import Path
 from dotenv import load_dotenv
 # Ensure env is loaded
 env_path = Path(__file__).resolve().parents[1] / ".env"
 load_dotenv(dotenv_path=env_path)
 
-async def generate_ai_summary(context_data: dict) -> dict:
-# print("🤖 Entered generate_ai_summary")
+# -------------------- CONFIG --------------------
+
+# Point at a local fake Gemini server for tests and benchmarks
+GEMINI_API_BASE = os.getenv("GEMINI_API_BASE", "https://generativelanguage.googleapis.com/v1beta").rstrip("/")
+# Roughly the primary model's p95: past this, the next model is raced against it
+GEMINI_HEDGE_AFTER = float(os.getenv("GEMINI_HEDGE_AFTER_SECONDS", "8"))
+# The whole summary call gives up (offline mode) after this long
+GEMINI_DEADLINE = float(os.getenv("GEMINI_DEADLINE_SECONDS", "45"))
+# Consecutive errors/timeouts that open a model's circuit, and for how long
+GEMINI_BREAKER_FAILURES = int(os.getenv("GEMINI_BREAKER_FAILURES", "3"))
+GEMINI_BREAKER_COOLDOWN = float(os.getenv("GEMINI_BREAKER_COOLDOWN_SECONDS", "60"))
+
+# Models in order of preference
+GEMINI_MODELS = [
+    "gemini-2.5-flash",
+    "gemini-2.0-flash-lite-preview-02-05",
+    "gemini-flash-latest",
+    "gemini-1.5-flash",
+]
+
+
+class ModelHealth:
+    """
+    Per-model circuit breaker. After `failures` consecutive errors or
+    timeouts a model is skipped for `cooldown` seconds. Past the cooldown
+    the circuit is half-open: a single trial request goes through, and
+    its failure re-opens the circuit straight away.
+    """
+
+    def __init__(self, failures: int = GEMINI_BREAKER_FAILURES, cooldown: float = GEMINI_BREAKER_COOLDOWN):
+        self.failures = failures
+        self.cooldown = cooldown
+        self._state: dict[str, dict] = {}
+
+    def _model(self, model: str) -> dict:
+        return self._state.setdefault(model, {
+            "consecutive_failures": 0,
+            "open_until": 0.0,
+            "probing": False,
+            "successes": 0,
+            "errors": 0,
+            "last_latency_ms": None,
+        })
+
+    def _closed(self, state: dict) -> bool:
+        return state["consecutive_failures"] < self.failures
+
+    def available(self, model: str) -> bool:
+        """Whether a request to `model` could go through now (closed, or half-open with no trial running)."""
+        state = self._model(model)
+        if self._closed(state):
+            return True
+        return time.monotonic() >= state["open_until"] and not state["probing"]
+
+    def try_acquire(self, model: str) -> bool:
+        """Like `available`, but claims the half-open trial; call right before sending."""
+        state = self._model(model)
+        if self._closed(state):
+            return True
+        if time.monotonic() < state["open_until"] or state["probing"]:
+            return False
+        state["probing"] = True
+        return True
+
+    def release(self, model: str) -> None:
+        """Gives back a trial that ended with neither success nor failure (e.g. cancelled)."""
+        self._model(model)["probing"] = False
+
+    def record_success(self, model: str, latency: float) -> None:
+        state = self._model(model)
+        state["consecutive_failures"] = 0
+        state["probing"] = False
+        state["successes"] += 1
+        state["last_latency_ms"] = round(latency * 1000)
+
+    def record_failure(self, model: str) -> None:
+        state = self._model(model)
+        state["consecutive_failures"] += 1
+        state["probing"] = False
+        state["errors"] += 1
+        if state["consecutive_failures"] >= self.failures:
+            state["open_until"] = time.monotonic() + self.cooldown
+
+    def as_dict(self) -> dict:
+        now = time.monotonic()
+        return {
+            model: {
+                "open": state["consecutive_failures"] >= self.failures and now < state["open_until"],
+                "consecutiveFailures": state["consecutive_failures"],
+                "successes": state["successes"],
+                "errors": state["errors"],
+                "lastLatencyMs": state["last_latency_ms"],
+            }
+            for model, state in self._state.items()
+        }
+
+
+model_health = ModelHealth()
+
+
+def model_url(model: str, method: str, api_key: str) -> str:
+    return f"{GEMINI_API_BASE}/models/{model}:{method}?key={api_key}"
+
+
+def summary_payload(context_data: dict) -> dict:
+    prompt = build_daily_summary_prompt(context_data)
+    return {
+        "contents": [{"parts": [{"text": prompt}]}],
+        "generationConfig": {"responseMimeType": "application/json"}
+    }
+
+
+async def _call_model(client, model: str, payload: dict, api_key: str, health: ModelHealth) -> dict | None:
+    """One generateContent call. Returns the parsed result, or None on any failure."""
+    start = time.monotonic()
+    try:
+        print(f"🌍 Sending request to Gemini ({model})...")
+        response = await client.post(model_url(model, "generateContent", api_key), json=payload)
+
+        print(f"📨 Gemini ({model}) responded with status", response.status_code)
+
+        if response.status_code == 200:
+            result = response.json()
+            if "candidates" in result and result["candidates"]:
+                text_content = result["candidates"][0]["content"]["parts"][0]["text"]
+                parsed = json.loads(text_content)
+                print(f"✅ AI RESPONSE RECEIVED from {model}")
+                health.record_success(model, time.monotonic() - start)
+                return parsed
+            else:
+                print(f"Gemini ({model}) returned no candidates:", result)
+        else:
+            print(f"Gemini ({model}) API Error:", response.text)
+
+    except Exception as e:
+        print(f"Gemini ({model}) API Exception:", e)
+
+    health.record_failure(model)
+    return None
+
+
+async def _hedged(client, models: list[str], payload: dict, api_key: str, health: ModelHealth, hedge_after: float) -> dict | None:
+    """
+    Calls models in order. A failure moves straight to the next model; a
+    model still running after `hedge_after` gets the next one raced
+    against it. The first good answer wins and the rest are cancelled.
+    A model cut off by the deadline, or cancelled after running past
+    `hedge_after`, counts as a failure (a timeout) for its breaker.
+    """
+    remaining = iter(models)
+    in_flight: dict[asyncio.Task, tuple[str, float]] = {}
+    deadline_hit = False
+
+    def launch() -> bool:
+        for model in remaining:
+            # Another request may be running this model's half-open trial
+            if not health.try_acquire(model):
+                continue
+            task = asyncio.create_task(_call_model(client, model, payload, api_key, health))
+            in_flight[task] = (model, time.monotonic())
+            return True
+        return False
+
+    launch()
+    try:
+        while in_flight:
+            done, _ = await asyncio.wait(in_flight, timeout=hedge_after, return_when=asyncio.FIRST_COMPLETED)
+
+            if not done:
+                if launch():
+                    print(f"⏱️ No answer within {hedge_after}s, hedging with the next model")
+                continue
+
+            for task in done:
+                in_flight.pop(task)
+                result = task.result()
+                if result is not None:
+                    return result
+
+            print("⚠️ Gemini model failed, trying next...")
+            if not in_flight:
+                launch()
+        return None
+    except asyncio.CancelledError:
+        deadline_hit = True
+        raise
+    finally:
+        now = time.monotonic()
+        for task, (model, started) in in_flight.items():
+            task.cancel()
+            if deadline_hit or now - started >= hedge_after:
+                health.record_failure(model)
+            else:
+                health.release(model)
+        await asyncio.gather(*in_flight, return_exceptions=True)
+
+
+async def generate_ai_summary(
+    context_data: dict,
+    client: httpx.AsyncClient | None = None,
+    health: ModelHealth | None = None,
+    hedge_after: float = GEMINI_HEDGE_AFTER,
+    deadline: float = GEMINI_DEADLINE,
+) -> dict:
     print("🤖 Entered generate_ai_summary")
 
     api_key = os.getenv("API_KEY")
@@ -19,51 +224,115 @@ async def generate_ai_summary(context_data: dict) -> dict:
         print("Error: API_KEY not found in environment variables")
         return None
 
-    # List of models to try in order of preference/availability
-    models = [
-        "gemini-2.5-flash",
-        "gemini-2.0-flash-lite-preview-02-05",
-        "gemini-flash-latest",
-        "gemini-1.5-flash"
-    ]
+    health = health or model_health
+    models = [m for m in GEMINI_MODELS if health.available(m)]
+    if not models:
+        print("❌ Every Gemini model's circuit is open.")
+        return None
 
     print(f"DEBUG: Generating AI summary with key ending in ...{api_key[-4:]}")
 
-    prompt = build_daily_summary_prompt(context_data)
-    # print("\n🧠 PROMPT BEING SENT TO GEMINI:\n")
-    # print(prompt[:800])  # print first part only
-    # print("\nEND PROMPT\n")
+    payload = summary_payload(context_data)
 
-    payload = {
-        "contents": [{"parts": [{"text": prompt}]}],
-        "generationConfig": {"responseMimeType": "application/json"}
-    }
+    async with http_client("gemini", client) as client:
+        try:
+            result = await asyncio.wait_for(
+                _hedged(client, models, payload, api_key, health, hedge_after),
+                timeout=deadline,
+            )
+        except asyncio.TimeoutError:
+            print(f"❌ Gemini gave no answer within the {deadline}s deadline.")
+            return None
 
-    async with httpx.AsyncClient() as client:
-        for model in models:
-            gemini_url = f"https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent?key={api_key}"
-            
+        if result is None:
+            print("❌ All Gemini models failed.")
+        return result
+
+
+async def stream_ai_summary(
+    context_data: dict,
+    client: httpx.AsyncClient | None = None,
+    health: ModelHealth | None = None,
+    deadline: float = GEMINI_DEADLINE,
+):
+    """
+    Yields the response text of streamGenerateContent as it arrives. Models
+    are tried in order until one starts answering; a failure after text
+    has been yielded is raised, since the answer cannot be restarted.
+    The whole stream, across models, gives up after `deadline` seconds.
+    """
+    api_key = os.getenv("API_KEY")
+    if not api_key:
+        print("Error: API_KEY not found in environment variables")
+        return
+
+    health = health or model_health
+    payload = summary_payload(context_data)
+    give_up_at = time.monotonic() + deadline
+
+    def within_deadline(awaitable):
+        return asyncio.wait_for(awaitable, timeout=max(0.0, give_up_at - time.monotonic()))
+
+    async with http_client("gemini", client) as client:
+        for model in GEMINI_MODELS:
+            if not health.try_acquire(model):
+                continue
+            start = time.monotonic()
+            streamed = False
+            recorded = False
             try:
-                print(f"🌍 Sending request to Gemini ({model})...")
-                response = await client.post(gemini_url, json=payload, timeout=30.0)
-                
-                print(f"📨 Gemini ({model}) responded with status", response.status_code)
-
-                if response.status_code == 200:
-                    result = response.json()
-                    if "candidates" in result and result["candidates"]:
-                        text_content = result["candidates"][0]["content"]["parts"][0]["text"]
-                        print(f"✅ AI RESPONSE RECEIVED from {model}")
-                        return json.loads(text_content)
-                    else:
-                        print(f"Gemini ({model}) returned no candidates:", result)
-                else:
-                    print(f"Gemini ({model}) API Error:", response.text)
-                    
+                print(f"🌍 Streaming from Gemini ({model})...")
+                url = model_url(model, "streamGenerateContent", api_key) + "&alt=sse"
+                response = await within_deadline(
+                    client.send(client.build_request("POST", url, json=payload), stream=True)
+                )
+                try:
+                    if response.status_code != 200:
+                        print(f"Gemini ({model}) stream error:", response.status_code)
+                        recorded = True
+                        health.record_failure(model)
+                        continue
+
+                    lines = response.aiter_lines()
+                    while True:
+                        try:
+                            line = await within_deadline(lines.__anext__())
+                        except StopAsyncIteration:
+                            break
+                        if not line.startswith("data:"):
+                            continue
+                        chunk = json.loads(line[5:])
+                        for candidate in chunk.get("candidates", [])[:1]:
+                            for part in candidate.get("content", {}).get("parts", []):
+                                if part.get("text"):
+                                    streamed = True
+                                    yield part["text"]
+                finally:
+                    await response.aclose()
+
+                recorded = True
+                health.record_success(model, time.monotonic() - start)
+                return
+
+            except asyncio.TimeoutError:
+                print(f"❌ Gemini ({model}) stream passed the {deadline}s deadline.")
+                recorded = True
+                health.record_failure(model)
+                if streamed:
+                    raise
+                return
+
             except Exception as e:
-                print(f"Gemini ({model}) API Exception:", e)
-            
-            print(f"⚠️ Failed with {model}, trying next...")
-            
-        print("❌ All Gemini models failed.")
-        return None
\ No newline at end of file
+                print(f"Gemini ({model}) stream exception:", e)
+                recorded = True
+                health.record_failure(model)
+                if streamed:
+                    raise
+
+            finally:
+                # The consumer went away mid-stream (GeneratorExit or
+                # CancelledError at the yield): free the half-open trial
+                if not recorded:
+                    health.release(model)
+
+        print("❌ All Gemini models failed to stream.")
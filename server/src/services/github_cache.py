@@ -0,0 +1,140 @@
+import hashlib
+import json
+import os
+import re
+from datetime import datetime, timezone
+import httpx
+
+# -------------------- CONFIG --------------------
+
+# Per-user bound; the least recently refreshed entries go first
+GITHUB_HTTP_CACHE_MAX_ENTRIES = int(os.getenv("GITHUB_HTTP_CACHE_MAX_ENTRIES", "500"))
+
+# Endpoints whose responses are replayed from the cache on 304 Not Modified.
+# Commit details are immutable and handled separately.
+CACHEABLE_PATHS = [
+    re.compile(r"^/user/repos$"),
+    re.compile(r"^/repos/[^/]+/[^/]+/languages$"),
+    re.compile(r"^/repos/[^/]+/[^/]+/commits$"),
+    re.compile(r"^/users/[^/]+/events$"),
+]
+
+
+class CacheStats:
+    """Process-wide counters for GitHub conditional requests."""
+
+    def __init__(self):
+        self.conditional_requests = 0
+        self.not_modified = 0
+        self.stored = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        if not self.conditional_requests:
+            return 0.0
+        return self.not_modified / self.conditional_requests
+
+    def as_dict(self) -> dict:
+        return {
+            "conditionalRequests": self.conditional_requests,
+            "notModified": self.not_modified,
+            "hitRatio": round(self.hit_ratio, 4),
+            # 304 responses do not count against the GitHub rate limit
+            "rateLimitSaved": self.not_modified,
+            "stored": self.stored,
+        }
+
+
+cache_stats = CacheStats()
+
+
+def token_cache_key(token: str) -> str:
+    """Cache owner key for callers that only know the access token."""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()[:24]
+
+
+class ConditionalCache:
+    """
+    Persistent HTTP validator cache for one user's GitHub requests.
+    Entries are keyed by (user, URL, params) and hold the ETag /
+    Last-Modified validators plus the raw response body, so a 304 can be
+    answered from the cache. Entries expire through a TTL index on
+    updated_at (config/indexes.py) and each user keeps at most `max_entries`.
+    """
+
+    def __init__(self, collection, user_key: str, max_entries: int = GITHUB_HTTP_CACHE_MAX_ENTRIES):
+        self.collection = collection
+        self.user_key = user_key
+        self.max_entries = max_entries
+
+    @staticmethod
+    def is_cacheable(url: str) -> bool:
+        path = httpx.URL(url).path
+        return any(pattern.match(path) for pattern in CACHEABLE_PATHS)
+
+    def key(self, url: str, params: dict | None) -> str:
+        raw = json.dumps(
+            [self.user_key, url, sorted((params or {}).items())],
+            default=str,
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    async def lookup(self, url: str, params: dict | None) -> dict | None:
+        return await self.collection.find_one({"_id": self.key(url, params)})
+
+    async def store(self, url: str, params: dict | None, response: httpx.Response) -> None:
+        etag = response.headers.get("etag")
+        last_modified = response.headers.get("last-modified")
+        if not etag and not last_modified:
+            return
+
+        await self.collection.update_one(
+            {"_id": self.key(url, params)},
+            {
+                "$set": {
+                    "user_key": self.user_key,
+                    "url": url,
+                    "etag": etag,
+                    "last_modified": last_modified,
+                    # Raw JSON text: GitHub payload keys are not always valid Mongo field names
+                    "body": response.text,
+                    "updated_at": datetime.now(timezone.utc),
+                }
+            },
+            upsert=True,
+        )
+        cache_stats.stored += 1
+
+        excess = await self.collection.count_documents({"user_key": self.user_key}) - self.max_entries
+        if excess > 0:
+            oldest = await (
+                self.collection.find({"user_key": self.user_key}, {"_id": 1})
+                .sort("updated_at", 1)
+                .limit(excess)
+                .to_list(length=excess)
+            )
+            await self.collection.delete_many({"_id": {"$in": [d["_id"] for d in oldest]}})
+
+    @staticmethod
+    def validator_headers(entry: dict) -> dict:
+        if entry.get("etag"):
+            return {"If-None-Match": entry["etag"]}
+        if entry.get("last_modified"):
+            return {"If-Modified-Since": entry["last_modified"]}
+        return {}
+
+    @staticmethod
+    def replay(entry: dict, not_modified: httpx.Response) -> httpx.Response:
+        """Builds a 200 response from a cached entry, keeping the 304's rate-limit headers."""
+        headers = {
+            k: v
+            for k, v in not_modified.headers.items()
+            if k.lower().startswith("x-ratelimit") or k.lower() == "etag"
+        }
+        headers["content-type"] = "application/json"
+        return httpx.Response(
+            200,
+            content=entry["body"].encode("utf-8"),
+            headers=headers,
+            request=not_modified.request,
+        )
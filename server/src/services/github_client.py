@@ -1,21 +1,41 @@
 import httpx
 from datetime import datetime, timedelta
 
+from config.db import db
+from services.github_cache import ConditionalCache, token_cache_key
+from services.github_fetcher import GitHubFetcher
+from services.github_rate_limit import rate_limits
+from services.http_clients import http_client
+
 GITHUB_API = "https://api.github.com"
 
 HEADERS_BASE = {
     "Accept": "application/vnd.github+json"
 }
+github_http_cache = db["github_http_cache"]
 
 
-async def github_get(token: str, url: str, params: dict | None = None):
+async def github_get(
+    token: str,
+    url: str,
+    params: dict | None = None,
+    user_key: str | None = None,
+    client: httpx.AsyncClient | None = None,
+):
     headers = {
         **HEADERS_BASE,
         "Authorization": f"Bearer {token}",
     }
-
-    async with httpx.AsyncClient(timeout=20) as client:
-        r = await client.get(url, headers=headers, params=params)
+    cache = ConditionalCache(github_http_cache, user_key or token_cache_key(token))
+
+    async with http_client("github", client) as client:
+        fetcher = GitHubFetcher(
+            client,
+            headers,
+            cache=cache,
+            budget=rate_limits.for_token(token_cache_key(token)),
+        )
+        r = await fetcher.get(url, params=params)
         r.raise_for_status()
         return r.json()
 
@@ -0,0 +1,122 @@
+import asyncio
+import os
+import weakref
+import httpx
+
+from services.github_cache import ConditionalCache, cache_stats
+from services.github_rate_limit import (
+    PrioritySemaphore,
+    TokenBudget,
+    request_priority,
+)
+
+# Max concurrent GitHub requests for a single user's sync
+GITHUB_MAX_IN_FLIGHT_PER_USER = int(os.getenv("GITHUB_MAX_IN_FLIGHT_PER_USER", "8"))
+# Max concurrent GitHub requests across every sync running in this process
+GITHUB_MAX_IN_FLIGHT = int(os.getenv("GITHUB_MAX_IN_FLIGHT", "32"))
+
+# One process-wide semaphore per event loop (tests and scripts may run several loops)
+_process_limits: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _process_semaphore() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    sem = _process_limits.get(loop)
+    if sem is None:
+        sem = asyncio.Semaphore(GITHUB_MAX_IN_FLIGHT)
+        _process_limits[loop] = sem
+    return sem
+
+
+class GitHubFetcher:
+    """
+    Issues GitHub API requests on behalf of one user with bounded fan-out.
+    Callers can fire requests concurrently (asyncio.gather); at most
+    `max_in_flight` run for this user and GITHUB_MAX_IN_FLIGHT for the process.
+
+    With a `cache`, cacheable endpoints are requested conditionally and a
+    304 Not Modified is answered with the cached body.
+
+    With a `budget`, calls are throttled by the token's remaining rate
+    limit, rate-limited responses (403/429) are retried with backoff, and
+    queued calls are admitted by value (repo list first, commit details last).
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        headers: dict,
+        max_in_flight: int | None = None,
+        cache: ConditionalCache | None = None,
+        budget: TokenBudget | None = None,
+    ):
+        self.client = client
+        self.headers = headers
+        self.cache = cache
+        self.budget = budget
+        self.stats = {"requests": 0, "not_modified": 0, "retries": 0, "throttled_ms": 0}
+        self._user_limit = PrioritySemaphore(
+            max_in_flight or GITHUB_MAX_IN_FLIGHT_PER_USER
+        )
+        self._process_limit = _process_semaphore()
+
+    async def get(self, url: str, params: dict | None = None) -> httpx.Response:
+        if self.cache is None or not self.cache.is_cacheable(url):
+            return await self._send(url, params, self.headers)
+
+        entry = await self.cache.lookup(url, params)
+        headers = self.headers
+        if entry:
+            headers = {**self.headers, **self.cache.validator_headers(entry)}
+            cache_stats.conditional_requests += 1
+
+        res = await self._send(url, params, headers)
+
+        if res.status_code == 304 and entry:
+            cache_stats.not_modified += 1
+            self.stats["not_modified"] += 1
+            return self.cache.replay(entry, res)
+        if res.status_code == 200:
+            await self.cache.store(url, params, res)
+        return res
+
+    async def _send(self, url: str, params: dict | None, headers: dict) -> httpx.Response:
+        priority = request_priority(url)
+        async with self._user_limit.slot(priority):
+            attempt = 0
+            while True:
+                if self.budget is not None:
+                    slept = await self.budget.before_request(priority)
+                    self.stats["throttled_ms"] += int(slept * 1000)
+
+                async with self._process_limit:
+                    self.stats["requests"] += 1
+                    res = await self.client.get(url, headers=headers, params=params)
+
+                if self.budget is None:
+                    return res
+
+                self.budget.observe(res)
+                delay = self.budget.retry_delay(res, attempt)
+                if delay is None:
+                    return res
+
+                self.stats["retries"] += 1
+                self.stats["throttled_ms"] += int(delay * 1000)
+                attempt += 1
+                await asyncio.sleep(delay)
+
+
+async def gather_in_order(*aws):
+    """
+    Like asyncio.gather, but waits for every awaitable before re-raising the
+    first failure, so no request is left running against a closed client.
+    Results keep the order of `aws`.
+    """
+    results = await asyncio.gather(*aws, return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return results
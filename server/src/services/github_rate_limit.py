@@ -0,0 +1,209 @@
+import asyncio
+import heapq
+import itertools
+import os
+import random
+import re
+import time
+from contextlib import asynccontextmanager
+import httpx
+
+# -------------------- CALL PRIORITIES --------------------
+# Lower value = more valuable. When budget runs low, high-value calls are
+# served first and the lowest-value ones are dropped.
+
+PRIORITY_REPOS = 0
+PRIORITY_EVENTS = 1
+PRIORITY_LANGUAGES = 2
+PRIORITY_COMMITS = 3
+PRIORITY_COMMIT_DETAIL = 4
+
+_PRIORITY_PATHS = [
+    (re.compile(r"^/user/repos$"), PRIORITY_REPOS),
+    (re.compile(r"^/users/[^/]+/events$"), PRIORITY_EVENTS),
+    (re.compile(r"^/repos/[^/]+/[^/]+/languages$"), PRIORITY_LANGUAGES),
+    (re.compile(r"^/repos/[^/]+/[^/]+/commits$"), PRIORITY_COMMITS),
+    (re.compile(r"^/repos/[^/]+/[^/]+/commits/[^/]+$"), PRIORITY_COMMIT_DETAIL),
+]
+
+
+def request_priority(url: str) -> int:
+    path = httpx.URL(url).path
+    for pattern, priority in _PRIORITY_PATHS:
+        if pattern.match(path):
+            return priority
+    return PRIORITY_COMMITS
+
+# -------------------- BUDGET CONFIG --------------------
+
+# Below this many remaining calls, only calls more valuable than commit
+# details are made, and they pause until the window resets
+GITHUB_RATE_LIMIT_RESERVE = int(os.getenv("GITHUB_RATE_LIMIT_RESERVE", "100"))
+# Below this fraction of the hourly limit, calls are paced across the rest of the window
+GITHUB_RATE_LIMIT_SLOWDOWN = float(os.getenv("GITHUB_RATE_LIMIT_SLOWDOWN", "0.1"))
+# Longest we will sleep for a reset / Retry-After before failing the call
+GITHUB_RATE_LIMIT_MAX_PAUSE = float(os.getenv("GITHUB_RATE_LIMIT_MAX_PAUSE", "60"))
+MAX_PACE_DELAY = 2.0
+MAX_RETRIES = 3
+BACKOFF_BASE = 1.0
+
+
+class RateLimitExhausted(Exception):
+    """Raised when a call would spend budget the token no longer has."""
+
+
+class TokenBudget:
+    """
+    Rate-limit state for one GitHub token, learned from the
+    X-RateLimit-* headers of every response made with it.
+    """
+
+    def __init__(self):
+        self.limit: int | None = None
+        self.remaining: int | None = None
+        self.reset_at: float | None = None  # epoch seconds
+
+    def observe(self, response: httpx.Response) -> None:
+        headers = response.headers
+        if not isinstance(headers, httpx.Headers):
+            return
+        try:
+            if "x-ratelimit-limit" in headers:
+                self.limit = int(headers["x-ratelimit-limit"])
+            if "x-ratelimit-remaining" in headers:
+                self.remaining = int(headers["x-ratelimit-remaining"])
+            if "x-ratelimit-reset" in headers:
+                self.reset_at = float(headers["x-ratelimit-reset"])
+        except ValueError:
+            pass
+
+    def _seconds_to_reset(self) -> float:
+        if self.reset_at is None:
+            return 0.0
+        return max(0.0, self.reset_at - time.time())
+
+    async def before_request(self, priority: int) -> float:
+        """
+        Throttles according to the remaining budget. Returns the seconds
+        slept; raises RateLimitExhausted if the call should not be made.
+        """
+        if self.remaining is None:
+            return 0.0
+
+        wait = self._seconds_to_reset()
+        if self.reset_at is not None and wait == 0.0:
+            # Window rolled over; the next response will tell us the new numbers
+            self.remaining = self.limit
+            return 0.0
+
+        if self.remaining <= GITHUB_RATE_LIMIT_RESERVE:
+            if priority >= PRIORITY_COMMIT_DETAIL or wait > GITHUB_RATE_LIMIT_MAX_PAUSE:
+                raise RateLimitExhausted(
+                    f"{self.remaining} GitHub calls left, resets in {int(wait)}s"
+                )
+            await asyncio.sleep(wait)
+            return wait
+
+        slept = 0.0
+        if self.limit and self.remaining < self.limit * GITHUB_RATE_LIMIT_SLOWDOWN:
+            # Spread what is left over the rest of the window
+            slept = min(MAX_PACE_DELAY, wait / max(1, self.remaining))
+            await asyncio.sleep(slept)
+
+        # Optimistic decrement so concurrent callers see the spend before headers arrive
+        self.remaining -= 1
+        return slept
+
+    def retry_delay(self, response: httpx.Response, attempt: int) -> float | None:
+        """
+        Seconds to wait before retrying a rate-limited response, or None if
+        it should not be retried.
+        """
+        if response.status_code not in (403, 429) or attempt >= MAX_RETRIES:
+            return None
+
+        headers = response.headers
+        retry_after = headers.get("retry-after")
+        if retry_after:
+            try:
+                delay = float(retry_after)
+            except ValueError:
+                delay = BACKOFF_BASE
+            return delay if delay <= GITHUB_RATE_LIMIT_MAX_PAUSE else None
+
+        if headers.get("x-ratelimit-remaining") == "0":
+            delay = self._seconds_to_reset()
+            return delay if delay <= GITHUB_RATE_LIMIT_MAX_PAUSE else None
+
+        # A plain 403 (no access) is not worth retrying; secondary limits say so in the body
+        if response.status_code == 403 and "rate limit" not in response.text.lower():
+            return None
+
+        return BACKOFF_BASE * (2 ** attempt) + random.uniform(0, BACKOFF_BASE)
+
+    def as_dict(self) -> dict:
+        return {
+            "limit": self.limit,
+            "remaining": self.remaining,
+            "reset_at": self.reset_at,
+        }
+
+
+class RateLimitRegistry:
+    """Process-wide TokenBudget per token (keyed by the token's cache key)."""
+
+    def __init__(self):
+        self._budgets: dict[str, TokenBudget] = {}
+
+    def for_token(self, token_key: str) -> TokenBudget:
+        budget = self._budgets.get(token_key)
+        if budget is None:
+            budget = TokenBudget()
+            self._budgets[token_key] = budget
+        return budget
+
+
+rate_limits = RateLimitRegistry()
+
+
+class PrioritySemaphore:
+    """
+    Semaphore whose waiters are admitted lowest priority value first
+    (FIFO within a priority).
+    """
+
+    def __init__(self, value: int):
+        self._value = value
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+
+    async def acquire(self, priority: int = 0) -> None:
+        if self._value > 0 and not self._waiters:
+            self._value -= 1
+            return
+
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), fut))
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # Slot was handed to us just before cancellation; pass it on
+                self.release()
+            raise
+
+    def release(self) -> None:
+        while self._waiters:
+            _, _, fut = heapq.heappop(self._waiters)
+            if not fut.done():
+                fut.set_result(None)
+                return
+        self._value += 1
+
+    @asynccontextmanager
+    async def slot(self, priority: int = 0):
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
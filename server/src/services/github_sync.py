@@ -1,3 +1,4 @@
+import os
 from datetime import datetime, timedelta, timezone
 from bson import ObjectId
 import httpx
@@ -7,23 +8,314 @@ from models.github_snapshots import (
     GitHubRepoSnapshot,
     GitHubCommitSnapshot,
 )
+from services.commit_rollups import ROLLUP_VERSION, CommitRollupStore, commit_session_masks, session_days
+from services.commit_stats import CommitStatsStore
+from services.commit_store import (
+    COMMIT_STORAGE,
+    CommitStore,
+    migrate_snapshot_commits,
+)
+from services.github_cache import ConditionalCache, token_cache_key
+from services.github_fetcher import GitHubFetcher, gather_in_order
+from services.github_rate_limit import rate_limits
+from services.http_clients import http_client
+from services.response_cache import dashboard_cache
+from services.single_flight import MongoLease, SingleFlight
 
-GITHUB_API_BASE = "https://api.github.com"
+GITHUB_API_BASE = os.getenv("GITHUB_API_BASE", "https://api.github.com")
 SYNC_LOOKBACK_DAYS = 90
 MAX_REPOS = 100          # safety cap
 MAX_COMMITS_PER_REPO = 100  # safety cap
+# Incremental syncs rely on stored high-water marks; a periodic full sync
+# repairs anything they could miss (force-pushes, deleted branches, ...)
+FULL_SYNC_EVERY = timedelta(days=7)
 users = db["user"]
 github_snapshots = db["github_snapshots"]
+github_http_cache = db["github_http_cache"]
+commit_stats = CommitStatsStore(db["commit_stats"])
+commit_store = CommitStore(db["github_commits"])
+commit_rollups = CommitRollupStore(db["github_daily_rollups"])
+sync_leases = db["sync_leases"]
+
+# One in-flight sync per user in this process
+_sync_flights = SingleFlight()
+
+
+def _parse_commit_stats(detail_json: dict) -> tuple[int | None, int | None]:
+    stats = detail_json.get("stats") or {}
+    additions = None
+    deletions = None
+    try:
+        if stats.get("additions") is not None:
+            additions = int(stats["additions"])
+    except (TypeError, ValueError):
+        additions = None
+    try:
+        if stats.get("deletions") is not None:
+            deletions = int(stats["deletions"])
+    except (TypeError, ValueError):
+        deletions = None
+    return additions, deletions
+
+
+def _commit_date(c: dict) -> datetime | None:
+    commit_author = (c.get("commit") or {}).get("author")
+    if not commit_author or not commit_author.get("date"):
+        return None
+    return datetime.fromisoformat(commit_author["date"].replace("Z", "+00:00"))
+
+
+async def _fetch_commit_detail(fetcher: GitHubFetcher, full_name: str, sha: str) -> dict | None:
+    """Returns the commit's stats entry, or None if it could not be fetched."""
+    try:
+        res = await fetcher.get(f"{GITHUB_API_BASE}/repos/{full_name}/commits/{sha}")
+        if res.status_code == 200:
+            detail = res.json()
+            additions, deletions = _parse_commit_stats(detail)
+            return {
+                "additions": additions,
+                "deletions": deletions,
+                "committed_at": _commit_date(detail),
+            }
+    except Exception:
+        pass
+    return None
+
+
+async def _commit_stats_for(fetcher: GitHubFetcher, full_name: str, shas: list[str]) -> dict[str, dict]:
+    """
+    Stats for each SHA, served from the commit_stats store when known; only
+    unknown SHAs hit GitHub (concurrently) and are then stored for good.
+    """
+    known = await commit_stats.get_many(full_name, shas)
+    missing = [sha for sha in shas if sha not in known]
+
+    details = await gather_in_order(
+        *(_fetch_commit_detail(fetcher, full_name, sha) for sha in missing)
+    )
+    fetched = {sha: entry for sha, entry in zip(missing, details) if entry}
+    await commit_stats.put_many(full_name, fetched)
+
+    return {**known, **fetched}
+
+
+async def _fetch_repo_languages(fetcher: GitHubFetcher, full_name: str) -> dict[str, int]:
+    languages_res = await fetcher.get(f"{GITHUB_API_BASE}/repos/{full_name}/languages")
+    languages: dict[str, int] = {}
+    if languages_res.status_code == 200:
+        for language, lines in languages_res.json().items():
+            try:
+                languages[language] = int(lines)
+            except (TypeError, ValueError):
+                continue
+    return languages
+
+
+async def _fetch_repo_commits(
+    fetcher: GitHubFetcher,
+    repo: dict,
+    user: dict,
+    since: str,
+    stop_sha: str | None = None,
+    known_shas: set[str] | frozenset = frozenset(),
+) -> tuple[list[GitHubCommitSnapshot], dict | None]:
+    """
+    Returns the user's commits in `repo` newer than `since` (and newer than
+    `stop_sha`, the previous high-water mark), plus the new high-water mark.
+    """
+    full_name = repo["full_name"]
+
+    commits_res = await fetcher.get(
+        f"{GITHUB_API_BASE}/repos/{full_name}/commits",
+        params={
+            "since": since,
+            "per_page": MAX_COMMITS_PER_REPO,
+        },
+    )
+
+    if commits_res.status_code != 200:
+        return [], None
+
+    commits_data = commits_res.json()
+    if not commits_data:
+        return [], None
+
+    # GitHub lists newest first; everything from the previous newest SHA on was seen before
+    if stop_sha:
+        for index, c in enumerate(commits_data):
+            if c.get("sha") == stop_sha:
+                commits_data = commits_data[:index]
+                break
+
+    high_water = None
+    for c in commits_data:
+        committed_at = _commit_date(c)
+        if committed_at is not None:
+            high_water = {"newest_sha": c["sha"], "newest_committed_at": committed_at}
+            break
+
+    app_email = user.get("email")
+    matching = []
+
+    for c in commits_data:
+        if c["sha"] in known_shas:
+            continue
+        gh_author = c.get("author")
+        commit_data = c.get("commit", {})
+        commit_author = commit_data.get("author")
 
+        if not commit_author or not commit_author.get("date"):
+            continue
 
-async def sync_github_snapshot(user_id: ObjectId) -> None:
+        author_email = commit_author.get("email")
+
+        matches_login = (
+            gh_author is not None
+            and gh_author.get("login") == user["github"]["username"]
+        )
+        matches_email = (
+            author_email is not None
+            and app_email is not None
+            and author_email.lower() == app_email.lower()
+        )
+
+        if not (matches_login or matches_email):
+            continue
+
+        matching.append(c)
+
+    stats_by_sha = await _commit_stats_for(fetcher, full_name, [c["sha"] for c in matching])
+
+    commits = []
+    for c in matching:
+        commit_data = c.get("commit", {})
+        entry = stats_by_sha.get(c["sha"]) or {}
+        additions, deletions = entry.get("additions"), entry.get("deletions")
+        commits.append(
+            GitHubCommitSnapshot(
+                repo_id=repo["id"],
+                repo_name=repo["name"],
+                sha=c["sha"],
+                message=commit_data.get("message", ""),
+                committed_at=datetime.fromisoformat(
+                    commit_data["author"]["date"].replace("Z", "+00:00")
+                ),
+                additions=additions,
+                deletions=deletions,
+            )
+        )
+    return commits, high_water
+
+
+async def _fetch_repo(
+    fetcher: GitHubFetcher,
+    repo: dict,
+    user: dict,
+    window_start: datetime,
+    prev_state: dict | None,
+    known_shas: set[str],
+):
+    """
+    Returns (languages, commits, repo_state) for one repo. With a previous
+    state, a repo whose pushed_at is unchanged is skipped entirely and only
+    commits after the stored high-water mark are requested.
     """
-    Fetches GitHub data for a user and writes a fresh GitHubSnapshot.
+    pushed_at = repo.get("pushed_at")
+
+    if prev_state and pushed_at and prev_state.get("pushed_at") == pushed_at:
+        return prev_state.get("languages") or {}, [], prev_state
+
+    since = window_start
+    stop_sha = None
+    if prev_state and prev_state.get("newest_committed_at"):
+        newest = prev_state["newest_committed_at"]
+        if newest.tzinfo is None:
+            newest = newest.replace(tzinfo=timezone.utc)
+        since = max(window_start, newest)
+        stop_sha = prev_state.get("newest_sha")
+
+    languages, (repo_commits, high_water) = await gather_in_order(
+        _fetch_repo_languages(fetcher, repo["full_name"]),
+        _fetch_repo_commits(fetcher, repo, user, since.isoformat(), stop_sha, known_shas),
+    )
+
+    state = {
+        "full_name": repo["full_name"],
+        "pushed_at": pushed_at,
+        "languages": languages,
+        "newest_sha": None,
+        "newest_committed_at": None,
+    }
+    if high_water:
+        state.update(high_water)
+    elif prev_state:
+        state["newest_sha"] = prev_state.get("newest_sha")
+        state["newest_committed_at"] = prev_state.get("newest_committed_at")
+
+    return languages, repo_commits, state
+
+
+def _as_utc(dt):
+    if isinstance(dt, datetime) and dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+async def sync_github_snapshot(
+    user_id: ObjectId,
+    full: bool = False,
+    client: httpx.AsyncClient | None = None,
+) -> None:
+    """
+    Fetches GitHub data for a user and writes a GitHubSnapshot.
     Safe to call multiple times.
+
+    When a previous snapshot exists (and `full` is False), only repos pushed
+    since the last sync are fetched, new commits are merged into the stored
+    ones and commits older than the lookback window are aged out.
+
+    `client` is the shared GitHub client injected by the route; without
+    one the app-level client (or a temporary one) is used.
+
+    Concurrent calls for the same user share one sync: callers in this
+    process await the same in-flight call, and other processes wait for the
+    holder of the user's Mongo lease to finish.
     """
+    return await _sync_flights.do(
+        str(user_id),
+        lambda: _sync_with_lease(user_id, full, client),
+    )
+
+
+async def _sync_with_lease(
+    user_id: ObjectId,
+    full: bool,
+    client: httpx.AsyncClient | None,
+) -> None:
+    lease = MongoLease(sync_leases, user_id)
+    if not await lease.try_acquire():
+        # Another worker is syncing this user; wait for its snapshot instead
+        if await lease.wait_released():
+            return
+        # Still held after the wait: a stuck holder's lease has expired by
+        # now unless it is still being renewed
+        if not await lease.try_acquire():
+            raise RuntimeError("GitHub sync for this user is still running elsewhere")
+
+    try:
+        await _sync_github_snapshot(user_id, full, client)
+    finally:
+        await lease.release()
+
+
+async def _sync_github_snapshot(
+    user_id: ObjectId,
+    full: bool,
+    client: httpx.AsyncClient | None,
+) -> None:
 
     # 1. Load user + validate GitHub connection
-    user = await users.find_one({"_id": user_id})
+    user = await users.find_one({"_id": user_id}, {"github": 1, "email": 1})
     if not user or not user.get("github"):
         # No GitHub linked → nothing to sync
         return
@@ -40,7 +332,42 @@ async def sync_github_snapshot(user_id: ObjectId) -> None:
         "Accept": "application/vnd.github+json",
     }
 
-    since = (datetime.now(timezone.utc) - timedelta(days=SYNC_LOOKBACK_DAYS)).isoformat()
+    now = datetime.now(timezone.utc)
+    # Day-aligned so the commits query (and its ETag) stays stable between syncs
+    window_start = (now - timedelta(days=SYNC_LOOKBACK_DAYS)).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+
+    snapshot = await github_snapshots.find_one(
+        {"user_id": user_id},
+        {
+            "repo_state": 1,
+            "last_synced_at": 1,
+            "last_full_sync_at": 1,
+            "commit_storage": 1,
+            "rollup_version": 1,
+        },
+    )
+    if snapshot and snapshot.get("commit_storage") != COMMIT_STORAGE:
+        # Legacy snapshot with an embedded commits array
+        await migrate_snapshot_commits(github_snapshots, commit_store, user_id)
+    last_synced_at = _as_utc(snapshot.get("last_synced_at")) if snapshot else None
+    last_full_sync_at = _as_utc(snapshot.get("last_full_sync_at")) if snapshot else None
+
+    incremental = (
+        not full
+        and snapshot is not None
+        and snapshot.get("repo_state") is not None
+        and isinstance(last_synced_at, datetime)
+        and isinstance(last_full_sync_at, datetime)
+        and last_full_sync_at > now - FULL_SYNC_EVERY
+    )
+
+    prev_states: dict[str, dict] = {}
+    known_shas: set[str] = set()
+    if incremental:
+        prev_states = {s["full_name"]: s for s in snapshot["repo_state"]}
+        known_shas = set(await commit_store.known_shas(user_id, since=window_start))
 
     repos: list[GitHubRepoSnapshot] = []
     commits: list[GitHubCommitSnapshot] = []
@@ -49,11 +376,17 @@ async def sync_github_snapshot(user_id: ObjectId) -> None:
     # --------------------------------------------------
     # 2. Fetch repositories
     # --------------------------------------------------
-    
-    async with httpx.AsyncClient(timeout=30) as client:
-        repo_res = await client.get(
+
+    async with http_client("github", client) as client:
+        fetcher = GitHubFetcher(
+            client,
+            headers,
+            cache=ConditionalCache(github_http_cache, str(user_id)),
+            budget=rate_limits.for_token(token_cache_key(access_token)),
+        )
+
+        repo_res = await fetcher.get(
             f"{GITHUB_API_BASE}/user/repos",
-            headers=headers,
             params={
                 "per_page": MAX_REPOS,
                 "sort": "pushed",
@@ -82,191 +415,164 @@ async def sync_github_snapshot(user_id: ObjectId) -> None:
                 )
             )
 
-        for repo in gh_repos:
-            full_name = repo["full_name"]
-
-            languages_res = await client.get(
-                f"{GITHUB_API_BASE}/repos/{full_name}/languages",
-                headers=headers,
+        # Languages, commit lists and commit details for every repo run in
+        # parallel; results are merged in repo order so the snapshot is stable.
+        repo_results = await gather_in_order(
+            *(
+                _fetch_repo(
+                    fetcher,
+                    repo,
+                    user,
+                    window_start,
+                    prev_states.get(repo["full_name"]),
+                    known_shas,
+                )
+                for repo in gh_repos
             )
-            if languages_res.status_code == 200:
-                repo_languages = languages_res.json()
-                for language, lines in repo_languages.items():
-                    try:
-                        value = int(lines)
-                    except (TypeError, ValueError):
-                        continue
-                    languages_totals[language] = languages_totals.get(language, 0) + value
+        )
 
-        for repo in gh_repos:
-            full_name = repo["full_name"]
-
-            commits_res = await client.get(
-                f"{GITHUB_API_BASE}/repos/{full_name}/commits",
-                headers=headers,
-                params={
-                    "since": since,
-                    "per_page": MAX_COMMITS_PER_REPO,
-                },
-            )
+        repo_states = []
+        for repo_languages, repo_commits, repo_state in repo_results:
+            for language, value in repo_languages.items():
+                languages_totals[language] = languages_totals.get(language, 0) + value
+            commits.extend(repo_commits)
+            repo_states.append(repo_state)
 
-            if commits_res.status_code != 200:
-                continue
-            
-            commits_data = commits_res.json()
-            if not commits_data:
-                continue
-                
+        # --------------------------------------------------
+        # 3. Fetch recent events (to catch branch commits & org repos)
+        # --------------------------------------------------
+        events_res = await fetcher.get(
+            f"{GITHUB_API_BASE}/users/{user['github']['username']}/events",
+            params={"per_page": 100}
+        )
 
-            for c in commits_data:
-                gh_author = c.get("author")
-                commit_data = c.get("commit", {})
-                commit_author = commit_data.get("author")
+        if events_res.status_code == 200:
+            events = events_res.json()
+            existing_shas = known_shas | {c.sha for c in commits}
+            pending = []
 
-                if not commit_author or not commit_author.get("date"):
+            for event in events:
+                if event["type"] != "PushEvent":
                     continue
+                if incremental and event.get("created_at"):
+                    pushed = datetime.fromisoformat(event["created_at"].replace("Z", "+00:00"))
+                    if pushed < last_synced_at:
+                        continue
+                for payload_commit in event["payload"].get("commits", []):
+                    sha = payload_commit["sha"]
+                    if sha in existing_shas:
+                        continue
+                    existing_shas.add(sha)
+                    pending.append((event, payload_commit))
 
-                app_email = user.get("email")
-                author_email = commit_author.get("email")
-
-                matches_login = (
-                    gh_author is not None
-                    and gh_author.get("login") == user["github"]["username"]
-                )
-                matches_email = (
-                    author_email is not None
-                    and app_email is not None
-                    and author_email.lower() == app_email.lower()
-                )
-
-                if not (matches_login or matches_email):
-                    # print(f"    Skipping commit {c['sha'][:7]} (Login: {gh_author.get('login') if gh_author else 'None'}, Email: {author_email})")
-                    continue
+            shas_by_repo: dict[str, list[str]] = {}
+            for event, payload_commit in pending:
+                shas_by_repo.setdefault(event["repo"]["name"], []).append(payload_commit["sha"])
 
-                sha = c["sha"]
+            repo_names = list(shas_by_repo)
+            stats_per_repo = await gather_in_order(
+                *(_commit_stats_for(fetcher, name, shas_by_repo[name]) for name in repo_names)
+            )
+            event_stats = dict(zip(repo_names, stats_per_repo))
 
-                additions = None
-                deletions = None
+            for event, payload_commit in pending:
+                repo_name = event["repo"]["name"]  # full name, e.g. "user/repo"
+                created_at = datetime.fromisoformat(event["created_at"].replace("Z", "+00:00"))
+                entry = event_stats[repo_name].get(payload_commit["sha"]) or {}
+                additions, deletions = entry.get("additions"), entry.get("deletions")
 
-                try:
-                    commit_detail_res = await client.get(
-                        f"{GITHUB_API_BASE}/repos/{full_name}/commits/{sha}",
-                        headers=headers,
-                    )
-                    if commit_detail_res.status_code == 200:
-                        detail_json = commit_detail_res.json()
-                        stats = detail_json.get("stats") or {}
-                        raw_additions = stats.get("additions")
-                        raw_deletions = stats.get("deletions")
-                        try:
-                            if raw_additions is not None:
-                                additions = int(raw_additions)
-                        except (TypeError, ValueError):
-                            additions = None
-                        try:
-                            if raw_deletions is not None:
-                                deletions = int(raw_deletions)
-                        except (TypeError, ValueError):
-                            deletions = None
-                except Exception:
-                    additions = None
-                    deletions = None
+                # The event date is the push time, commit date might be different
+                if entry.get("committed_at"):
+                    created_at = entry["committed_at"]
+                    if created_at.tzinfo is None:
+                        created_at = created_at.replace(tzinfo=timezone.utc)
 
                 commits.append(
                     GitHubCommitSnapshot(
-                        repo_id=repo["id"],
-                        repo_name=repo["name"],
-                        sha=sha,
-                        message=commit_data.get("message", ""),
-                        committed_at=datetime.fromisoformat(
-                            commit_author["date"].replace("Z", "+00:00")
-                        ),
+                        repo_id=event["repo"]["id"],
+                        # store just the name part to match repo["name"] used above
+                        repo_name=repo_name.split("/")[-1],
+                        sha=payload_commit["sha"],
+                        message=payload_commit["message"],
+                        committed_at=created_at,
                         additions=additions,
-                        deletions=deletions,
+                        deletions=deletions
                     )
                 )
 
-        # --------------------------------------------------
-        # 3. Fetch recent events (to catch branch commits & org repos)
-        # --------------------------------------------------
-        events_res = await client.get(
-            f"{GITHUB_API_BASE}/users/{user['github']['username']}/events",
-            headers=headers,
-            params={"per_page": 100}
-        )
-        
-        if events_res.status_code == 200:
-            events = events_res.json()
-            existing_shas = {c.sha for c in commits}
-            
-            for event in events:
-                if event["type"] == "PushEvent":
-                    repo_name = event["repo"]["name"]  # e.g. "user/repo"
-                    repo_id = event["repo"]["id"]
-                    created_at = datetime.fromisoformat(event["created_at"].replace("Z", "+00:00"))
-                    
-                    # Check if this repo is already in our repos list
-                    # If not, we might want to add it (or just track the commit)
-                    # For now, just track the commit
-                    
-                    for payload_commit in event["payload"].get("commits", []):
-                        sha = payload_commit["sha"]
-                        if sha in existing_shas:
-                            continue
-                            
-                        # Fetch stats for this commit
-                        additions = None
-                        deletions = None
-                        try:
-                            detail_res = await client.get(
-                                f"{GITHUB_API_BASE}/repos/{repo_name}/commits/{sha}",
-                                headers=headers
-                            )
-                            if detail_res.status_code == 200:
-                                d = detail_res.json()
-                                stats = d.get("stats", {})
-                                additions = stats.get("additions")
-                                deletions = stats.get("deletions")
-                                
-                                # Also get the correct date from the commit detail
-                                # The event date is the push time, commit date might be different
-                                if d.get("commit") and d["commit"].get("author"):
-                                    c_date = d["commit"]["author"]["date"]
-                                    created_at = datetime.fromisoformat(c_date.replace("Z", "+00:00"))
-                        except Exception:
-                            pass
-                            
-                        commits.append(
-                            GitHubCommitSnapshot(
-                                repo_id=repo_id,
-                                repo_name=repo_name.split("/")[-1], # store just the name part to match others? 
-                                                                   # Wait, existing logic uses repo["name"] which is just "DailySync"? 
-                                                                   # No, GitHub API "name" is "DailySync", "full_name" is "manyaa-fr/DailySync"
-                                                                   # event["repo"]["name"] is "manyaa-fr/DailySync" (full name)
-                                sha=sha,
-                                message=payload_commit["message"],
-                                committed_at=created_at,
-                                additions=additions,
-                                deletions=deletions
-                            )
-                        )
-                        existing_shas.add(sha)
-
     # --------------------------------------------------
-    # 4. Upsert snapshot (atomic replace)
+    # 4. Store commits and daily rollups, then upsert snapshot
     # --------------------------------------------------
+    commit_docs = [c.dict() for c in commits]
+    rollups_current = incremental and snapshot.get("rollup_version") == ROLLUP_VERSION
+
+    if incremental:
+        # Only the new commits are written; commits that left the window are dropped
+        inserted = await commit_store.insert_new(user_id, commit_docs)
+        if rollups_current:
+            await commit_rollups.apply(user_id, inserted)
+            days = session_days(inserted)
+            if days:
+                # Sessions join neighbouring commits; recompute from all of them
+                around = await commit_store.find_range(
+                    user_id,
+                    since=days[0] - timedelta(days=1),
+                    until=days[-1] + timedelta(days=2),
+                    projection={"_id": 0, "repo_name": 1, "committed_at": 1},
+                )
+                await commit_rollups.set_sessions(user_id, commit_session_masks(around), days)
+    else:
+        stored = await commit_store.known_shas(user_id)
+        await commit_store.insert_new(user_id, commit_docs)
+        await commit_store.fill_stats(
+            user_id,
+            [
+                c for c in commit_docs
+                if stored.get(c["sha"]) is False and c.get("additions") is not None
+            ],
+        )
+        # A full sync is authoritative for the window
+        await commit_store.delete_except(user_id, [c["sha"] for c in commit_docs])
+    await commit_store.delete_older_than(user_id, window_start)
+
+    if rollups_current:
+        # window_start is day-aligned, so whole days age out with their commits
+        await commit_rollups.delete_older_than(user_id, window_start)
+    else:
+        await commit_rollups.rebuild(
+            user_id,
+            await commit_store.find_range(
+                user_id,
+                projection={"_id": 0, "repo_name": 1, "committed_at": 1, "additions": 1, "deletions": 1},
+            ),
+        )
+
     now = datetime.now(timezone.utc)
+    fields = {
+        "repos": [r.dict() for r in repos],
+        "repo_state": repo_states,
+        "languages": languages_totals,
+        "commit_storage": COMMIT_STORAGE,
+        "rollup_version": ROLLUP_VERSION,
+        "last_synced_at": now,
+        "updated_at": now,
+        "sync_stats": {
+            "requests": fetcher.stats["requests"],
+            "not_modified": fetcher.stats["not_modified"],
+            # 304s are free; every other request used rate-limit budget
+            "rate_limit_used": fetcher.stats["requests"] - fetcher.stats["not_modified"],
+            "rate_limit_remaining": fetcher.budget.remaining,
+            "retries": fetcher.stats["retries"],
+            "throttled_ms": fetcher.stats["throttled_ms"],
+        },
+    }
+    if not incremental:
+        fields["last_full_sync_at"] = now
 
     await github_snapshots.update_one(
         {"user_id": user_id},
         {
-            "$set": {
-                "repos": [r.dict() for r in repos],
-                "commits": [c.dict() for c in commits],
-                "languages": languages_totals,
-                "last_synced_at": now,
-                "updated_at": now,
-            },
+            "$set": fields,
             "$setOnInsert": {
                 "user_id": user_id,
                 "created_at": now,
@@ -274,3 +580,5 @@ async def sync_github_snapshot(user_id: ObjectId) -> None:
         },
         upsert=True,
     )
+    # New updated_at already changes the cache key; this frees the old render
+    await dashboard_cache.invalidate(user_id)
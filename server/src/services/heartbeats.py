@@ -0,0 +1,156 @@
+import os
+from datetime import datetime, timedelta, timezone
+from bson import ObjectId
+from pymongo import InsertOne, ReplaceOne
+
+# -------------------- CONFIG --------------------
+
+# A pause longer than this between heartbeats ends a session
+HEARTBEAT_IDLE_GAP_MINUTES = int(os.getenv("HEARTBEAT_IDLE_GAP_MINUTES", "15"))
+# Sessions at least this long are flagged isDeepWork
+DEEP_WORK_MIN_MINUTES = int(os.getenv("DEEP_WORK_MIN_MINUTES", "50"))
+
+HEARTBEAT_SOURCE = "heartbeat"
+# Distinct files remembered per session
+MAX_SESSION_FILES = 50
+
+
+def _utc(dt: datetime) -> datetime:
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def sessionize(spans: list[dict], gap: timedelta) -> list[dict]:
+    """
+    Merges spans of one project ({start, end, heartbeats, files, ids})
+    into sessions: spans closer than `gap` join the same session. A
+    heartbeat is a zero-length span; a stored session is passed as its own
+    span, with its _id in `ids`.
+    """
+    sessions = []
+    for span in sorted(spans, key=lambda s: s["start"]):
+        if sessions and span["start"] - sessions[-1]["end"] <= gap:
+            last = sessions[-1]
+            last["end"] = max(last["end"], span["end"])
+            last["heartbeats"] += span["heartbeats"]
+            last["files"] |= span["files"]
+            last["ids"] += span["ids"]
+        else:
+            sessions.append({**span, "files": set(span["files"]), "ids": list(span["ids"])})
+    return sessions
+
+
+def session_log(user_id: ObjectId, project: str, session: dict) -> dict:
+    """A time_logs row for one session, shaped like a manually created log."""
+    start, end = session["start"], session["end"]
+    minutes = max(1, round((end - start).total_seconds() / 60))
+    files = sorted(session["files"])[:MAX_SESSION_FILES]
+    description = f"{session['heartbeats']} heartbeats"
+    if session["files"]:
+        description += f" across {len(session['files'])} files"
+    return {
+        "user_id": user_id,
+        "project": project,
+        "description": description,
+        "minutes": minutes,
+        "date": start.strftime("%Y-%m-%d"),
+        "startTime": start.strftime("%H:%M"),
+        "endTime": end.strftime("%H:%M"),
+        "isDeepWork": minutes >= DEEP_WORK_MIN_MINUTES,
+        "source": HEARTBEAT_SOURCE,
+        "tags": [],
+        "started_at": start,
+        "ended_at": end,
+        "heartbeats": session["heartbeats"],
+        "files": files,
+    }
+
+
+class HeartbeatSessionizer:
+    """
+    Folds raw editor heartbeats into time_logs sessions. Only sessions are
+    stored: a new batch is merged with the stored sessions it touches
+    (same project, within the idle gap), which are then replaced, so
+    heartbeats may arrive late, out of order or more than once.
+    """
+
+    def __init__(self, time_logs, aggregates, idle_gap_minutes: int = HEARTBEAT_IDLE_GAP_MINUTES):
+        self.time_logs = time_logs
+        self.aggregates = aggregates
+        self.gap = timedelta(minutes=idle_gap_minutes)
+
+    async def ingest(self, user_id: ObjectId, heartbeats: list[dict]) -> list[dict]:
+        """Returns the sessions written (new or extended)."""
+        by_project: dict[str, dict[datetime, set]] = {}
+        for hb in heartbeats:
+            # Same timestamp twice is one heartbeat resent
+            files = by_project.setdefault(hb["project"], {}).setdefault(_utc(hb["timestamp"]), set())
+            if hb.get("file"):
+                files.add(hb["file"])
+
+        written = []
+        for project, beats in by_project.items():
+            first, last = min(beats), max(beats)
+
+            stored = await self.time_logs.find({
+                "user_id": user_id,
+                "project": project,
+                "source": HEARTBEAT_SOURCE,
+                "ended_at": {"$gte": first - self.gap},
+                "started_at": {"$lte": last + self.gap},
+            }).to_list(None)
+
+            spans = [
+                {
+                    "start": _utc(s["started_at"]),
+                    "end": _utc(s["ended_at"]),
+                    "heartbeats": s.get("heartbeats", 1),
+                    "files": set(s.get("files", [])),
+                    "ids": [s["_id"]],
+                }
+                for s in stored
+            ]
+            # A heartbeat inside a stored session is already counted there
+            # (or a resend); it can still add a file, but not a heartbeat
+            stored_files = set().union(*(s["files"] for s in spans))
+            spans += [
+                {
+                    "start": t,
+                    "end": t,
+                    "heartbeats": 0 if any(s["start"] <= t <= s["end"] for s in spans) else 1,
+                    "files": files,
+                    "ids": [],
+                }
+                for t, files in beats.items()
+                if not (files <= stored_files and any(s["start"] <= t <= s["end"] for s in spans))
+            ]
+            if all(s["ids"] for s in spans):
+                continue  # nothing new
+
+            merged = sessionize(spans, self.gap)
+            sessions = []
+            ops = []
+            for session in merged:
+                doc = session_log(user_id, project, session)
+                if session["ids"]:
+                    # Extend one of the absorbed sessions in place
+                    doc["_id"] = session["ids"][0]
+                    ops.append(ReplaceOne({"_id": doc["_id"]}, doc, upsert=True))
+                else:
+                    doc["_id"] = ObjectId()
+                    ops.append(InsertOne(doc))
+                sessions.append(doc)
+
+            # Write before deleting, so a failure in between leaves overlapping
+            # sessions (merged again by the next batch) rather than lost time
+            await self.time_logs.bulk_write(ops, ordered=False)
+            stale = [i for session in merged for i in session["ids"][1:]]
+            if stale:
+                await self.time_logs.delete_many({"_id": {"$in": stale}})
+            if stored:
+                await self.aggregates.apply(user_id, stored, sign=-1)
+            await self.aggregates.apply(user_id, sessions)
+            written.extend(sessions)
+
+        return written
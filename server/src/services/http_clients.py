@@ -0,0 +1,100 @@
+import os
+from contextlib import asynccontextmanager
+import httpx
+
+try:
+    import h2  # noqa: F401  (enables httpx HTTP/2 support)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# -------------------- POOL CONFIG --------------------
+
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "true").lower() == "true" and HTTP2_AVAILABLE
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+
+# -------------------- PER-HOST TIMEOUTS --------------------
+
+TIMEOUTS = {
+    # api.github.com: REST calls made by the sync and github_client
+    "github": httpx.Timeout(
+        float(os.getenv("GITHUB_API_TIMEOUT", "30")),
+        connect=float(os.getenv("GITHUB_CONNECT_TIMEOUT", "5")),
+    ),
+    # github.com: OAuth code exchange
+    "github_oauth": httpx.Timeout(
+        float(os.getenv("GITHUB_OAUTH_TIMEOUT", "10")),
+        connect=float(os.getenv("GITHUB_CONNECT_TIMEOUT", "5")),
+    ),
+    # generativelanguage.googleapis.com
+    "gemini": httpx.Timeout(
+        float(os.getenv("GEMINI_TIMEOUT", "30")),
+        connect=float(os.getenv("GEMINI_CONNECT_TIMEOUT", "5")),
+    ),
+}
+
+_clients: dict[str, httpx.AsyncClient] = {}
+
+
+def build_client(name: str, **overrides) -> httpx.AsyncClient:
+    """Builds a pooled client with the settings for `name` (overrides go to httpx)."""
+    return httpx.AsyncClient(
+        http2=HTTP2_ENABLED,
+        timeout=TIMEOUTS[name],
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+        **overrides,
+    )
+
+
+async def start_http_clients() -> None:
+    """Creates the shared, pooled clients. Called from the FastAPI lifespan."""
+    for name in TIMEOUTS:
+        if name not in _clients:
+            _clients[name] = build_client(name)
+
+
+async def close_http_clients() -> None:
+    clients = list(_clients.values())
+    _clients.clear()
+    for client in clients:
+        await client.aclose()
+
+
+# -------------------- DEPENDENCIES --------------------
+# Return None outside the app lifespan (scripts, unit tests); callers then
+# fall back to a short-lived client via `http_client`.
+
+def get_github_client() -> httpx.AsyncClient | None:
+    return _clients.get("github")
+
+
+def get_github_oauth_client() -> httpx.AsyncClient | None:
+    return _clients.get("github_oauth")
+
+
+def get_gemini_client() -> httpx.AsyncClient | None:
+    return _clients.get("gemini")
+
+
+@asynccontextmanager
+async def http_client(name: str, client: httpx.AsyncClient | None = None):
+    """
+    Yields `client` if given, else the shared client for `name`, else a
+    temporary client that is closed on exit.
+    """
+    shared = client or _clients.get(name)
+    if shared is not None:
+        yield shared
+        return
+
+    temporary = build_client(name)
+    try:
+        yield temporary
+    finally:
+        await temporary.aclose()
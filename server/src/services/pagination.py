@@ -0,0 +1,59 @@
+import base64
+import json
+from datetime import datetime
+from bson import ObjectId
+from bson.errors import InvalidId
+
+
+class InvalidCursor(ValueError):
+    """Raised for a cursor that was not produced by encode_cursor."""
+
+
+def encode_cursor(value, _id: ObjectId) -> str:
+    """Opaque cursor for the position just after (value, _id)."""
+    if isinstance(value, datetime):
+        payload = {"t": "dt", "v": value.isoformat()}
+    else:
+        payload = {"t": "str", "v": str(value)}
+    payload["id"] = str(_id)
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        value = datetime.fromisoformat(payload["v"]) if payload["t"] == "dt" else payload["v"]
+        return value, ObjectId(payload["id"])
+    except (ValueError, KeyError, TypeError, InvalidId) as e:
+        raise InvalidCursor("Invalid cursor") from e
+
+
+async def fetch_page(collection, query: dict, field: str, cursor: str | None, limit: int) -> tuple[list[dict], str | None]:
+    """
+    Newest-first page of `query` ordered by (field, _id), starting after
+    `cursor`. Returns (documents, next cursor or None). Backed by an index
+    on (..query keys, field -1, _id -1), any page costs the same as the first.
+    """
+    if cursor:
+        value, last_id = decode_cursor(cursor)
+        query = {
+            **query,
+            "$or": [
+                {field: {"$lt": value}},
+                {field: value, "_id": {"$lt": last_id}},
+            ],
+        }
+
+    # One extra document tells whether there is a next page
+    docs = await (
+        collection.find(query)
+        .sort([(field, -1), ("_id", -1)])
+        .limit(limit + 1)
+        .to_list(length=limit + 1)
+    )
+    if len(docs) <= limit:
+        return docs, None
+    docs = docs[:limit]
+    return docs, encode_cursor(docs[-1].get(field), docs[-1]["_id"])
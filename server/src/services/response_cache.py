@@ -0,0 +1,114 @@
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+from config.db import db
+
+# -------------------- CONFIG --------------------
+
+DASHBOARD_CACHE_TTL = int(os.getenv("DASHBOARD_CACHE_TTL_SECONDS", "300"))
+DASHBOARD_CACHE_MAX_ENTRIES = int(os.getenv("DASHBOARD_CACHE_MAX_ENTRIES", "1000"))
+# Shared tier so every worker process benefits from one worker's render
+DASHBOARD_CACHE_SHARED = os.getenv("DASHBOARD_CACHE_SHARED", "false").lower() == "true"
+
+
+class ResponseCache:
+    """
+    Rendered responses per (user_id, version): an in-process LRU with TTL,
+    optionally backed by a shared Mongo collection.
+
+    The version identifies the data a response was built from (e.g. the
+    snapshot's updated_at), so a new snapshot simply misses; `invalidate`
+    only frees the stale entries early.
+    """
+
+    def __init__(
+        self,
+        ttl: int = DASHBOARD_CACHE_TTL,
+        max_entries: int = DASHBOARD_CACHE_MAX_ENTRIES,
+        collection=None,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.collection = collection
+        self._lru: OrderedDict[str, tuple[float, str, dict]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def etag(user_id, version: str) -> str:
+        digest = hashlib.sha256(f"{user_id}:{version}".encode("utf-8")).hexdigest()[:32]
+        return f'W/"{digest}"'
+
+    async def get(self, user_id, version: str) -> dict | None:
+        key = str(user_id)
+        entry = self._lru.get(key)
+        if entry is not None:
+            expires_at, cached_version, body = entry
+            if cached_version == version and expires_at > time.monotonic():
+                self._lru.move_to_end(key)
+                self.hits += 1
+                return body
+            del self._lru[key]
+
+        if self.collection is not None:
+            doc = await self.collection.find_one(
+                {
+                    "_id": key,
+                    "version": version,
+                    "expires_at": {"$gt": datetime.now(timezone.utc)},
+                },
+                {"body": 1},
+            )
+            if doc:
+                self._remember(key, version, doc["body"])
+                self.hits += 1
+                return doc["body"]
+
+        self.misses += 1
+        return None
+
+    async def set(self, user_id, version: str, body: dict) -> None:
+        key = str(user_id)
+        self._remember(key, version, body)
+
+        if self.collection is not None:
+            await self.collection.update_one(
+                {"_id": key},
+                {
+                    "$set": {
+                        "version": version,
+                        "body": body,
+                        "expires_at": datetime.now(timezone.utc) + timedelta(seconds=self.ttl),
+                    }
+                },
+                upsert=True,
+            )
+
+    async def invalidate(self, user_id) -> None:
+        key = str(user_id)
+        self._lru.pop(key, None)
+        if self.collection is not None:
+            await self.collection.delete_one({"_id": key})
+
+    def _remember(self, key: str, version: str, body: dict) -> None:
+        self._lru[key] = (time.monotonic() + self.ttl, version, body)
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    def as_dict(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRatio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": len(self._lru),
+        }
+
+
+dashboard_cache = ResponseCache(
+    collection=db["dashboard_cache"] if DASHBOARD_CACHE_SHARED else None,
+)
@@ -0,0 +1,99 @@
+import asyncio
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from pymongo.errors import DuplicateKeyError
+
+# How long a lease is valid without renewal (a crashed worker's lease lapses after this)
+LEASE_TTL = timedelta(seconds=int(os.getenv("SYNC_LEASE_TTL_SECONDS", "60")))
+# How long a caller waits for another worker's lease before giving up
+LEASE_WAIT = timedelta(seconds=int(os.getenv("SYNC_LEASE_WAIT_SECONDS", "120")))
+LEASE_POLL_INTERVAL = 0.5
+
+PROCESS_ID = f"{socket.gethostname()}-{os.getpid()}"
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls with the same key into one in-flight call.
+    The work runs in its own task, so a caller that is cancelled does not
+    cancel the call the others are waiting on.
+    """
+
+    def __init__(self):
+        self._inflight: dict[str, asyncio.Task] = {}
+
+    def in_flight(self, key: str) -> bool:
+        return key in self._inflight
+
+    async def do(self, key: str, fn):
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+
+class MongoLease:
+    """
+    Cross-process mutual exclusion on a key, backed by one document per key
+    whose expires_at is renewed while the holder is alive.
+    """
+
+    def __init__(self, collection, key, ttl: timedelta = LEASE_TTL):
+        self.collection = collection
+        self.key = key
+        self.ttl = ttl
+        self.owner = f"{PROCESS_ID}-{uuid.uuid4().hex[:8]}"
+        self._renewer: asyncio.Task | None = None
+
+    async def try_acquire(self) -> bool:
+        now = datetime.now(timezone.utc)
+        try:
+            # Matches only an expired lease; if a live one exists the upsert's
+            # insert collides on _id and we know someone else holds it.
+            await self.collection.update_one(
+                {"_id": self.key, "expires_at": {"$lt": now}},
+                {
+                    "$set": {
+                        "owner": self.owner,
+                        "acquired_at": now,
+                        "expires_at": now + self.ttl,
+                    }
+                },
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            return False
+        self._renewer = asyncio.create_task(self._renew())
+        return True
+
+    async def _renew(self) -> None:
+        while True:
+            await asyncio.sleep(self.ttl.total_seconds() / 3)
+            await self.collection.update_one(
+                {"_id": self.key, "owner": self.owner},
+                {"$set": {"expires_at": datetime.now(timezone.utc) + self.ttl}},
+            )
+
+    async def release(self) -> None:
+        if self._renewer:
+            self._renewer.cancel()
+            await asyncio.gather(self._renewer, return_exceptions=True)
+            self._renewer = None
+        await self.collection.delete_one({"_id": self.key, "owner": self.owner})
+
+    async def wait_released(self, timeout: timedelta = LEASE_WAIT) -> bool:
+        """Waits until no live lease exists for the key. False on timeout."""
+        deadline = datetime.now(timezone.utc) + timeout
+        while datetime.now(timezone.utc) < deadline:
+            lease = await self.collection.find_one(
+                {"_id": self.key, "expires_at": {"$gte": datetime.now(timezone.utc)}},
+                {"_id": 1},
+            )
+            if not lease:
+                return True
+            await asyncio.sleep(LEASE_POLL_INTERVAL)
+        return False
@@ -0,0 +1,221 @@
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta, timezone
+import httpx
+from bson import ObjectId
+from pymongo import ReplaceOne
+from pymongo.errors import BulkWriteError
+
+from services.daily_summary import (
+    OFFLINE_MARKER,
+    build_ai_context,
+    build_summary_doc,
+    cached_ai_summary,
+    recent_commits,
+    replaceable_filter,
+    start_of_day,
+)
+
+# -------------------- CONFIG --------------------
+
+# Users summarized at once
+SUMMARY_BATCH_CONCURRENCY = int(os.getenv("SUMMARY_BATCH_CONCURRENCY", "8"))
+# Gemini requests per minute the batch may spend (leave headroom for users)
+SUMMARY_BATCH_RPM = int(os.getenv("SUMMARY_BATCH_RPM", "60"))
+# Users per page; results are bulk-written and the checkpoint advanced per page
+SUMMARY_BATCH_PAGE_SIZE = int(os.getenv("SUMMARY_BATCH_PAGE_SIZE", "100"))
+# Only users whose snapshot synced within this many days are summarized
+SUMMARY_BATCH_ACTIVE_DAYS = int(os.getenv("SUMMARY_BATCH_ACTIVE_DAYS", "7"))
+MAX_RECORDED_FAILURES = 100
+DUPLICATE_KEY = 11000
+
+
+class RateLimiter:
+    """Spaces acquisitions evenly so at most `per_minute` happen per minute."""
+
+    def __init__(self, per_minute: int):
+        self.interval = 60 / per_minute if per_minute > 0 else 0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class SummaryBatch:
+    """
+    Generates today's summary for every active user. Progress is
+    checkpointed in `runs` (one document per UTC day) after each page, so
+    a crashed or interrupted run resumes where it stopped; users that
+    already have today's summary are skipped. Each page's summaries are
+    upserted on user_day in one bulk write, so a concurrent /generate
+    never leaves two for the day.
+    """
+
+    def __init__(
+        self,
+        summaries,
+        snapshots,
+        runs,
+        client: httpx.AsyncClient | None = None,
+        concurrency: int = SUMMARY_BATCH_CONCURRENCY,
+        rpm: int = SUMMARY_BATCH_RPM,
+        page_size: int = SUMMARY_BATCH_PAGE_SIZE,
+        active_days: int = SUMMARY_BATCH_ACTIVE_DAYS,
+    ):
+        self.summaries = summaries
+        self.snapshots = snapshots
+        self.runs = runs
+        self.client = client
+        self.concurrency = concurrency
+        self.limiter = RateLimiter(rpm)
+        self.page_size = page_size
+        self.active_days = active_days
+
+    async def _active_users(self, after: ObjectId | None, now: datetime) -> list[ObjectId]:
+        query = {"last_synced_at": {"$gte": now - timedelta(days=self.active_days)}}
+        if after is not None:
+            query["user_id"] = {"$gt": after}
+        cursor = self.snapshots.find(query, {"user_id": 1}).sort("user_id", 1).limit(self.page_size)
+        return [s["user_id"] async for s in cursor]
+
+    async def _summarize(self, user_id: ObjectId, now: datetime) -> tuple[str, dict | None, ObjectId | None]:
+        """(outcome, summary doc to write, offline summary it replaces)."""
+        existing = await self.summaries.find_one(
+            {"user_id": user_id, "created_at": {"$gte": start_of_day(now)}},
+            {"content": 1},
+        )
+        if existing and OFFLINE_MARKER not in existing["content"]:
+            return "skipped", None, None
+
+        commits = await recent_commits(user_id, now)
+        if not commits:
+            return "skipped", None, None
+
+        ai_result, _ = await cached_ai_summary(
+            build_ai_context(commits),
+            client=self.client,
+            limiter=self.limiter,
+        )
+        if not ai_result:
+            # Left for the on-demand path rather than storing an offline summary
+            return "failed", None, None
+
+        return "written", build_summary_doc(user_id, commits, ai_result), existing and existing["_id"]
+
+    async def _write_page(self, docs: list[tuple[dict, ObjectId | None]]) -> tuple[int, int]:
+        """
+        Upserts a page's summaries in one unordered bulk write, replacing
+        offline-mode ones in place. A summary an on-demand /generate stored
+        meanwhile is kept (duplicate user_day). Returns (written, skipped).
+        """
+        if not docs:
+            return 0, 0
+
+        ops = [ReplaceOne(replaceable_filter(doc["user_day"]), doc, upsert=True) for doc, _ in docs]
+        try:
+            res = await self.summaries.bulk_write(ops, ordered=False)
+            errors = []
+            upserted = res.upserted_ids
+        except BulkWriteError as e:
+            errors = e.details["writeErrors"]
+            if any(err["code"] != DUPLICATE_KEY for err in errors):
+                raise
+            upserted = {u["index"]: u["_id"] for u in e.details["upserted"]}
+
+        # Offline summaries from before user_day existed are not matched by
+        # the upsert; remove them once the new summary is stored
+        replaced = [docs[i][1] for i in upserted if docs[i][1] is not None]
+        if replaced:
+            await self.summaries.delete_many({"_id": {"$in": replaced}})
+        return len(docs) - len(errors), len(errors)
+
+    async def run(self, now: datetime | None = None, force: bool = False) -> dict:
+        now = now or datetime.now(timezone.utc)
+        run_id = now.strftime("%Y-%m-%d")
+
+        run = await self.runs.find_one({"_id": run_id})
+        if run and run.get("status") == "done" and not force:
+            print(f"Summary batch {run_id} already done")
+            return run
+        if run is None or force:
+            run = {
+                "_id": run_id,
+                "status": "running",
+                "cursor": None,
+                "processed": 0,
+                "written": 0,
+                "skipped": 0,
+                "failed": 0,
+                "failed_users": [],
+                "started_at": now,
+            }
+            await self.runs.replace_one({"_id": run_id}, run, upsert=True)
+        else:
+            print(f"Resuming summary batch {run_id} after {run['processed']} users")
+            await self.runs.update_one({"_id": run_id}, {"$set": {"status": "running"}})
+
+        gate = asyncio.Semaphore(self.concurrency)
+        started = time.monotonic()
+        processed_now = 0
+
+        async def one(user_id):
+            async with gate:
+                try:
+                    return (user_id, *await self._summarize(user_id, now))
+                except Exception as e:
+                    print(f"Summary batch failed for {user_id}:", e)
+                    return user_id, "failed", None, None
+
+        cursor = run["cursor"]
+        while True:
+            user_ids = await self._active_users(cursor, now)
+            if not user_ids:
+                break
+
+            # One bulk write per page, then the checkpoint advances
+            results = await asyncio.gather(*(one(u) for u in user_ids))
+            written, already = await self._write_page(
+                [(doc, replaces) for _, outcome, doc, replaces in results if outcome == "written"]
+            )
+
+            counts = {"written": written, "skipped": already, "failed": 0}
+            for _, outcome, _, _ in results:
+                if outcome != "written":
+                    counts[outcome] += 1
+            failed_users = [u for u, outcome, _, _ in results if outcome == "failed"]
+
+            cursor = user_ids[-1]
+            processed_now += len(user_ids)
+            await self.runs.update_one(
+                {"_id": run_id},
+                {
+                    "$set": {"cursor": cursor, "updated_at": datetime.now(timezone.utc)},
+                    "$inc": {"processed": len(user_ids), **counts},
+                    "$push": {"failed_users": {"$each": failed_users, "$slice": -MAX_RECORDED_FAILURES}},
+                },
+            )
+
+        elapsed = time.monotonic() - started
+        users_per_minute = round(processed_now / (elapsed / 60), 1) if elapsed > 0 else 0.0
+        await self.runs.update_one(
+            {"_id": run_id},
+            {"$set": {
+                "status": "done",
+                "finished_at": datetime.now(timezone.utc),
+                "users_per_minute": users_per_minute,
+            }},
+        )
+
+        run = await self.runs.find_one({"_id": run_id})
+        print(
+            f"Summary batch {run_id}: {run['processed']} users, {run['written']} written, "
+            f"{run['skipped']} skipped, {run['failed']} failed, {users_per_minute} users/min"
+        )
+        return run
@@ -0,0 +1,232 @@
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from config.db import db
+from services.github_sync import sync_github_snapshot
+from services.http_clients import get_github_client
+
+SYNC_WORKERS = int(os.getenv("SYNC_WORKERS", "4"))
+SYNC_WORKERS_ENABLED = os.getenv("SYNC_WORKERS_ENABLED", "true").lower() == "true"
+SYNC_POLL_INTERVAL = float(os.getenv("SYNC_POLL_INTERVAL", "5"))
+# A running job older than this is assumed orphaned (worker died) and re-claimed
+SYNC_JOB_TIMEOUT = timedelta(minutes=int(os.getenv("SYNC_JOB_TIMEOUT_MINUTES", "10")))
+SYNC_MAX_ATTEMPTS = 3
+# A failed attempt is retried after this, doubling with each further attempt
+SYNC_RETRY_DELAY_SECONDS = int(os.getenv("SYNC_RETRY_DELAY_SECONDS", "30"))
+
+sync_jobs = db["sync_jobs"]
+
+# Job lifecycle: queued -> running -> done | failed.
+# Queued/running jobs carry active=True; a partial unique index on
+# (user_id, active) (config/indexes.py) guarantees one pending job per user.
+# A retried job is not claimed before its not_before; finished jobs expire
+# through a TTL index on finished_at.
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Backoff before retrying a job that has failed `attempts` times."""
+    return timedelta(seconds=SYNC_RETRY_DELAY_SECONDS * 2 ** max(0, attempts - 1))
+
+
+def format_job(job: dict | None) -> dict | None:
+    if not job:
+        return None
+
+    def iso(value):
+        return value.isoformat() if isinstance(value, datetime) else None
+
+    return {
+        "id": str(job["_id"]),
+        "status": job.get("status"),
+        "createdAt": iso(job.get("created_at")),
+        "startedAt": iso(job.get("started_at")),
+        "finishedAt": iso(job.get("finished_at")),
+        "error": job.get("error"),
+    }
+
+
+async def enqueue_sync(user_id: ObjectId, full: bool = False) -> dict:
+    """
+    Queues a GitHub sync for the user, or returns the job already queued or
+    running for them.
+    """
+    now = datetime.now(timezone.utc)
+    update = {
+        "$setOnInsert": {
+            "user_id": user_id,
+            "active": True,
+            "status": "queued",
+            "attempts": 0,
+            "created_at": now,
+        },
+    }
+    if full:
+        update["$set"] = {"full": True}
+
+    try:
+        job = await sync_jobs.find_one_and_update(
+            {"user_id": user_id, "active": True},
+            update,
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+    except DuplicateKeyError:
+        # Lost an upsert race against another request: the other job wins
+        job = await sync_jobs.find_one({"user_id": user_id, "active": True})
+
+    sync_workers.notify()
+    return job
+
+
+async def get_job(user_id: ObjectId, job_id: str | None = None) -> dict | None:
+    """A specific job for this user, or their most recent one."""
+    if job_id:
+        if not ObjectId.is_valid(job_id):
+            return None
+        return await sync_jobs.find_one({"_id": ObjectId(job_id), "user_id": user_id})
+
+    cursor = sync_jobs.find({"user_id": user_id}).sort("created_at", -1).limit(1)
+    jobs = await cursor.to_list(length=1)
+    return jobs[0] if jobs else None
+
+
+async def claim_next_job(worker_id: str, now: datetime | None = None) -> dict | None:
+    now = now or datetime.now(timezone.utc)
+    return await sync_jobs.find_one_and_update(
+        {
+            "$or": [
+                # Fresh jobs have no not_before
+                {"status": "queued", "not_before": {"$not": {"$gt": now}}},
+                {"status": "running", "started_at": {"$lt": now - SYNC_JOB_TIMEOUT}},
+            ]
+        },
+        {
+            "$set": {"status": "running", "started_at": now, "worker": worker_id},
+            "$inc": {"attempts": 1},
+        },
+        sort=[("created_at", 1)],
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+async def run_job(job: dict) -> None:
+    now = datetime.now(timezone.utc)
+    try:
+        await sync_github_snapshot(
+            job["user_id"],
+            full=job.get("full", False),
+            client=get_github_client(),
+        )
+    except Exception as e:
+        print(f"GitHub sync job {job['_id']} failed:", e)
+        if job.get("attempts", 1) < SYNC_MAX_ATTEMPTS:
+            # Back to the queue after a backoff; keeps the user's active slot
+            await sync_jobs.update_one(
+                {"_id": job["_id"]},
+                {"$set": {
+                    "status": "queued",
+                    "error": str(e),
+                    "not_before": datetime.now(timezone.utc) + retry_delay(job.get("attempts", 1)),
+                }},
+            )
+        else:
+            await sync_jobs.update_one(
+                {"_id": job["_id"]},
+                {
+                    "$set": {
+                        "status": "failed",
+                        "error": str(e),
+                        "finished_at": datetime.now(timezone.utc),
+                    },
+                    "$unset": {"active": ""},
+                },
+            )
+        return
+
+    await sync_jobs.update_one(
+        {"_id": job["_id"]},
+        {
+            "$set": {
+                "status": "done",
+                "error": None,
+                "finished_at": datetime.now(timezone.utc),
+                "duration_ms": int((datetime.now(timezone.utc) - now).total_seconds() * 1000),
+            },
+            "$unset": {"active": ""},
+        },
+    )
+
+
+class SyncWorkerPool:
+    """asyncio workers that drain the sync_jobs collection."""
+
+    def __init__(self, size: int = SYNC_WORKERS):
+        self.size = size
+        self._tasks: list[asyncio.Task] = []
+        self._wakeup: asyncio.Event | None = None
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def notify(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self._wakeup = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._worker(f"{os.getpid()}-{i}"))
+            for i in range(self.size)
+        ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._wakeup = None
+
+    async def _worker(self, worker_id: str) -> None:
+        while True:
+            try:
+                job = await claim_next_job(worker_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Sync worker {worker_id} could not claim a job:", e)
+                job = None
+
+            if job:
+                try:
+                    await run_job(job)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    print(f"Sync worker {worker_id} failed to record job {job['_id']}:", e)
+                continue
+
+            # Idle: sleep until an enqueue wakes us or the poll interval passes
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=SYNC_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+
+sync_workers = SyncWorkerPool()
+
+
+async def start_sync_workers() -> None:
+    if SYNC_WORKERS_ENABLED:
+        await sync_workers.start()
+
+
+async def stop_sync_workers() -> None:
+    await sync_workers.stop()
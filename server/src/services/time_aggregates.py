@@ -0,0 +1,122 @@
+from collections import defaultdict
+from datetime import datetime, timezone
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from config.db import db
+
+
+def build_daily_aggregates(logs: list[dict]) -> dict[tuple[str, str], dict]:
+    """Per-(project, date) totals for `logs`; each log counts as one session."""
+    rows: dict[tuple[str, str], dict] = {}
+    for log in logs:
+        key = (log.get("project") or "Unknown", log["date"])
+        row = rows.setdefault(key, {"minutes": 0, "deep_work_minutes": 0, "sessions": 0})
+        minutes = int(log.get("minutes") or 0)
+        row["minutes"] += minutes
+        if log.get("isDeepWork"):
+            row["deep_work_minutes"] += minutes
+        row["sessions"] += 1
+    return rows
+
+
+class TimeLogAggregates:
+    """
+    time_log_daily: one document per (user, project, day) with minutes,
+    deep-work minutes and session count, kept current with $inc as logs
+    are written so analytics never scan raw time_logs.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def apply(self, user_id: ObjectId, logs: list[dict], sign: int = 1) -> None:
+        """
+        Adds `logs` to the rows; sign=-1 takes them back out (e.g. replaced
+        logs). One unordered bulk write, however many (project, day) rows.
+        """
+        now = datetime.now(timezone.utc)
+        ops = [
+            UpdateOne(
+                {"user_id": user_id, "date": date, "project": project},
+                {"$inc": {k: v * sign for k, v in row.items()}, "$set": {"updated_at": now}},
+                upsert=True,
+            )
+            for (project, date), row in build_daily_aggregates(logs).items()
+        ]
+        if ops:
+            await self.collection.bulk_write(ops, ordered=False)
+
+    async def rebuild(self, user_id: ObjectId, time_logs) -> int:
+        """Recomputes a user's rows from raw time_logs (backfill / repair)."""
+        logs = await time_logs.find(
+            {"user_id": user_id},
+            {"project": 1, "date": 1, "minutes": 1, "isDeepWork": 1},
+        ).to_list(None)
+        await self.collection.delete_many({"user_id": user_id})
+        await self.apply(user_id, logs)
+        return len(logs)
+
+    async def rows(self, user_id: ObjectId, start: str | None = None, end: str | None = None) -> list[dict]:
+        query: dict = {"user_id": user_id}
+        if start or end:
+            query["date"] = {}
+            if start:
+                query["date"]["$gte"] = start
+            if end:
+                query["date"]["$lte"] = end
+        return await self.collection.find(
+            query,
+            {"_id": 0, "project": 1, "date": 1, "minutes": 1, "deep_work_minutes": 1, "sessions": 1},
+        ).to_list(None)
+
+    async def last_updated(self, user_id: ObjectId) -> datetime | None:
+        """When any of the user's logs last changed (part of the dashboard's cache version)."""
+        row = await self.collection.find_one(
+            {"user_id": user_id},
+            {"updated_at": 1},
+            sort=[("updated_at", -1)],
+        )
+        return row["updated_at"] if row else None
+
+    async def distribution(self, user_id: ObjectId, start: str | None = None, end: str | None = None) -> list[dict]:
+        totals: dict[str, int] = defaultdict(int)
+        for row in await self.rows(user_id, start, end):
+            totals[row["project"]] += row["minutes"]
+        return [{"project": project, "minutes": minutes} for project, minutes in totals.items()]
+
+    async def total_minutes(self, user_id: ObjectId) -> int:
+        return sum(row["minutes"] for row in await self.rows(user_id))
+
+    async def analytics(self, user_id: ObjectId, start: str, end: str) -> dict:
+        projects: dict[str, dict] = {}
+        days: dict[str, dict] = {}
+        sessions = 0
+        for row in await self.rows(user_id, start, end):
+            for bucket in (
+                projects.setdefault(row["project"], {"minutes": 0, "deepWorkMinutes": 0}),
+                days.setdefault(row["date"], {"minutes": 0, "deepWorkMinutes": 0}),
+            ):
+                bucket["minutes"] += row["minutes"]
+                bucket["deepWorkMinutes"] += row.get("deep_work_minutes", 0)
+            sessions += row.get("sessions", 0)
+
+        total = sum(p["minutes"] for p in projects.values())
+        deep_work = sum(p["deepWorkMinutes"] for p in projects.values())
+        return {
+            "start": start,
+            "end": end,
+            "totalMinutes": total,
+            "deepWorkMinutes": deep_work,
+            "deepWorkRatio": round(deep_work / total, 4) if total else 0.0,
+            "sessions": sessions,
+            "distribution": sorted(
+                ({"project": p, **v} for p, v in projects.items()),
+                key=lambda p: p["minutes"],
+                reverse=True,
+            ),
+            "daily": [{"date": d, **days[d]} for d in sorted(days)],
+        }
+
+
+time_aggregates = TimeLogAggregates(db["time_log_daily"])
@@ -0,0 +1,115 @@
+import json
+import os
+from bson import ObjectId
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError
+
+from schemas.time_logs import TimeLogCreate
+
+# Entries accepted per bulk request
+TIME_LOG_BULK_MAX = int(os.getenv("TIME_LOG_BULK_MAX", "5000"))
+
+
+class TooManyEntries(Exception):
+    """Raised when a bulk request exceeds TIME_LOG_BULK_MAX entries."""
+
+
+class InvalidLine(str):
+    """An NDJSON line that is not valid JSON (holds the parse error)."""
+
+
+def idempotency_scope(user_id: ObjectId, key: str) -> str:
+    # Keys are only unique per user; one user cannot block another's
+    return f"{user_id}:{key}"
+
+
+def time_log_doc(user_id: ObjectId, log: TimeLogCreate) -> dict:
+    doc = log.dict()
+    doc["user_id"] = user_id
+    if doc.get("idempotencyKey"):
+        doc["idempotency_scope"] = idempotency_scope(user_id, doc["idempotencyKey"])
+    else:
+        doc.pop("idempotencyKey", None)
+    return doc
+
+
+async def read_ndjson(chunks, max_entries: int = TIME_LOG_BULK_MAX) -> list:
+    """Parses an NDJSON body as it streams in; blank lines are ignored."""
+    items = []
+    buffer = b""
+
+    def add(line: bytes):
+        if not line.strip():
+            return
+        if len(items) >= max_entries:
+            raise TooManyEntries(f"More than {max_entries} entries")
+        try:
+            items.append(json.loads(line))
+        except ValueError as e:
+            items.append(InvalidLine(str(e)))
+
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            add(line)
+    add(buffer)
+    return items
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc']) or 'entry'}: {e['msg']}"
+        for e in error.errors()
+    )
+
+
+async def insert_time_logs(collection, aggregates, user_id: ObjectId, items: list) -> dict:
+    """
+    Validates every entry, inserts the valid ones with one unordered
+    insert_many and folds them into the daily aggregates. Entries whose
+    idempotency key was already stored count as duplicates, not errors.
+    """
+    docs = []
+    positions = []  # docs[i] came from items[positions[i]]
+    errors = []
+
+    for index, item in enumerate(items):
+        if isinstance(item, InvalidLine):
+            errors.append({"index": index, "error": f"invalid JSON: {item}"})
+            continue
+        if not isinstance(item, dict):
+            errors.append({"index": index, "error": "expected a JSON object"})
+            continue
+        try:
+            log = TimeLogCreate(**item)
+        except ValidationError as e:
+            errors.append({"index": index, "error": _validation_message(e)})
+            continue
+        docs.append(time_log_doc(user_id, log))
+        positions.append(index)
+
+    inserted = docs
+    duplicates = 0
+    if docs:
+        try:
+            await collection.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            failed = set()
+            for write_error in e.details.get("writeErrors", []):
+                failed.add(write_error["index"])
+                if write_error.get("code") == 11000:
+                    duplicates += 1
+                else:
+                    errors.append({"index": positions[write_error["index"]], "error": write_error.get("errmsg", "write failed")})
+            inserted = [doc for i, doc in enumerate(docs) if i not in failed]
+
+        await aggregates.apply(user_id, inserted)
+
+    errors.sort(key=lambda e: e["index"])
+    return {
+        "received": len(items),
+        "inserted": len(inserted),
+        "duplicates": duplicates,
+        "errors": errors,
+    }
@@ -1,6 +1,7 @@
 import pytest
 import os
 from fastapi.testclient import TestClient
+import mongomock.collection
 from mongomock_motor import AsyncMongoMockClient
 
 # Mock environment variables BEFORE importing app
@@ -15,6 +16,21 @@ os.environ["API_KEY"] = "test-api-key"
 
 from src.app import app
 from src.config.db import client as real_client
+from src.config.indexes import apply_indexes
+
+
+# pymongo >= 4.11 passes `sort` to bulk update/replace ops, which mongomock
+# does not accept yet; drop it when unset so bulk_write works in tests.
+def _without_sort(add):
+    def wrapper(self, *args, sort=None, **kwargs):
+        assert sort is None, "mongomock cannot sort bulk updates"
+        return add(self, *args, **kwargs)
+    return wrapper
+
+
+for _name in ("add_update", "add_replace"):
+    _add = getattr(mongomock.collection.BulkOperationBuilder, _name)
+    setattr(mongomock.collection.BulkOperationBuilder, _name, _without_sort(_add))
 
 @pytest.fixture(autouse=True)
 async def mock_mongodb(monkeypatch):
@@ -23,6 +39,7 @@ async def mock_mongodb(monkeypatch):
     """
     mock_client = AsyncMongoMockClient()
     mock_db = mock_client["test_db"]
+    await apply_indexes(mock_db)
     
     # Patch the db instance used in Routes and Services
     monkeypatch.setattr("src.config.db.db", mock_db)
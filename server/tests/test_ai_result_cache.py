@@ -0,0 +1,39 @@
+import pytest
+from src.services.ai_result_cache import AIResultCache, context_key
+
+
+def test_context_key_is_stable():
+    """
+    Key order does not matter; content and template version do.
+    """
+    a = {"commit_count": 1, "commits": [{"repo": "r", "message": "fix"}]}
+    b = {"commits": [{"message": "fix", "repo": "r"}], "commit_count": 1}
+
+    assert context_key(a) == context_key(b)
+    assert context_key(a) != context_key({**a, "commit_count": 2})
+    assert context_key(a, template_version=1) != context_key(a, template_version=2)
+
+
+@pytest.mark.asyncio
+async def test_results_persist_and_stay_bounded(mock_mongodb):
+    """
+    A fresh process finds results in Mongo; the collection is trimmed
+    oldest-first and expired entries are not served.
+    """
+    collection = mock_mongodb["ai_summary_cache"]
+    cache = AIResultCache(collection=collection, ttl=60, max_entries=2)
+
+    for i in range(3):
+        await cache.set(f"key-{i}", {"score": i})
+
+    assert await collection.count_documents({}) == 2
+    assert await collection.find_one({"_id": "key-0"}) is None
+
+    restarted = AIResultCache(collection=collection, ttl=60, max_entries=2)
+    assert await restarted.get("key-2") == {"score": 2}
+    assert await restarted.get("key-0") is None
+    assert restarted.as_dict()["hits"] == 1
+
+    expired = AIResultCache(collection=collection, ttl=-1, max_entries=2)
+    await expired.set("key-3", {"score": 3})
+    assert await AIResultCache(collection=collection).get("key-3") is None
@@ -0,0 +1,64 @@
+import time
+import jwt
+from fastapi import Depends, FastAPI, Request
+from fastapi.testclient import TestClient
+from src.middleware.AuthMiddleware import AuthMiddleware, ClaimsCache
+from src.Routes.AuthRoutes import get_current_user
+
+SECRET = "test-secret-key"
+
+
+def _token(sub="user-1", expires_in=3600):
+    payload = {"sub": sub, "email": "dev@example.com", "exp": int(time.time()) + expires_in}
+    return jwt.encode(payload, SECRET, algorithm="HS256")
+
+
+def _app(cache: ClaimsCache) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(AuthMiddleware, cache=cache)
+
+    @app.get("/whoami")
+    async def whoami(request: Request, user_id: str = Depends(get_current_user)):
+        return {"user_id": user_id, "state_user_id": request.state.user_id}
+
+    return app
+
+
+def test_claims_cached_until_exp():
+    """
+    A token is verified once and then served from the cache; claims reach
+    the dependency and request.state alike.
+    """
+    cache = ClaimsCache(secret=SECRET)
+    client = TestClient(_app(cache))
+    client.cookies.set("access_token", _token())
+
+    for _ in range(3):
+        res = client.get("/whoami")
+        assert res.json() == {"user_id": "user-1", "state_user_id": "user-1"}
+
+    assert cache.misses == 1
+    assert cache.hits == 2
+
+
+def test_bad_tokens_rejected():
+    """
+    Expired and forged tokens keep their 401s, and neither is cached.
+    """
+    cache = ClaimsCache(secret=SECRET)
+    client = TestClient(_app(cache))
+
+    client.cookies.set("access_token", _token(expires_in=-10))
+    res = client.get("/whoami")
+    assert res.status_code == 401
+    assert res.json() == {"detail": "Session expired"}
+
+    forged = jwt.encode({"sub": "user-1", "exp": int(time.time()) + 60}, "wrong", algorithm="HS256")
+    client.cookies.set("access_token", forged)
+    res = client.get("/whoami")
+    assert res.status_code == 401
+    assert res.json() == {"detail": "Invalid authentication token"}
+
+    client.cookies.clear()
+    assert client.get("/whoami").status_code == 401
+    assert cache.as_dict()["entries"] == 0
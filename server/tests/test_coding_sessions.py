@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta
+from src.services.coding_sessions import estimate_coding_activity, session_masks
+
+# Wednesday
+DAY = datetime(2026, 4, 1)
+
+
+def _commit(repo, hour, minute=0):
+    return {"repo_name": repo, "date": DAY.replace(hour=hour, minute=minute)}
+
+
+def _activity(commits, logs, now, gap=120, lead=30):
+    masks = session_masks([c["date"] for c in commits], [c["repo_name"] for c in commits], gap, lead)
+    return estimate_coding_activity(masks, logs, DAY, now)
+
+
+def test_commit_sessions_split_per_repo_and_on_gaps():
+    """
+    Commits within the gap share a session (span + lead-in); a lone
+    commit is worth the lead-in; repos are sessionized separately.
+    """
+    commits = [
+        _commit("api", 9, 0), _commit("api", 10, 0), _commit("api", 11, 30),
+        _commit("api", 16, 0),
+        _commit("web", 20, 0),
+    ]
+    activity = _activity(commits, [], DAY + timedelta(days=1))
+
+    # 08:30-11:30, 15:30-16:00, 19:30-20:00
+    assert activity["total"] == 180 + 30 + 30
+    assert activity["weekdays"]["Wednesday"] == 240
+    assert activity["hourly"][8] == 30
+    assert activity["hourly"][10] == 60
+    assert activity["hourly"][11] == 30
+    assert activity["hourly"][19] == 30
+
+
+def test_masks_cover_only_touched_days():
+    """A lead-in before 00:30 reaches back into the previous day's mask."""
+    masks = session_masks([DAY.replace(minute=10)], ["api"], gap=120, lead=30)
+
+    assert sorted(d.date() for d in masks) == [(DAY - timedelta(days=1)).date(), DAY.date()]
+    assert all(len(m) == 180 for m in masks.values())
+
+
+def test_logged_time_merges_with_commit_sessions():
+    """
+    Logged time overlapping a commit session counts once; logs without
+    times still count toward their day but not the hourly chart.
+    """
+    commits = [_commit("api", 10, 0), _commit("other", 10, 15)]
+    logs = [
+        {"date": "2026-04-01", "minutes": 60, "startTime": "09:00", "endTime": "10:00"},
+        {"date": "2026-04-02", "minutes": 45},
+        {
+            "date": "2026-04-01", "minutes": 30,
+            "started_at": DAY.replace(hour=23, minute=45),
+            "ended_at": DAY.replace(hour=23, minute=45) + timedelta(minutes=30),
+        },
+    ]
+    activity = _activity(commits, logs, DAY + timedelta(days=2))
+
+    # 09:00-10:15 from the log and both repos' sessions, 23:45-00:15, 45 untimed
+    assert activity["total"] == 75 + 30 + 45
+    assert activity["weekdays"]["Wednesday"] == 75 + 15
+    assert activity["weekdays"]["Thursday"] == 15 + 45
+    assert sum(activity["hourly"]) == 75 + 30
+    assert activity["hourly"][0] == 15
+
+
+def test_window_clips_sessions():
+    """Time before the window's first day or after now is not counted."""
+    commits = [_commit("api", 0, 10), _commit("api", 12, 0)]
+    activity = _activity(commits, [], DAY.replace(hour=11, minute=50))
+
+    assert activity["total"] == 10 + 20
@@ -0,0 +1,87 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from bson import ObjectId
+from src.services.commit_rollups import CommitRollupStore, commit_session_masks, session_days
+from src.services.dashboard_metrics import (
+    compute_weekly_activity,
+    compute_streak,
+    compute_code_churn,
+    compute_repo_stats,
+    compute_weekly_activity_from_rollups,
+    compute_streak_from_rollups,
+    compute_code_churn_from_rollups,
+    compute_repo_stats_from_rollups,
+)
+
+
+def make_commits():
+    today = datetime.now(timezone.utc).replace(hour=10, minute=0, second=0, microsecond=0)
+    commits = []
+    for i, (days_ago, hour, repo) in enumerate([
+        (0, 10, "dev/alpha"),
+        (0, 10, "dev/site.github.io"),
+        (1, 14, "dev/alpha"),
+        (1, 10, "dev/alpha"),
+        (3, 22, "dev/beta"),
+        (20, 9, "dev/beta"),
+    ]):
+        commits.append({
+            "sha": f"c{i}",
+            "repo_name": repo,
+            "additions": i + 1,
+            "deletions": i,
+            "committed_at": (today - timedelta(days=days_ago)).replace(hour=hour),
+        })
+    return commits
+
+
+@pytest.mark.asyncio
+async def test_rollup_metrics_match_raw_commits(mock_mongodb):
+    """
+    Metrics computed from daily rollups equal the ones computed from raw
+    commits, whether the rollups were rebuilt or applied incrementally.
+    """
+    commits = make_commits()
+    normalized = [{**c, "date": c["committed_at"].replace(tzinfo=None)} for c in commits]
+
+    rebuilt = CommitRollupStore(mock_mongodb["rebuilt"])
+    applied = CommitRollupStore(mock_mongodb["applied"])
+    user_id = ObjectId()
+
+    await rebuilt.rebuild(user_id, commits)
+    await applied.apply(user_id, commits[:3])
+    await applied.apply(user_id, commits[3:])
+    await applied.set_sessions(user_id, commit_session_masks(commits), session_days(commits))
+    masks = {}
+
+    for store in (rebuilt, applied):
+        rollups = await store.find_range(user_id)
+        assert len(rollups) == 4
+
+        assert compute_weekly_activity_from_rollups(rollups) == compute_weekly_activity(normalized)
+        assert compute_streak_from_rollups(rollups) == compute_streak([c["date"] for c in normalized])
+        assert compute_code_churn_from_rollups(rollups) == compute_code_churn(normalized)
+
+        repo_stats = compute_repo_stats_from_rollups(rollups)
+        assert repo_stats == compute_repo_stats(normalized)
+        assert repo_stats["dev/site.github.io"]["count"] == 1
+
+        masks[store] = {r["day"]: r["session_mask"] for r in rollups if r.get("session_mask")}
+
+    # The 10:00 commits on day 0 are two repos' 30-minute lead-ins, overlapping
+    assert masks[rebuilt] == masks[applied]
+    assert sorted(r["session_minutes"] for r in await rebuilt.find_range(user_id)) == [30, 30, 30, 60]
+
+
+@pytest.mark.asyncio
+async def test_rollups_age_out_by_day(mock_mongodb):
+    """
+    Whole days before the cutoff are dropped.
+    """
+    store = CommitRollupStore(mock_mongodb["github_daily_rollups"])
+    user_id = ObjectId()
+    await store.rebuild(user_id, make_commits())
+
+    cutoff = datetime.now(timezone.utc) - timedelta(days=10)
+    assert await store.delete_older_than(user_id, cutoff) == 1
+    assert len(await store.find_range(user_id)) == 3
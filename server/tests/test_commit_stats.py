@@ -0,0 +1,39 @@
+import pytest
+from datetime import datetime, timezone
+from src.services.commit_stats import CommitStatsStore
+
+
+@pytest.mark.asyncio
+async def test_commit_stats_survive_lru_eviction(mock_mongodb):
+    """
+    Entries evicted from the in-process LRU are still served from Mongo.
+    """
+    store = CommitStatsStore(mock_mongodb["commit_stats"], max_entries=2)
+    committed_at = datetime(2024, 5, 1, tzinfo=timezone.utc)
+
+    await store.put_many("Dev/Alpha", {
+        "a1": {"additions": 1, "deletions": 0, "committed_at": committed_at},
+        "a2": {"additions": 2, "deletions": 1, "committed_at": committed_at},
+        "a3": {"additions": 3, "deletions": 2, "committed_at": committed_at},
+    })
+    assert len(store._lru) == 2
+
+    found = await store.get_many("dev/alpha", ["a1", "a3", "missing"])
+    assert found["a1"]["additions"] == 1
+    assert found["a3"]["deletions"] == 2
+    assert "missing" not in found
+    assert await mock_mongodb["commit_stats"].count_documents({}) == 3
+
+
+@pytest.mark.asyncio
+async def test_commit_stats_are_never_overwritten(mock_mongodb):
+    """
+    Stats are immutable per SHA: a second put keeps the first values.
+    """
+    store = CommitStatsStore(mock_mongodb["commit_stats"])
+    await store.put_many("dev/alpha", {"a1": {"additions": 5, "deletions": 5, "committed_at": None}})
+    await store.put_many("dev/alpha", {"a1": {"additions": 9, "deletions": 9, "committed_at": None}})
+
+    store.clear_local()
+    found = await store.get_many("dev/alpha", ["a1"])
+    assert found["a1"]["additions"] == 5
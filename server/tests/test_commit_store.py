@@ -0,0 +1,99 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from bson import ObjectId
+from src.services.commit_store import CommitStore, migrate_snapshot_commits
+
+
+def commit(sha, committed_at, repo="dev/alpha"):
+    return {
+        "sha": sha,
+        "repo_name": repo,
+        "message": f"commit {sha}",
+        "additions": 1,
+        "deletions": 0,
+        "committed_at": committed_at,
+    }
+
+
+@pytest.mark.asyncio
+async def test_insert_new_skips_stored_shas(mock_mongodb):
+    """
+    Re-inserting a commit is a no-op; only new SHAs are returned.
+    """
+    store = CommitStore(mock_mongodb["github_commits"])
+    user_id = ObjectId()
+    now = datetime.now(timezone.utc)
+
+    await store.insert_new(user_id, [commit("a1", now), commit("a2", now)])
+    inserted = await store.insert_new(user_id, [commit("a2", now), commit("a3", now)])
+
+    assert [c["sha"] for c in inserted] == ["a3"]
+    assert await store.count(user_id) == 3
+
+
+@pytest.mark.asyncio
+async def test_fill_stats_only_sets_missing_stats(mock_mongodb):
+    """
+    Stats are filled where they were missing; stored stats are kept.
+    """
+    store = CommitStore(mock_mongodb["github_commits"])
+    user_id = ObjectId()
+    now = datetime.now(timezone.utc)
+
+    await store.insert_new(user_id, [{**commit("a1", now), "additions": None}, commit("a2", now)])
+    await store.fill_stats(user_id, [
+        {"sha": "a1", "additions": 7, "deletions": 3},
+        {"sha": "a2", "additions": 9, "deletions": 9},
+    ])
+    await store.fill_stats(user_id, [])
+
+    stored = {c["sha"]: c async for c in mock_mongodb["github_commits"].find({"user_id": user_id})}
+    assert (stored["a1"]["additions"], stored["a1"]["deletions"]) == (7, 3)
+    assert (stored["a2"]["additions"], stored["a2"]["deletions"]) == (1, 0)
+
+
+@pytest.mark.asyncio
+async def test_find_range_filters_by_window(mock_mongodb):
+    """
+    Range reads return only commits inside the window, newest first.
+    """
+    store = CommitStore(mock_mongodb["github_commits"])
+    user_id = ObjectId()
+    now = datetime.now(timezone.utc)
+
+    await store.insert_new(user_id, [
+        commit("old", now - timedelta(days=3)),
+        commit("mid", now - timedelta(hours=12)),
+        commit("new", now - timedelta(hours=1), repo="dev/beta"),
+    ])
+
+    recent = await store.find_range(user_id, since=now - timedelta(days=1))
+    assert [c["sha"] for c in recent] == ["new", "mid"]
+
+    beta = await store.find_range(user_id, repo_name="dev/beta")
+    assert [c["sha"] for c in beta] == ["new"]
+
+
+@pytest.mark.asyncio
+async def test_migrate_snapshot_commits(mock_mongodb):
+    """
+    A legacy snapshot's embedded commits move to github_commits and the
+    array is dropped; running it again changes nothing.
+    """
+    snapshots = mock_mongodb["github_snapshots"]
+    store = CommitStore(mock_mongodb["github_commits"])
+    user_id = ObjectId()
+    now = datetime.now(timezone.utc)
+
+    await snapshots.insert_one({
+        "user_id": user_id,
+        "commits": [commit("a1", now), commit("a2", now.isoformat())],
+    })
+
+    assert await migrate_snapshot_commits(snapshots, store, user_id) == 2
+    assert await migrate_snapshot_commits(snapshots, store, user_id) == 0
+
+    snapshot = await snapshots.find_one({"user_id": user_id})
+    assert "commits" not in snapshot
+    assert snapshot["commit_storage"] == "collection"
+    assert await store.count(user_id) == 2
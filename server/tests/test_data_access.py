@@ -0,0 +1,60 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from bson import ObjectId
+from src.services.data_access import SnapshotStore, UserStore
+
+
+@pytest.mark.asyncio
+async def test_user_reads_never_return_secrets(mock_mongodb):
+    """
+    Profile and GitHub-link reads leave out the password hash and token.
+    """
+    store = UserStore(mock_mongodb["user"])
+    user_id = ObjectId()
+    await mock_mongodb["user"].insert_one({
+        "_id": user_id,
+        "email": "dev@example.com",
+        "password_hash": "hash",
+        "github": {"username": "dev", "github_id": 1, "access_token": "secret"},
+    })
+
+    profile = await store.profile(user_id)
+    assert "password_hash" not in profile
+    assert profile["github"] == {"username": "dev", "github_id": 1}
+
+    assert await store.github_link(user_id) == {"username": "dev", "github_id": 1}
+    assert await store.github_link(ObjectId()) is None
+    assert await store.password_hash(user_id) == "hash"
+
+
+@pytest.mark.asyncio
+async def test_legacy_commit_reads_filter_server_side(mock_mongodb):
+    """
+    Embedded commits are counted, windowed and capped without returning
+    the whole array.
+    """
+    store = SnapshotStore(mock_mongodb["github_snapshots"])
+    user_id = ObjectId()
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    await mock_mongodb["github_snapshots"].insert_one({
+        "user_id": user_id,
+        "last_synced_at": now,
+        "commits": [
+            {"sha": f"c{i}", "committed_at": now - timedelta(hours=i * 7)}
+            for i in range(20)
+        ],
+    })
+
+    stats = await store.profile_stats(user_id)
+    assert stats["legacy_commit_count"] == 20
+    assert "commits" not in stats
+
+    recent = await store.legacy_commits(
+        user_id,
+        since=datetime.now(timezone.utc) - timedelta(hours=24),
+        until=datetime.now(timezone.utc),
+    )
+    assert [c["sha"] for c in recent] == ["c0", "c1", "c2", "c3"]
+
+    assert len(await store.legacy_commits(user_id, limit=3)) == 3
+    assert await store.legacy_commits(ObjectId()) == []
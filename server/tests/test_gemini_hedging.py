@@ -0,0 +1,121 @@
+import asyncio
+import json
+import time
+import httpx
+import pytest
+from src.services.gemini_service import GEMINI_MODELS, ModelHealth, generate_ai_summary
+
+PRIMARY, SECONDARY = GEMINI_MODELS[0], GEMINI_MODELS[1]
+
+
+def fake_gemini(behaviour: dict, calls: list):
+    """A local Gemini: per model, (delay seconds, status code)."""
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        model = request.url.path.rsplit("/", 1)[-1].split(":")[0]
+        calls.append(model)
+        delay, status = behaviour.get(model, (0, 500))
+        await asyncio.sleep(delay)
+        if status != 200:
+            return httpx.Response(status, text="unavailable")
+        text = json.dumps({"score": 7, "model": model})
+        return httpx.Response(200, json={"candidates": [{"content": {"parts": [{"text": text}]}}]})
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://fake-gemini")
+
+
+@pytest.mark.asyncio
+async def test_slow_primary_is_hedged():
+    """
+    The next model is raced once the primary exceeds the hedge budget,
+    and the faster answer wins without waiting for the primary.
+    """
+    calls = []
+    client = fake_gemini({PRIMARY: (5, 200), SECONDARY: (0, 200)}, calls)
+
+    start = time.monotonic()
+    result = await generate_ai_summary({"commits": []}, client=client, health=ModelHealth(), hedge_after=0.05)
+
+    assert result["model"] == SECONDARY
+    assert time.monotonic() - start < 1
+    assert calls == [PRIMARY, SECONDARY]
+
+
+@pytest.mark.asyncio
+async def test_failing_model_trips_breaker():
+    """
+    After repeated errors the primary is skipped until its cooldown ends.
+    """
+    calls = []
+    client = fake_gemini({PRIMARY: (0, 500), SECONDARY: (0, 200)}, calls)
+    health = ModelHealth(failures=2, cooldown=60)
+
+    for _ in range(3):
+        result = await generate_ai_summary({"commits": []}, client=client, health=health, hedge_after=5)
+        assert result["model"] == SECONDARY
+
+    assert calls.count(PRIMARY) == 2
+    assert health.as_dict()[PRIMARY]["open"] is True
+
+
+@pytest.mark.asyncio
+async def test_overall_deadline():
+    """
+    When nothing answers, the call gives up at the deadline.
+    """
+    calls = []
+    client = fake_gemini({m: (5, 200) for m in GEMINI_MODELS}, calls)
+
+    start = time.monotonic()
+    result = await generate_ai_summary({"commits": []}, client=client, health=ModelHealth(), hedge_after=0.05, deadline=0.3)
+
+    assert result is None
+    assert time.monotonic() - start < 1
+    assert set(calls) == set(GEMINI_MODELS)
+
+
+@pytest.mark.asyncio
+async def test_timeouts_count_toward_the_breaker():
+    """
+    A primary that never answers trips its breaker, whether it is cut off
+    by the deadline or loses a hedge after overrunning the hedge delay.
+    """
+    calls = []
+    client = fake_gemini({PRIMARY: (5, 200), SECONDARY: (0, 200)}, calls)
+    health = ModelHealth(failures=2, cooldown=60)
+
+    # Deadline before the hedge: nothing answers
+    assert await generate_ai_summary({"commits": []}, client=client, health=health, hedge_after=5, deadline=0.05) is None
+    # Hedged: the secondary wins and the cancelled primary is a timeout
+    result = await generate_ai_summary({"commits": []}, client=client, health=health, hedge_after=0.05)
+
+    assert result["model"] == SECONDARY
+    assert health.as_dict()[PRIMARY]["open"] is True
+    assert health.as_dict()[PRIMARY]["errors"] == 2
+
+
+@pytest.mark.asyncio
+async def test_half_open_allows_a_single_trial():
+    """
+    Past the cooldown only one request tries the primary; concurrent ones
+    go to the next model, and the trial's success closes the circuit.
+    """
+    calls = []
+    behaviour = {PRIMARY: (0, 500), SECONDARY: (0, 200)}
+    client = fake_gemini(behaviour, calls)
+    health = ModelHealth(failures=1, cooldown=0.05)
+
+    await generate_ai_summary({"commits": []}, client=client, health=health, hedge_after=5)
+    assert health.as_dict()[PRIMARY]["open"] is True
+
+    await asyncio.sleep(0.06)
+    behaviour[PRIMARY] = (0.1, 200)
+    calls.clear()
+    results = await asyncio.gather(*(
+        generate_ai_summary({"commits": []}, client=client, health=health, hedge_after=5)
+        for _ in range(3)
+    ))
+
+    assert calls.count(PRIMARY) == 1
+    assert sorted(r["model"] for r in results) == sorted([PRIMARY, SECONDARY, SECONDARY])
+    assert health.as_dict()[PRIMARY]["consecutiveFailures"] == 0
@@ -0,0 +1,70 @@
+import pytest
+import httpx
+from src.services.github_cache import ConditionalCache
+from src.services.github_fetcher import GitHubFetcher
+
+
+@pytest.mark.asyncio
+async def test_not_modified_replays_cached_body(mock_mongodb):
+    """
+    The second request sends If-None-Match and a 304 is answered from the cache.
+    """
+    seen_validators = []
+
+    def handler(request):
+        seen_validators.append(request.headers.get("if-none-match"))
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304, headers={"X-RateLimit-Remaining": "4999"})
+        return httpx.Response(200, json=[{"id": 1, "name": "alpha"}], headers={"ETag": '"v1"'})
+
+    cache = ConditionalCache(mock_mongodb["github_http_cache"], "user-1")
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        fetcher = GitHubFetcher(client, headers={}, cache=cache)
+        first = await fetcher.get("https://api.github.com/user/repos", params={"per_page": 100})
+        second = await fetcher.get("https://api.github.com/user/repos", params={"per_page": 100})
+
+    assert seen_validators == [None, '"v1"']
+    assert second.status_code == 200
+    assert second.json() == first.json()
+    assert second.headers["x-ratelimit-remaining"] == "4999"
+    assert fetcher.stats["requests"] == 2
+    assert fetcher.stats["not_modified"] == 1
+
+
+def test_cache_keys_are_scoped_per_user_and_params():
+    """
+    Different users or params never share a cache entry.
+    """
+    url = "https://api.github.com/repos/dev/alpha/commits"
+    a = ConditionalCache(None, "user-a")
+    b = ConditionalCache(None, "user-b")
+
+    assert a.key(url, {"since": "x"}) != b.key(url, {"since": "x"})
+    assert a.key(url, {"since": "x"}) != a.key(url, {"since": "y"})
+    assert ConditionalCache.is_cacheable(url)
+    assert not ConditionalCache.is_cacheable(url + "/abc123")
+
+
+@pytest.mark.asyncio
+async def test_store_trims_each_user_to_its_bound(mock_mongodb):
+    """
+    Past max_entries, a user's least recently refreshed entries are dropped;
+    other users' entries are untouched.
+    """
+    collection = mock_mongodb["github_http_cache"]
+    cache = ConditionalCache(collection, "user-a", max_entries=3)
+    other = ConditionalCache(collection, "user-b", max_entries=3)
+    url = "https://api.github.com/repos/dev/alpha/commits"
+
+    def response(i):
+        return httpx.Response(200, json=[], headers={"ETag": f'"v{i}"'})
+
+    await other.store(url, {"since": "0"}, response(0))
+    for i in range(5):
+        await cache.store(url, {"since": str(i)}, response(i))
+
+    assert await collection.count_documents({"user_key": "user-a"}) == 3
+    assert await cache.lookup(url, {"since": "0"}) is None
+    assert (await cache.lookup(url, {"since": "4"}))["etag"] == '"v4"'
+    assert await collection.count_documents({"user_key": "user-b"}) == 1
@@ -0,0 +1,52 @@
+import asyncio
+import pytest
+import httpx
+from src.services.github_fetcher import GitHubFetcher, gather_in_order
+
+
+@pytest.mark.asyncio
+async def test_fetcher_caps_in_flight_requests():
+    """
+    Concurrent fetches for one user never exceed max_in_flight.
+    """
+    in_flight = 0
+    peak = 0
+
+    async def handler(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(200, json={"path": request.url.path})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        fetcher = GitHubFetcher(client, headers={}, max_in_flight=3)
+        responses = await gather_in_order(
+            *(fetcher.get(f"https://api.github.test/repos/r{i}") for i in range(12))
+        )
+
+    assert peak == 3
+    # Results keep request order
+    assert [r.json()["path"] for r in responses] == [f"/repos/r{i}" for i in range(12)]
+
+
+@pytest.mark.asyncio
+async def test_gather_in_order_reraises_after_all_finish():
+    """
+    A failing request surfaces its error only after siblings have completed.
+    """
+    finished = []
+
+    async def ok(i):
+        await asyncio.sleep(0.01)
+        finished.append(i)
+        return i
+
+    async def boom():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        await gather_in_order(ok(1), boom(), ok(2))
+
+    assert sorted(finished) == [1, 2]
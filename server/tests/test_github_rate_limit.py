@@ -0,0 +1,87 @@
+import asyncio
+import time
+import pytest
+import httpx
+from src.services.github_fetcher import GitHubFetcher
+from src.services.github_rate_limit import (
+    PRIORITY_COMMIT_DETAIL,
+    PRIORITY_REPOS,
+    PrioritySemaphore,
+    RateLimitExhausted,
+    TokenBudget,
+    request_priority,
+)
+
+
+@pytest.mark.asyncio
+async def test_priority_semaphore_admits_valuable_calls_first():
+    """
+    Queued waiters are admitted by priority, not arrival order.
+    """
+    sem = PrioritySemaphore(1)
+    order = []
+    await sem.acquire()
+
+    async def waiter(priority, name):
+        async with sem.slot(priority):
+            order.append(name)
+
+    tasks = [
+        asyncio.create_task(waiter(4, "detail")),
+        asyncio.create_task(waiter(2, "languages")),
+        asyncio.create_task(waiter(0, "repos")),
+    ]
+    await asyncio.sleep(0)
+    sem.release()
+    await asyncio.gather(*tasks)
+
+    assert order == ["repos", "languages", "detail"]
+
+
+@pytest.mark.asyncio
+async def test_fetcher_retries_429_with_retry_after():
+    """
+    A 429 is retried after Retry-After and the budget is read from headers.
+    """
+    responses = [
+        httpx.Response(429, headers={"Retry-After": "0"}),
+        httpx.Response(200, json=[], headers={
+            "X-RateLimit-Limit": "5000",
+            "X-RateLimit-Remaining": "4321",
+            "X-RateLimit-Reset": str(int(time.time()) + 600),
+        }),
+    ]
+
+    def handler(request):
+        return responses.pop(0)
+
+    budget = TokenBudget()
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        fetcher = GitHubFetcher(client, headers={}, budget=budget)
+        res = await fetcher.get("https://api.github.com/user/repos")
+
+    assert res.status_code == 200
+    assert fetcher.stats["retries"] == 1
+    assert budget.remaining == 4321
+
+
+@pytest.mark.asyncio
+async def test_low_budget_drops_commit_details_first():
+    """
+    Near the reserve, commit details are refused while the repo list still waits for reset.
+    """
+    budget = TokenBudget()
+    budget.limit = 5000
+    budget.remaining = 10
+    budget.reset_at = time.time() + 0.05
+
+    with pytest.raises(RateLimitExhausted):
+        await budget.before_request(PRIORITY_COMMIT_DETAIL)
+
+    slept = await budget.before_request(PRIORITY_REPOS)
+    assert slept > 0
+
+
+def test_request_priority_ranks_endpoints():
+    assert request_priority("https://api.github.com/user/repos") == PRIORITY_REPOS
+    assert request_priority("https://api.github.com/repos/a/b/commits/abc") == PRIORITY_COMMIT_DETAIL
@@ -0,0 +1,177 @@
+import pytest
+import httpx
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, patch
+from bson import ObjectId
+from src.services.commit_rollups import CommitRollupStore
+from src.services.commit_stats import CommitStatsStore
+from src.services.commit_store import CommitStore
+from src.services.github_sync import _sync_with_lease, sync_github_snapshot
+
+
+def iso(dt):
+    return dt.isoformat().replace("+00:00", "Z")
+
+
+class FakeGitHub:
+    def __init__(self):
+        now = datetime.now(timezone.utc)
+        self.calls = []
+        self.repos = [
+            {"id": 1, "name": "alpha", "full_name": "dev/alpha", "private": False, "pushed_at": "2024-01-01T00:00:00Z"},
+            {"id": 2, "name": "beta", "full_name": "dev/beta", "private": False, "pushed_at": "2024-01-01T00:00:00Z"},
+        ]
+        self.commits = {
+            "dev/alpha": [self.commit("a1", now - timedelta(days=2))],
+            "dev/beta": [
+                self.commit("b1", now - timedelta(days=1)),
+                self.commit("b0", now - timedelta(days=89, hours=23)),
+            ],
+        }
+
+    @staticmethod
+    def commit(sha, dt):
+        return {
+            "sha": sha,
+            "author": {"login": "dev"},
+            "commit": {"message": f"commit {sha}", "author": {"email": "dev@example.com", "date": iso(dt)}},
+        }
+
+    def handle(self, url):
+        path = httpx.URL(url).path
+        self.calls.append(path)
+        if path == "/user/repos":
+            body = self.repos
+        elif path.endswith("/languages"):
+            body = {"Python": 100}
+        elif path.startswith("/users/"):
+            body = []
+        elif "/commits/" in path:
+            body = {"stats": {"additions": 1, "deletions": 1}}
+        else:
+            full_name = path[len("/repos/"):-len("/commits")]
+            body = self.commits[full_name]
+        return httpx.Response(200, json=body, request=httpx.Request("GET", url))
+
+    def patch_client(self):
+        async def fake_get(client, url, headers=None, params=None):
+            return self.handle(url)
+        return patch("httpx.AsyncClient.get", new=fake_get)
+
+
+def patch_sync_collections(monkeypatch, mock_mongodb):
+    monkeypatch.setattr("src.services.github_sync.users", mock_mongodb["user"])
+    monkeypatch.setattr("src.services.github_sync.github_snapshots", mock_mongodb["github_snapshots"])
+    monkeypatch.setattr("src.services.github_sync.github_http_cache", mock_mongodb["github_http_cache"])
+    monkeypatch.setattr("src.services.github_sync.commit_stats", CommitStatsStore(mock_mongodb["commit_stats"]))
+    monkeypatch.setattr("src.services.github_sync.sync_leases", mock_mongodb["sync_leases"])
+    monkeypatch.setattr("src.services.github_sync.commit_store", CommitStore(mock_mongodb["github_commits"]))
+    monkeypatch.setattr("src.services.github_sync.commit_rollups", CommitRollupStore(mock_mongodb["github_daily_rollups"]))
+
+
+@pytest.mark.asyncio
+async def test_incremental_sync_skips_unpushed_repos(mock_mongodb, monkeypatch):
+    """
+    A second sync only fetches repos whose pushed_at changed, merges the new
+    commit and ages out commits that fell outside the lookback window.
+    """
+    patch_sync_collections(monkeypatch, mock_mongodb)
+
+    user_id = ObjectId()
+    await mock_mongodb["user"].insert_one({
+        "_id": user_id,
+        "email": "dev@example.com",
+        "github": {"username": "dev", "access_token": "token"},
+    })
+
+    fake = FakeGitHub()
+    with fake.patch_client():
+        await sync_github_snapshot(user_id)
+
+        stored = await mock_mongodb["github_commits"].distinct("sha", {"user_id": user_id})
+        assert sorted(stored) == ["a1", "b0", "b1"]
+
+        # Pretend b0 has now aged out and beta received one new push
+        await mock_mongodb["github_commits"].update_one(
+            {"user_id": user_id, "sha": "b0"},
+            {"$set": {"committed_at": datetime.now(timezone.utc) - timedelta(days=91)}},
+        )
+        fake.repos[1]["pushed_at"] = "2024-02-01T00:00:00Z"
+        fake.commits["dev/beta"].insert(0, fake.commit("b2", datetime.now(timezone.utc)))
+        fake.calls.clear()
+
+        await sync_github_snapshot(user_id)
+
+    assert not any(path.startswith("/repos/dev/alpha") for path in fake.calls)
+    assert "/repos/dev/beta/commits/b2" in fake.calls
+    assert "/repos/dev/beta/commits/b1" not in fake.calls
+
+    stored = await mock_mongodb["github_commits"].distinct("sha", {"user_id": user_id})
+    assert sorted(stored) == ["a1", "b1", "b2"]
+
+    rollups = await mock_mongodb["github_daily_rollups"].find({"user_id": user_id}).to_list(None)
+    # b2 was added; b0 was only backdated in github_commits so its original day stays
+    assert sum(r["commits"] for r in rollups) == 4
+    # Every commit is its own 30-minute session, b2's set on the incremental sync
+    assert sum(r.get("session_minutes", 0) for r in rollups) == 4 * 30
+
+    snapshot = await mock_mongodb["github_snapshots"].find_one({"user_id": user_id})
+    assert "commits" not in snapshot
+    assert snapshot["languages"] == {"Python": 200}
+
+
+@pytest.mark.asyncio
+async def test_sync_keeps_commits_matched_by_email(mock_mongodb, monkeypatch):
+    """
+    A commit whose GitHub author isn't linked (author: None) is still the
+    user's when the commit email matches the account email.
+    """
+    patch_sync_collections(monkeypatch, mock_mongodb)
+
+    user_id = ObjectId()
+    await mock_mongodb["user"].insert_one({
+        "_id": user_id,
+        "email": "Dev@Example.com",
+        "github": {"username": "dev", "access_token": "token"},
+    })
+
+    fake = FakeGitHub()
+    unlinked = fake.commit("a2", datetime.now(timezone.utc) - timedelta(hours=1))
+    unlinked["author"] = None
+    stranger = fake.commit("a3", datetime.now(timezone.utc) - timedelta(hours=2))
+    stranger["author"] = None
+    stranger["commit"]["author"]["email"] = "someone@example.com"
+    fake.commits["dev/alpha"] = [unlinked, stranger]
+
+    with fake.patch_client():
+        await sync_github_snapshot(user_id)
+
+    stored = await mock_mongodb["github_commits"].distinct("sha", {"user_id": user_id})
+    assert sorted(stored) == ["a2", "b0", "b1"]
+
+
+@pytest.mark.asyncio
+async def test_sync_after_lease_wait_times_out(mock_mongodb, monkeypatch):
+    """
+    When waiting on another holder's lease times out, the sync takes over
+    a lease that has expired, and fails if it is still being renewed.
+    """
+    leases = mock_mongodb["sync_leases"]
+    sync = AsyncMock()
+    monkeypatch.setattr("src.services.github_sync.sync_leases", leases)
+    monkeypatch.setattr("src.services.github_sync._sync_github_snapshot", sync)
+    monkeypatch.setattr("src.services.github_sync.MongoLease.wait_released", AsyncMock(return_value=False))
+    user_id = ObjectId()
+    now = datetime.now(timezone.utc)
+
+    # A slow holder still renewing its lease
+    await leases.insert_one({"_id": user_id, "owner": "slow", "expires_at": now + timedelta(minutes=1)})
+    with pytest.raises(RuntimeError):
+        await _sync_with_lease(user_id, False, None)
+    sync.assert_not_awaited()
+
+    # A stuck holder whose lease has lapsed
+    await leases.update_one({"_id": user_id}, {"$set": {"expires_at": now - timedelta(seconds=1)}})
+    await _sync_with_lease(user_id, False, None)
+    sync.assert_awaited_once()
+    assert await leases.count_documents({}) == 0
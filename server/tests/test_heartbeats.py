@@ -0,0 +1,92 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from bson import ObjectId
+from src.services.heartbeats import HeartbeatSessionizer
+from src.services.time_aggregates import TimeLogAggregates
+
+T0 = datetime(2026, 4, 1, 9, 0, tzinfo=timezone.utc)
+
+
+def _beats(project, *minutes, file=None):
+    return [{"project": project, "timestamp": T0 + timedelta(minutes=m), "file": file} for m in minutes]
+
+
+@pytest.mark.asyncio
+async def test_heartbeats_merge_into_sessions(mock_mongodb):
+    """
+    Heartbeats split on idle gaps; a later batch that bridges the gap
+    merges the stored sessions, and aggregates follow.
+    """
+    logs = mock_mongodb["time_logs"]
+    aggregates = TimeLogAggregates(mock_mongodb["time_log_daily"])
+    sessionizer = HeartbeatSessionizer(logs, aggregates, idle_gap_minutes=15)
+    user_id = ObjectId()
+
+    await sessionizer.ingest(user_id, _beats("api", 0, 5, 10, 40, 45, file="main.py") + _beats("web", 3))
+    assert await logs.count_documents({"user_id": user_id, "project": "api"}) == 2
+    assert await aggregates.total_minutes(user_id) == 10 + 5 + 1
+
+    # Late, out-of-order heartbeats close the 10 -> 40 gap
+    sessions = await sessionizer.ingest(user_id, _beats("api", 30, 20, file="routes.py"))
+    assert len(sessions) == 1
+
+    stored = await logs.find({"user_id": user_id, "project": "api"}).to_list(None)
+    assert len(stored) == 1
+    assert stored[0]["minutes"] == 45
+    assert stored[0]["heartbeats"] == 7
+    assert stored[0]["files"] == ["main.py", "routes.py"]
+    assert (stored[0]["startTime"], stored[0]["endTime"]) == ("09:00", "09:45")
+
+    report = await aggregates.analytics(user_id, "2026-04-01", "2026-04-01")
+    assert report["totalMinutes"] == 46
+    assert report["sessions"] == 2
+
+
+@pytest.mark.asyncio
+async def test_long_sessions_are_deep_work_and_resends_are_idempotent(mock_mongodb):
+    """
+    A session past the deep-work threshold is flagged; resending the same
+    heartbeats (or repeating one within a batch) leaves one session with
+    the same length and heartbeat count.
+    """
+    logs = mock_mongodb["time_logs"]
+    aggregates = TimeLogAggregates(mock_mongodb["time_log_daily"])
+    sessionizer = HeartbeatSessionizer(logs, aggregates, idle_gap_minutes=15)
+    user_id = ObjectId()
+    beats = _beats("api", *range(0, 70, 10))
+
+    first = await sessionizer.ingest(user_id, beats + beats[:2])
+    assert await sessionizer.ingest(user_id, beats) == []
+
+    stored = await logs.find({"user_id": user_id}).to_list(None)
+    assert len(stored) == 1
+    assert stored[0]["_id"] == first[0]["_id"]
+    assert stored[0]["heartbeats"] == 7
+    assert stored[0]["minutes"] == 60
+    assert stored[0]["isDeepWork"] is True
+
+    report = await aggregates.analytics(user_id, "2026-04-01", "2026-04-01")
+    assert (report["totalMinutes"], report["deepWorkMinutes"], report["sessions"]) == (60, 60, 1)
+
+
+@pytest.mark.asyncio
+async def test_merged_sessions_keep_an_existing_id(mock_mongodb):
+    """
+    Bridging two stored sessions rewrites the first in place and deletes
+    the second; a resent heartbeat with a new file only adds the file.
+    """
+    logs = mock_mongodb["time_logs"]
+    aggregates = TimeLogAggregates(mock_mongodb["time_log_daily"])
+    sessionizer = HeartbeatSessionizer(logs, aggregates, idle_gap_minutes=15)
+    user_id = ObjectId()
+
+    await sessionizer.ingest(user_id, _beats("api", 0, 10) + _beats("api", 40, 50))
+    ids = [s["_id"] for s in await logs.find({"user_id": user_id}).sort("started_at", 1).to_list(None)]
+
+    await sessionizer.ingest(user_id, _beats("api", 25) + _beats("api", 10, file="main.py"))
+
+    stored = await logs.find({"user_id": user_id}).to_list(None)
+    assert [s["_id"] for s in stored] == [ids[0]]
+    assert stored[0]["heartbeats"] == 5
+    assert stored[0]["files"] == ["main.py"]
+    assert await aggregates.total_minutes(user_id) == 50
@@ -0,0 +1,53 @@
+import os
+import pytest
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+from src.config.indexes import _has_collscan, apply_indexes, find_collection_scans
+
+MONGODB_TEST_URI = os.getenv("MONGODB_TEST_URI")
+
+
+@pytest.mark.asyncio
+async def test_registry_applies_cleanly(mock_mongodb):
+    """
+    Every registered index can be created, and re-applying is a no-op.
+    """
+    assert await apply_indexes(mock_mongodb) == []
+
+    users = mock_mongodb["user"]
+    # Users without a linked GitHub account are not caught by github_id_unique
+    await users.insert_one({"email": "a@example.com"})
+    await users.insert_one({"email": "b@example.com"})
+    with pytest.raises(DuplicateKeyError):
+        await users.insert_one({"email": "a@example.com"})
+
+
+def test_collscan_detection():
+    """
+    A COLLSCAN anywhere in the winning plan is reported.
+    """
+    indexed = {"stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": "user_date"}}
+    scanned = {"stage": "SORT", "inputStage": {"stage": "COLLSCAN"}}
+    or_plan = {"stage": "SUBPLAN", "inputStage": {"stage": "OR", "inputStages": [indexed, scanned]}}
+
+    assert not _has_collscan(indexed)
+    assert _has_collscan(scanned)
+    assert _has_collscan(or_plan)
+
+
+@pytest.mark.skipif(not MONGODB_TEST_URI, reason="needs a real MongoDB (set MONGODB_TEST_URI)")
+@pytest.mark.asyncio
+async def test_hot_queries_use_indexes():
+    """
+    explain() on every hot query shows an index scan, never a COLLSCAN.
+    """
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    client = AsyncIOMotorClient(MONGODB_TEST_URI)
+    database = client[f"index_check_{ObjectId()}"]
+    try:
+        assert await apply_indexes(database) == []
+        assert await find_collection_scans(database) == []
+    finally:
+        await client.drop_database(database.name)
+        client.close()
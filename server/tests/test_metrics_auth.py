@@ -0,0 +1,26 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.Routes import PublicRoute
+
+
+def test_metrics_require_the_operator_key(monkeypatch):
+    """
+    /metrics is hidden without METRICS_API_KEY and rejects a missing or
+    wrong X-Metrics-Key; /health stays public.
+    """
+    app = FastAPI()
+    app.include_router(PublicRoute.route)
+    client = TestClient(app)
+
+    monkeypatch.setattr(PublicRoute, "METRICS_API_KEY", None)
+    assert client.get("/api/v1/metrics", headers={"X-Metrics-Key": "anything"}).status_code == 404
+
+    monkeypatch.setattr(PublicRoute, "METRICS_API_KEY", "ops-key")
+    assert client.get("/api/v1/metrics").status_code == 401
+    assert client.get("/api/v1/metrics", headers={"X-Metrics-Key": "wrong"}).status_code == 401
+
+    response = client.get("/api/v1/metrics", headers={"X-Metrics-Key": "ops-key"})
+    assert response.status_code == 200
+    assert "githubCache" in response.json()
+
+    assert client.get("/api/v1/health").status_code == 200
@@ -0,0 +1,21 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from src.Routes.AuthRoutes import consume_oauth_state
+
+
+@pytest.mark.asyncio
+async def test_oauth_state_is_single_use(mock_mongodb):
+    """
+    A live state is consumed exactly once; expired states never match.
+    """
+    states = mock_mongodb["oauth_states"]
+    now = datetime.now(timezone.utc)
+    await states.insert_one({"state": "live", "expires_at": now + timedelta(minutes=5)})
+    await states.insert_one({"state": "stale", "expires_at": now - timedelta(minutes=1)})
+
+    assert await consume_oauth_state("live") is True
+    assert await consume_oauth_state("live") is False
+    assert await consume_oauth_state("stale") is False
+    assert await consume_oauth_state("unknown") is False
+
+    assert await states.count_documents({"state": "live"}) == 0
@@ -0,0 +1,68 @@
+import pytest
+from datetime import datetime, timedelta
+from bson import ObjectId
+from src.services.pagination import InvalidCursor, decode_cursor, fetch_page
+
+
+@pytest.mark.asyncio
+async def test_keyset_pages_cover_everything_once(mock_mongodb):
+    """
+    Walking the cursors returns every document exactly once, newest
+    first, even when several share the same timestamp.
+    """
+    summaries = mock_mongodb["summaries"]
+    user_id = ObjectId()
+    base = datetime(2026, 1, 1)
+    # Groups of three share a created_at
+    await summaries.insert_many([
+        {"user_id": user_id, "created_at": base + timedelta(hours=i // 3), "n": i}
+        for i in range(25)
+    ])
+    await summaries.insert_one({"user_id": ObjectId(), "created_at": base, "n": -1})
+
+    seen = []
+    cursor = None
+    pages = 0
+    while True:
+        docs, cursor = await fetch_page(summaries, {"user_id": user_id}, "created_at", cursor, 10)
+        seen.extend(docs)
+        pages += 1
+        if cursor is None:
+            break
+
+    assert pages == 3
+    assert sorted(d["n"] for d in seen) == list(range(25))
+    keys = [(d["created_at"], d["_id"]) for d in seen]
+    assert keys == sorted(keys, reverse=True)
+
+
+@pytest.mark.asyncio
+async def test_string_keys_and_bad_cursors(mock_mongodb):
+    """
+    Time logs page on their YYYY-MM-DD date; tampered cursors are rejected.
+    """
+    logs = mock_mongodb["time_logs"]
+    user_id = ObjectId()
+    await logs.insert_many([{"user_id": user_id, "date": f"2026-02-{d:02d}"} for d in range(1, 6)])
+
+    first, cursor = await fetch_page(logs, {"user_id": user_id}, "date", None, 3)
+    rest, end = await fetch_page(logs, {"user_id": user_id}, "date", cursor, 3)
+
+    assert [d["date"] for d in first + rest] == [f"2026-02-{d:02d}" for d in range(5, 0, -1)]
+    assert end is None
+    assert decode_cursor(cursor)[0] == "2026-02-03"
+
+    with pytest.raises(InvalidCursor):
+        await fetch_page(logs, {"user_id": user_id}, "date", "not-a-cursor", 3)
+
+
+def test_cursor_header_is_readable_cross_origin():
+    """The browser client can read X-Next-Cursor (and ETag) on CORS responses."""
+    from fastapi.testclient import TestClient
+    from src.app import app
+
+    # No `with`: the app's startup (real Mongo) is not needed for this
+    response = TestClient(app).get("/api/v1/health", headers={"Origin": "http://localhost:3000"})
+
+    exposed = {h.strip().lower() for h in response.headers["access-control-expose-headers"].split(",")}
+    assert {"x-next-cursor", "etag"} <= exposed
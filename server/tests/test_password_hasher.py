@@ -0,0 +1,52 @@
+import asyncio
+import pytest
+from src.services.password_hasher import PasswordHasher, PasswordHasherBusy
+
+
+@pytest.mark.asyncio
+async def test_hash_and_verify_off_the_event_loop():
+    """
+    Hashes use the configured work factor and verify against the password.
+    """
+    hasher = PasswordHasher(workers=2, max_pending=4, rounds=4)
+    try:
+        hashed = await hasher.hash("correct horse")
+        assert hashed.startswith("$2b$04$")
+        assert await hasher.verify("correct horse", hashed) is True
+        assert await hasher.verify("wrong horse", hashed) is False
+        assert hasher.as_dict()["completed"] == 3
+    finally:
+        hasher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_saturated_pool_sheds_load():
+    """
+    Requests beyond max_pending are rejected instead of queued.
+    """
+    hasher = PasswordHasher(workers=1, max_pending=1, rounds=10)
+    try:
+        first = asyncio.create_task(hasher.hash("password-1"))
+        await asyncio.sleep(0)
+
+        with pytest.raises(PasswordHasherBusy):
+            await hasher.hash("password-2")
+        assert hasher.rejected == 1
+
+        await first
+        assert hasher.pending == 0
+    finally:
+        hasher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_running_count_settles_after_concurrent_hashes():
+    """
+    Pool threads update `running` under a lock, so it returns to zero.
+    """
+    hasher = PasswordHasher(workers=4, max_pending=32, rounds=4)
+    try:
+        await asyncio.gather(*(hasher.hash(f"password-{i}") for i in range(32)))
+        assert (hasher.running, hasher.pending, hasher.completed) == (0, 0, 32)
+    finally:
+        hasher.shutdown()
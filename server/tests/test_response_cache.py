@@ -0,0 +1,53 @@
+import pytest
+from bson import ObjectId
+from src.services.response_cache import ResponseCache
+
+
+@pytest.mark.asyncio
+async def test_cache_is_keyed_by_version():
+    """
+    A new snapshot version misses, and the LRU stays bounded.
+    """
+    cache = ResponseCache(ttl=60, max_entries=2)
+    user_id = ObjectId()
+
+    await cache.set(user_id, "v1", {"metrics": 1})
+    assert await cache.get(user_id, "v1") == {"metrics": 1}
+    assert await cache.get(user_id, "v2") is None
+
+    for _ in range(3):
+        await cache.set(ObjectId(), "v1", {})
+    assert len(cache._lru) == 2
+
+    assert cache.etag(user_id, "v1") == cache.etag(user_id, "v1")
+    assert cache.etag(user_id, "v1") != cache.etag(user_id, "v2")
+
+
+@pytest.mark.asyncio
+async def test_expired_entries_miss():
+    """
+    Entries past their TTL are not served.
+    """
+    cache = ResponseCache(ttl=0)
+    user_id = ObjectId()
+
+    await cache.set(user_id, "v1", {"metrics": 1})
+    assert await cache.get(user_id, "v1") is None
+
+
+@pytest.mark.asyncio
+async def test_shared_tier_serves_other_processes(mock_mongodb):
+    """
+    A render stored by one process is served to another through Mongo
+    until it is invalidated.
+    """
+    collection = mock_mongodb["dashboard_cache"]
+    writer = ResponseCache(ttl=60, collection=collection)
+    reader = ResponseCache(ttl=60, collection=collection)
+    user_id = ObjectId()
+
+    await writer.set(user_id, "v1", {"metrics": 1})
+    assert await reader.get(user_id, "v1") == {"metrics": 1}
+
+    await writer.invalidate(user_id)
+    assert await ResponseCache(ttl=60, collection=collection).get(user_id, "v1") is None
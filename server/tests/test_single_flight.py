@@ -0,0 +1,54 @@
+import asyncio
+import pytest
+from datetime import timedelta
+from src.services.single_flight import MongoLease, SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_call():
+    """
+    Callers with the same key await one execution; other keys run separately.
+    """
+    calls = []
+
+    async def work(key):
+        calls.append(key)
+        await asyncio.sleep(0.01)
+        return f"result-{key}"
+
+    flights = SingleFlight()
+    results = await asyncio.gather(
+        flights.do("u1", lambda: work("u1")),
+        flights.do("u1", lambda: work("u1")),
+        flights.do("u2", lambda: work("u2")),
+    )
+
+    assert results == ["result-u1", "result-u1", "result-u2"]
+    assert calls == ["u1", "u2"]
+    assert not flights.in_flight("u1")
+
+
+@pytest.mark.asyncio
+async def test_mongo_lease_excludes_other_holders(mock_mongodb):
+    """
+    A second process cannot take a live lease, but can after release or expiry.
+    """
+    leases = mock_mongodb["sync_leases"]
+    first = MongoLease(leases, "user-1")
+    second = MongoLease(leases, "user-1")
+
+    assert await first.try_acquire()
+    assert not await second.try_acquire()
+    assert not await second.wait_released(timeout=timedelta(seconds=0.1))
+
+    await first.release()
+    assert await second.wait_released(timeout=timedelta(seconds=1))
+    assert await second.try_acquire()
+    await second.release()
+
+    expired = MongoLease(leases, "user-2", ttl=timedelta(seconds=-1))
+    assert await expired.try_acquire()
+    takeover = MongoLease(leases, "user-2")
+    assert await takeover.try_acquire()
+    await takeover.release()
+    await expired.release()
@@ -0,0 +1,169 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from bson import ObjectId
+from src.services.ai_result_cache import AIResultCache
+from src.services.commit_store import COMMIT_STORAGE, CommitStore
+from src.services.data_access import SnapshotStore
+from src.services.summary_batch import SummaryBatch
+from src.services.daily_summary import OFFLINE_MARKER, summary_day_key
+
+
+@pytest.fixture
+async def users(mock_mongodb, monkeypatch):
+    """Four active users, each with one commit in the last day."""
+    # summary_batch imports daily_summary as `services.*` (src/ on the path)
+    commits = CommitStore(mock_mongodb["github_commits"])
+    monkeypatch.setattr("services.daily_summary.commit_store", commits)
+    monkeypatch.setattr("services.daily_summary.snapshot_store", SnapshotStore(mock_mongodb["github_snapshots"]))
+    monkeypatch.setattr("services.daily_summary.ai_result_cache", AIResultCache())
+
+    now = datetime.now(timezone.utc)
+    user_ids = sorted(ObjectId() for _ in range(4))
+    for i, user_id in enumerate(user_ids):
+        await mock_mongodb["github_snapshots"].insert_one({
+            "user_id": user_id,
+            "commit_storage": COMMIT_STORAGE,
+            "last_synced_at": now,
+        })
+        await commits.insert_new(user_id, [{
+            "sha": f"sha-{i}",
+            "repo_name": "dev/repo",
+            "message": f"change {i}",
+            "committed_at": now - timedelta(hours=1),
+        }])
+    return user_ids
+
+
+def _batch(db, page_size=2):
+    return SummaryBatch(db["summaries"], db["github_snapshots"], db["summary_batch_runs"], page_size=page_size, rpm=0)
+
+
+@pytest.mark.asyncio
+async def test_batch_writes_summaries_and_records_failures(mock_mongodb, users, monkeypatch):
+    """
+    Every active user gets a summary except the one whose AI call failed,
+    which is recorded; a second run the same day does nothing.
+    """
+    async def fake_ai(context, client=None, **options):
+        if context["commits"][0]["message"] == "change 2":
+            return None
+        return {"score": 8, "highlights": [context["commits"][0]["message"]]}
+
+    monkeypatch.setattr("services.daily_summary.generate_ai_summary", fake_ai)
+
+    run = await _batch(mock_mongodb).run()
+
+    assert (run["processed"], run["written"], run["failed"]) == (4, 3, 1)
+    assert run["failed_users"] == [users[2]]
+    assert run["status"] == "done"
+    assert await mock_mongodb["summaries"].count_documents({}) == 3
+
+    again = await _batch(mock_mongodb).run()
+    assert again["processed"] == 4
+    assert await mock_mongodb["summaries"].count_documents({}) == 3
+
+
+@pytest.mark.asyncio
+async def test_interrupted_run_resumes_after_checkpoint(mock_mongodb, users, monkeypatch):
+    """
+    A run left 'running' continues after its cursor instead of starting over.
+    """
+    called = []
+
+    async def fake_ai(context, client=None, **options):
+        called.append(context["commits"][0]["message"])
+        return {"score": 8}
+
+    monkeypatch.setattr("services.daily_summary.generate_ai_summary", fake_ai)
+
+    now = datetime.now(timezone.utc)
+    await mock_mongodb["summary_batch_runs"].insert_one({
+        "_id": now.strftime("%Y-%m-%d"),
+        "status": "running",
+        "cursor": users[1],
+        "processed": 2,
+        "written": 2,
+        "skipped": 0,
+        "failed": 0,
+        "failed_users": [],
+    })
+
+    run = await _batch(mock_mongodb).run(now=now)
+
+    assert called == ["change 2", "change 3"]
+    assert (run["processed"], run["written"]) == (4, 4)
+
+
+@pytest.mark.asyncio
+async def test_batch_keeps_a_summary_generated_on_demand_meanwhile(mock_mongodb, users, monkeypatch):
+    """
+    A /generate that stores an AI summary while the batch waits on Gemini
+    wins; an offline-mode summary is replaced in place. Either way each
+    user ends up with a single summary for the day.
+    """
+    now = datetime.now(timezone.utc)
+    summaries = mock_mongodb["summaries"]
+    await summaries.insert_one({
+        "user_id": users[1],
+        "user_day": summary_day_key(users[1], now),
+        "content": f"Report {OFFLINE_MARKER}",
+        "created_at": now,
+    })
+
+    async def fake_ai(context, client=None, **options):
+        if context["commits"][0]["message"] == "change 0":
+            await summaries.insert_one({
+                "user_id": users[0],
+                "user_day": summary_day_key(users[0], now),
+                "content": "on demand",
+                "created_at": now,
+            })
+        return {"score": 8}
+
+    monkeypatch.setattr("services.daily_summary.generate_ai_summary", fake_ai)
+
+    run = await _batch(mock_mongodb).run(now=now)
+
+    assert (run["written"], run["skipped"]) == (3, 1)
+    for user_id in users:
+        assert await summaries.count_documents({"user_id": user_id}) == 1
+    assert (await summaries.find_one({"user_id": users[0]}))["content"] == "on demand"
+    assert OFFLINE_MARKER not in (await summaries.find_one({"user_id": users[1]}))["content"]
+
+
+@pytest.mark.asyncio
+async def test_each_page_is_one_bulk_write(mock_mongodb, users, monkeypatch):
+    """
+    Summaries are written once per page; an offline summary stored before
+    user_day existed is replaced by the new one.
+    """
+    class CountingCollection:
+        def __init__(self, inner):
+            self.inner = inner
+            self.bulk_writes = 0
+
+        async def bulk_write(self, ops, **kwargs):
+            self.bulk_writes += 1
+            return await self.inner.bulk_write(ops, **kwargs)
+
+        def __getattr__(self, name):
+            return getattr(self.inner, name)
+
+    async def fake_ai(context, client=None, **options):
+        return {"score": 8}
+
+    monkeypatch.setattr("services.daily_summary.generate_ai_summary", fake_ai)
+
+    now = datetime.now(timezone.utc)
+    summaries = mock_mongodb["summaries"]
+    await summaries.insert_one({"user_id": users[3], "content": f"Report {OFFLINE_MARKER}", "created_at": now})
+
+    batch = _batch(mock_mongodb)
+    batch.summaries = CountingCollection(summaries)
+    run = await batch.run(now=now)
+
+    assert batch.summaries.bulk_writes == 2
+    assert (run["written"], run["skipped"]) == (4, 0)
+    for user_id in users:
+        assert await summaries.count_documents({"user_id": user_id}) == 1
+    assert OFFLINE_MARKER not in (await summaries.find_one({"user_id": users[3]}))["content"]
@@ -0,0 +1,153 @@
+import asyncio
+import json
+import time
+import httpx
+import jwt
+import pytest
+from datetime import datetime, timedelta, timezone
+from bson import ObjectId
+from src.app import app
+from src.services.ai_result_cache import AIResultCache
+from src.services.commit_store import COMMIT_STORAGE, CommitStore
+from src.services.data_access import SnapshotStore
+from src.services.gemini_service import ModelHealth, stream_ai_summary
+
+# The app imports its modules from src/ directly
+from services.http_clients import get_gemini_client
+
+AI_TEXT = json.dumps({"score": 9, "highlights": ["Shipped streaming"], "insights": [], "improvements": []})
+
+
+def fake_streaming_gemini(chunks: list[str], calls: list):
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        if "gemini-2.5-flash" in request.url.path:
+            return httpx.Response(503, text="overloaded")
+        body = "".join(
+            "data: " + json.dumps({"candidates": [{"content": {"parts": [{"text": c}]}}]}) + "\r\n\r\n"
+            for c in chunks
+        )
+        return httpx.Response(200, text=body, headers={"content-type": "text/event-stream"})
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def _events(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+@pytest.mark.asyncio
+async def test_stream_falls_over_until_a_model_answers():
+    """
+    A model that errors before streaming is skipped; text arrives in chunks.
+    """
+    calls = []
+    chunks = [AI_TEXT[:10], AI_TEXT[10:30], AI_TEXT[30:]]
+    client = fake_streaming_gemini(chunks, calls)
+
+    received = [text async for text in stream_ai_summary({"commits": []}, client=client, health=ModelHealth())]
+
+    assert received == chunks
+    assert len(calls) == 2
+    assert calls[1].endswith(":streamGenerateContent")
+
+
+@pytest.mark.asyncio
+async def test_stream_gives_up_at_the_deadline():
+    """
+    A model that never starts answering is cut off by the overall deadline
+    and counted as a failure; no further model is tried.
+    """
+    calls = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        await asyncio.sleep(5)
+        return httpx.Response(200, text="")
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    health = ModelHealth()
+
+    start = time.monotonic()
+    received = [text async for text in stream_ai_summary({"commits": []}, client=client, health=health, deadline=0.05)]
+
+    assert received == []
+    assert time.monotonic() - start < 1
+    assert len(calls) == 1
+    assert health.as_dict()["gemini-2.5-flash"]["errors"] == 1
+
+
+@pytest.mark.asyncio
+async def test_stream_endpoint_persists_final_summary(mock_mongodb, monkeypatch):
+    """
+    The SSE endpoint forwards tokens and stores the same summary /generate would.
+    """
+    user_id = ObjectId()
+    commits = CommitStore(mock_mongodb["github_commits"])
+    monkeypatch.setattr("services.daily_summary.commit_store", commits)
+    monkeypatch.setattr("services.daily_summary.snapshot_store", SnapshotStore(mock_mongodb["github_snapshots"]))
+    monkeypatch.setattr("Routes.Summary.summaries_collection", mock_mongodb["summaries"])
+    monkeypatch.setattr("Routes.Summary.ai_result_cache", AIResultCache())
+    monkeypatch.setattr("services.gemini_service.model_health", ModelHealth())
+
+    await mock_mongodb["github_snapshots"].insert_one({"user_id": user_id, "commit_storage": COMMIT_STORAGE})
+    await commits.insert_new(user_id, [{
+        "sha": "abc",
+        "repo_name": "dev/app",
+        "message": "Add SSE",
+        "committed_at": datetime.now(timezone.utc) - timedelta(hours=1),
+    }])
+
+    chunks = [AI_TEXT[:20], AI_TEXT[20:]]
+    app.dependency_overrides[get_gemini_client] = lambda: fake_streaming_gemini(chunks, [])
+    token = jwt.encode({"sub": str(user_id), "exp": int(time.time()) + 60}, "test-secret-key", algorithm="HS256")
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            client.cookies.set("access_token", token)
+            res = await client.post("/api/v1/summary/generate/stream")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert res.headers["content-type"].startswith("text/event-stream")
+    events = _events(res.text)
+    assert [e for e, _ in events] == ["start", "token", "token", "done"]
+    assert "".join(d["text"] for e, d in events if e == "token") == AI_TEXT
+
+    done = events[-1][1]
+    assert done["cached"] is False
+    assert "Shipped streaming" in done["summary"]
+
+    saved = await mock_mongodb["summaries"].find_one({"user_id": user_id})
+    assert saved["content"] == done["summary"]
+    assert saved["mood"] == done["mood"]
+    assert saved["stats"] == done["stats"]
+
+
+@pytest.mark.asyncio
+async def test_closing_the_stream_early_frees_the_half_open_trial():
+    """
+    A client that disconnects mid-stream neither passes nor fails the
+    half-open trial; the next request may probe the model again.
+    """
+    chunks = [AI_TEXT[:10], AI_TEXT[10:]]
+    client = httpx.AsyncClient(transport=httpx.MockTransport(
+        lambda request: httpx.Response(200, text="".join(
+            "data: " + json.dumps({"candidates": [{"content": {"parts": [{"text": c}]}}]}) + "\r\n\r\n"
+            for c in chunks
+        ))
+    ))
+    health = ModelHealth(failures=1, cooldown=0)
+    health.record_failure("gemini-2.5-flash")
+
+    stream = stream_ai_summary({"commits": []}, client=client, health=health)
+    assert await stream.__anext__() == chunks[0]
+    assert not health.available("gemini-2.5-flash")
+
+    await stream.aclose()
+
+    assert health.available("gemini-2.5-flash")
+    assert health.as_dict()["gemini-2.5-flash"]["errors"] == 1
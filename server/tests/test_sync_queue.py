@@ -0,0 +1,85 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock
+from bson import ObjectId
+from src.services import sync_queue
+
+
+@pytest.fixture
+def jobs(mock_mongodb, monkeypatch):
+    monkeypatch.setattr("src.services.sync_queue.sync_jobs", mock_mongodb["sync_jobs"])
+    return mock_mongodb["sync_jobs"]
+
+
+@pytest.mark.asyncio
+async def test_enqueue_dedupes_pending_jobs(jobs):
+    """
+    Two refresh requests for the same user share one queued job.
+    """
+    user_id = ObjectId()
+    first = await sync_queue.enqueue_sync(user_id)
+    second = await sync_queue.enqueue_sync(user_id)
+
+    assert first["_id"] == second["_id"]
+    assert await jobs.count_documents({}) == 1
+
+
+@pytest.mark.asyncio
+async def test_worker_runs_job_and_frees_slot(jobs, monkeypatch):
+    """
+    A claimed job runs the sync, is marked done, and a new request queues a new job.
+    """
+    sync = AsyncMock()
+    monkeypatch.setattr("src.services.sync_queue.sync_github_snapshot", sync)
+    user_id = ObjectId()
+
+    job = await sync_queue.enqueue_sync(user_id)
+    claimed = await sync_queue.claim_next_job("test-worker")
+    assert claimed["_id"] == job["_id"]
+    assert claimed["status"] == "running"
+
+    await sync_queue.run_job(claimed)
+
+    sync.assert_awaited_once()
+    done = await sync_queue.get_job(user_id, str(job["_id"]))
+    assert done["status"] == "done"
+    assert sync_queue.format_job(done)["finishedAt"] is not None
+
+    again = await sync_queue.enqueue_sync(user_id)
+    assert again["_id"] != job["_id"]
+
+
+@pytest.mark.asyncio
+async def test_failed_job_is_retried_then_marked_failed(jobs, monkeypatch):
+    """
+    A failing sync goes back to the queue, not claimable until its backoff
+    (doubling per attempt) has passed, until SYNC_MAX_ATTEMPTS is reached.
+    """
+    monkeypatch.setattr(
+        "src.services.sync_queue.sync_github_snapshot",
+        AsyncMock(side_effect=RuntimeError("GitHub down")),
+    )
+    user_id = ObjectId()
+    await sync_queue.enqueue_sync(user_id)
+    now = datetime.now(timezone.utc)
+
+    await sync_queue.run_job(await sync_queue.claim_next_job("test-worker", now=now))
+    for attempt in range(2, sync_queue.SYNC_MAX_ATTEMPTS + 1):
+        job = await sync_queue.get_job(user_id)
+        assert job["status"] == "queued"
+        assert await sync_queue.claim_next_job("test-worker", now=now) is None
+
+        now = job["not_before"].replace(tzinfo=timezone.utc)
+        claimed = await sync_queue.claim_next_job("test-worker", now=now)
+        assert claimed["attempts"] == attempt
+        await sync_queue.run_job(claimed)
+
+    job = await sync_queue.get_job(user_id)
+    assert job["status"] == "failed"
+    assert job["error"] == "GitHub down"
+    assert await sync_queue.claim_next_job("test-worker", now=now + timedelta(days=1)) is None
+
+
+def test_retry_delay_doubles_per_attempt():
+    base = sync_queue.retry_delay(1)
+    assert [sync_queue.retry_delay(n) for n in (2, 3)] == [base * 2, base * 4]
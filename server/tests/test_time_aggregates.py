@@ -0,0 +1,79 @@
+import pytest
+from bson import ObjectId
+from src.services.time_aggregates import TimeLogAggregates
+
+
+def _log(project, date, minutes, deep=False):
+    return {"project": project, "date": date, "minutes": minutes, "isDeepWork": deep}
+
+
+@pytest.mark.asyncio
+async def test_aggregates_accumulate_per_project_and_day(mock_mongodb):
+    """
+    Logs fold into one row per project and day; analytics read only those rows.
+    """
+    aggregates = TimeLogAggregates(mock_mongodb["time_log_daily"])
+    user_id = ObjectId()
+
+    await aggregates.apply(user_id, [_log("api", "2026-01-01", 60, deep=True), _log("web", "2026-01-01", 30)])
+    await aggregates.apply(user_id, [_log("api", "2026-01-01", 45)])
+    await aggregates.apply(user_id, [_log("api", "2026-01-03", 90, deep=True)])
+    await aggregates.apply(ObjectId(), [_log("api", "2026-01-01", 500)])
+
+    assert await mock_mongodb["time_log_daily"].count_documents({"user_id": user_id}) == 3
+
+    report = await aggregates.analytics(user_id, "2026-01-01", "2026-01-02")
+    assert report["totalMinutes"] == 135
+    assert report["deepWorkMinutes"] == 60
+    assert report["deepWorkRatio"] == round(60 / 135, 4)
+    assert report["sessions"] == 3
+    assert report["distribution"][0] == {"project": "api", "minutes": 105, "deepWorkMinutes": 60}
+    assert report["daily"] == [{"date": "2026-01-01", "minutes": 135, "deepWorkMinutes": 60}]
+
+    assert await aggregates.total_minutes(user_id) == 225
+
+
+@pytest.mark.asyncio
+async def test_rebuild_matches_raw_logs(mock_mongodb):
+    """
+    Backfilling from time_logs gives the same totals as the raw history.
+    """
+    aggregates = TimeLogAggregates(mock_mongodb["time_log_daily"])
+    user_id = ObjectId()
+    logs = [_log("api", f"2026-02-{d:02d}", d * 10, deep=d % 2 == 0) for d in range(1, 11)]
+    await mock_mongodb["time_logs"].insert_many([{**log, "user_id": user_id} for log in logs])
+
+    assert await aggregates.rebuild(user_id, mock_mongodb["time_logs"]) == 10
+    assert await aggregates.rebuild(user_id, mock_mongodb["time_logs"]) == 10
+
+    assert await aggregates.distribution(user_id) == [{"project": "api", "minutes": 550}]
+
+
+@pytest.mark.asyncio
+async def test_apply_is_one_bulk_write(mock_mongodb):
+    """
+    However many (project, day) rows a batch touches, apply costs one
+    round trip to Mongo.
+    """
+    class CountingCollection:
+        def __init__(self, inner):
+            self.inner = inner
+            self.bulk_writes = 0
+
+        async def bulk_write(self, ops, **kwargs):
+            self.bulk_writes += 1
+            return await self.inner.bulk_write(ops, **kwargs)
+
+        def __getattr__(self, name):
+            return getattr(self.inner, name)
+
+    collection = CountingCollection(mock_mongodb["time_log_daily"])
+    aggregates = TimeLogAggregates(collection)
+    user_id = ObjectId()
+    logs = [_log(f"p{i % 5}", f"2026-03-{i % 28 + 1:02d}", 10) for i in range(500)]
+
+    await aggregates.apply(user_id, logs)
+
+    assert collection.bulk_writes == 1
+    assert await mock_mongodb["time_log_daily"].count_documents({"user_id": user_id}) == 140
+    assert await aggregates.total_minutes(user_id) == 5000
@@ -0,0 +1,62 @@
+import json
+import pytest
+from bson import ObjectId
+from src.services.time_aggregates import TimeLogAggregates
+from src.services.time_ingest import InvalidLine, TooManyEntries, insert_time_logs, read_ndjson
+
+
+def _entry(i, **extra):
+    return {"project": "api", "minutes": 10, "date": "2026-03-01", "idempotencyKey": f"hb-{i}", **extra}
+
+
+async def _chunks(body: bytes, size: int):
+    for start in range(0, len(body), size):
+        yield body[start:start + size]
+
+
+@pytest.mark.asyncio
+async def test_bulk_insert_reports_errors_and_dedupes(mock_mongodb):
+    """
+    Valid entries are inserted in one go; bad ones are reported by index,
+    and a resent batch only produces duplicates.
+    """
+    logs = mock_mongodb["time_logs"]
+    aggregates = TimeLogAggregates(mock_mongodb["time_log_daily"])
+    user_id = ObjectId()
+
+    items = [_entry(i) for i in range(5)]
+    items[1] = {"project": "api", "date": "2026-03-01"}  # no minutes
+    items.append("not an object")
+    items.append(_entry(0))  # same key twice in one batch
+    items.append({"project": "web", "minutes": 5, "date": "2026-03-01"})  # no key
+
+    result = await insert_time_logs(logs, aggregates, user_id, items)
+
+    assert result["received"] == 8
+    assert result["inserted"] == 5
+    assert result["duplicates"] == 1
+    assert [e["index"] for e in result["errors"]] == [1, 5]
+    assert "minutes" in result["errors"][0]["error"]
+
+    again = await insert_time_logs(logs, aggregates, user_id, [_entry(i) for i in (0, 2, 3, 4)])
+    assert (again["inserted"], again["duplicates"]) == (0, 4)
+
+    assert await logs.count_documents({"user_id": user_id}) == 5
+    assert await aggregates.total_minutes(user_id) == 45
+
+
+@pytest.mark.asyncio
+async def test_ndjson_parsed_across_chunk_boundaries():
+    """
+    Lines split between chunks are reassembled; bad lines become errors.
+    """
+    body = ("\n".join(json.dumps(_entry(i)) for i in range(50)) + "\n{broken\n\n").encode()
+
+    items = await read_ndjson(_chunks(body, 7))
+
+    assert len(items) == 51
+    assert items[49]["idempotencyKey"] == "hb-49"
+    assert isinstance(items[50], InvalidLine)
+
+    with pytest.raises(TooManyEntries):
+        await read_ndjson(_chunks(body, 64), max_entries=10)